@@ -0,0 +1,98 @@
+"""
+Замер времени импорта пакета matrix_analysis
+
+Каждый сценарий выполняется в отдельном процессе Python (чистый кэш
+модулей), время берется как медиана нескольких запусков. Для сценария
+проверяется целевое время и отсутствие лишних тяжелых модулей: например,
+обращение к build_L_matrix не должно загружать matplotlib.
+
+Запуск из корня репозитория:
+    python benchmarks/import_time.py --repeat 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Сценарий: (название, код, целевое время в мс, модули, которые не должны быть загружены)
+SCENARIOS = [
+    ('import matrix_analysis',
+     'import matrix_analysis',
+     20.0, ['numpy', 'scipy', 'matplotlib']),
+    ('build_L_matrix',
+     'import matrix_analysis; matrix_analysis.build_L_matrix',
+     300.0, ['scipy', 'matplotlib']),
+    ('compute_matrix_rank',
+     'import matrix_analysis; matrix_analysis.compute_matrix_rank',
+     300.0, ['scipy', 'matplotlib']),
+    ('run_sweep',
+     'import matrix_analysis; matrix_analysis.run_sweep',
+     300.0, ['matplotlib']),
+    ('visualize_matrix',
+     'import matrix_analysis; matrix_analysis.visualize_matrix',
+     None, []),
+]
+
+# Код, выполняемый в дочернем процессе: время импорта и список загруженных модулей
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+exec(compile({code!r}, '<scenario>', 'exec'))
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def measure(code, repeat=5):
+    """
+    Выполняет код импорта в новых процессах
+
+    Возвращает:
+        seconds - медиана времени выполнения кода, с
+        modules - модули, загруженные после выполнения
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    times = []
+    modules = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(code=code)],
+                                check=True, capture_output=True, text=True, env=env).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['seconds'])
+        modules = result['modules']
+    return statistics.median(times), modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Время импорта matrix_analysis')
+    parser.add_argument('--repeat', type=int, default=5, help='число запусков каждого сценария')
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f'{"сценарий":<26}{"время, мс":>12}{"цель, мс":>12}  результат')
+    for name, code, target_ms, forbidden in SCENARIOS:
+        seconds, modules = measure(code, args.repeat)
+        elapsed_ms = seconds * 1000
+        loaded = [m for m in forbidden if m in modules]
+
+        problems = []
+        if target_ms is not None and elapsed_ms > target_ms:
+            problems.append('медленнее цели')
+        if loaded:
+            problems.append('загружены: ' + ', '.join(loaded))
+        failed = failed or bool(problems)
+
+        target_text = f'{target_ms:.0f}' if target_ms is not None else '-'
+        print(f'{name:<26}{elapsed_ms:>12.1f}{target_text:>12}  {"; ".join(problems) or "ok"}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
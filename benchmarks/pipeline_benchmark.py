@@ -0,0 +1,282 @@
+"""
+Замеры этапов построение -> L·L^T -> ранг -> спектр -> экспорт
+
+Для каждого размера (n1, n2, n3, n4) и каждого способа хранения
+(backend) этап выполняется в отдельном процессе Python, чтобы пиковая
+память (ru_maxrss) относилась только к нему. Время - минимум по
+нескольким повторам. По результатам для каждой пары (этап, backend)
+оценивается показатель степени t ~ N^p, где N - число строк L.
+
+Способы хранения:
+    dense    - плотные массивы numpy (build_L_matrix, SVD, eigh)
+    sparse   - scipy.sparse (build_L_sparse, точное исключение, eigsh)
+    operator - матрично-свободный LOperator (eigsh по L·L^T)
+    analytic - явные формулы (compute_L_rank, analytic_spectrum)
+
+Запуск из корня репозитория:
+    python benchmarks/pipeline_benchmark.py --sizes 2,3,4,6,8 --output bench.json
+    python benchmarks/pipeline_benchmark.py --baseline bench.json --threshold 1.5
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = ['build', 'llt', 'rank', 'spectrum', 'export']
+BACKENDS = ['dense', 'sparse', 'operator', 'analytic']
+
+# Число собственных чисел для частичного спектра (eigsh)
+PARTIAL_K = 6
+
+
+def _params_for_size(size):
+    """Набор (n_1, n1, n2, n3, n4) для размера size: различные n, растущие вместе"""
+    return (1, size, size + 1, size + 2, size + 3)
+
+
+def _rss_bytes():
+    """Пиковая память процесса в байтах (ru_maxrss: КБ в Linux, байты в macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _prepare(stage, backend, params):
+    """
+    Готовит входные данные этапа и возвращает функцию без аргументов, выполняющую этап
+
+    Возвращает None, если этап не определен для данного способа хранения.
+    """
+    import numpy as np
+    from matrix_analysis.build_L_matrix import build_L_matrix, build_L_sparse
+    from matrix_analysis.L_operator import LOperator
+    from matrix_analysis.compute_matrix_rank import compute_matrix_rank, compute_L_rank
+    from matrix_analysis.spectral_analysis import SpectralAnalysis
+    from matrix_analysis.analytic_spectrum import analytic_spectrum
+    from matrix_analysis.matrix_export import write_matrix_text, write_matrix_triplets
+
+    n_1, n1, n2, n3, n4 = params
+
+    if backend == 'analytic':
+        if stage == 'rank':
+            return lambda: compute_L_rank(*params)
+        if stage == 'spectrum':
+            return lambda: analytic_spectrum(n1, n2, n3, n4)
+        return None
+
+    if stage == 'build':
+        if backend == 'dense':
+            return lambda: build_L_matrix(*params)
+        if backend == 'sparse':
+            return lambda: build_L_sparse(*params)
+        return lambda: LOperator(*params)
+
+    if backend == 'dense':
+        L = np.asarray(build_L_matrix(*params)[0], dtype=np.float64)
+    elif backend == 'sparse':
+        L = build_L_sparse(*params)[0]
+    else:
+        L = LOperator(*params)
+
+    if stage == 'llt':
+        if backend == 'operator':
+            return L.LLT
+        return lambda: L @ L.T
+
+    if stage == 'rank':
+        if backend == 'dense':
+            return lambda: compute_matrix_rank(L, method='svd')
+        if backend == 'sparse':
+            return lambda: compute_matrix_rank(L, method='sparse')
+        return None
+
+    if stage == 'spectrum':
+        if backend == 'dense':
+            L_LT = L @ L.T
+            return lambda: SpectralAnalysis(L_LT, compute_eigenvectors=False).eigenvalues
+        L_LT = L.LLT() if backend == 'operator' else (L @ L.T).tocsr()
+        k = min(PARTIAL_K, L_LT.shape[0] - 1)
+        return lambda: SpectralAnalysis(L_LT, k=k, compute_eigenvectors=False).eigenvalues
+
+    if stage == 'export':
+        if backend == 'operator':
+            return None
+        filename = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'matrix.txt')
+        if backend == 'dense':
+            return lambda: write_matrix_text(L, filename, '%8.4f')
+        return lambda: write_matrix_triplets(L, filename)
+
+    raise ValueError(f'Неизвестный этап: {stage}')
+
+
+def _run_one(stage, backend, params, repeat):
+    """Выполняет один замер в текущем процессе и возвращает словарь с результатом"""
+    run = _prepare(stage, backend, params)
+    if run is None:
+        return None
+
+    rss_before = _rss_bytes()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    rss_after = _rss_bytes()
+
+    return {
+        'stage': stage,
+        'backend': backend,
+        'params': list(params),
+        'rows': sum(a * b for i, a in enumerate(params[1:]) for b in params[i + 2:]),
+        'seconds': min(times),
+        'peak_rss': rss_after,
+        'stage_rss': rss_after - rss_before,
+    }
+
+
+def measure(stage, backend, params, repeat=3, timeout=600):
+    """
+    Выполняет замер этапа в отдельном процессе
+
+    Возвращает:
+        result - словарь с полями stage, backend, params, rows, seconds,
+                 peak_rss (пиковая память процесса) и stage_rss (ее прирост на этапе);
+                 None, если этап не определен для backend;
+                 словарь с полем error, если процесс завершился с ошибкой
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--run-one', stage, backend,
+               ','.join(map(str, params)), '--repeat', str(repeat)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'stage': stage, 'backend': backend, 'params': list(params), 'error': 'timeout'}
+    if completed.returncode != 0:
+        message = (completed.stderr.strip().splitlines() or ['?'])[-1]
+        return {'stage': stage, 'backend': backend, 'params': list(params), 'error': message}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def scaling_exponents(results):
+    """
+    Оценивает показатели степени t ~ N^p методом наименьших квадратов в логарифмах
+
+    Возвращает:
+        exponents - словарь (этап, backend) -> p (по точкам со временем больше 1 мкс)
+    """
+    import numpy as np
+
+    groups = {}
+    for r in results:
+        if r and 'error' not in r and r['seconds'] > 1e-6:
+            groups.setdefault((r['stage'], r['backend']), []).append((r['rows'], r['seconds']))
+
+    exponents = {}
+    for key, points in groups.items():
+        rows, seconds = np.array(sorted(points)).T
+        if len(np.unique(rows)) >= 2:
+            exponents[key] = float(np.polyfit(np.log(rows), np.log(seconds), 1)[0])
+    return exponents
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Сравнивает время с сохраненными результатами
+
+    Возвращает:
+        regressions - список (этап, backend, params, во сколько раз медленнее)
+    """
+    reference = {(r['stage'], r['backend'], tuple(r['params'])): r['seconds']
+                 for r in baseline if 'seconds' in r}
+    regressions = []
+    for r in results:
+        if not r or 'seconds' not in r:
+            continue
+        old = reference.get((r['stage'], r['backend'], tuple(r['params'])))
+        if old and r['seconds'] > threshold * old and r['seconds'] > 1e-3:
+            regressions.append((r['stage'], r['backend'], r['params'], r['seconds'] / old))
+    return regressions
+
+
+def _print_table(results, exponents):
+    print(f'{"этап":<10}{"backend":<10}{"параметры":<18}{"строк":>7}{"время, с":>12}'
+          f'{"пик RSS, МБ":>14}{"прирост, МБ":>14}')
+    for r in results:
+        params = ','.join(map(str, r['params'][1:]))
+        if 'error' in r:
+            print(f'{r["stage"]:<10}{r["backend"]:<10}{params:<18}  ошибка: {r["error"]}')
+            continue
+        print(f'{r["stage"]:<10}{r["backend"]:<10}{params:<18}{r["rows"]:>7}{r["seconds"]:>12.5f}'
+              f'{r["peak_rss"] / 2**20:>14.1f}{r["stage_rss"] / 2**20:>14.1f}')
+
+    print('\nПоказатели степени t ~ N^p (N - число строк L):')
+    for (stage, backend), p in sorted(exponents.items()):
+        print(f'  {stage:<10}{backend:<10}p = {p:.2f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Замеры этапов анализа матрицы L')
+    parser.add_argument('--sizes', default='2,3,4,6,8',
+                        help='размеры k: n1..n4 = k, k+1, k+2, k+3')
+    parser.add_argument('--stages', default=','.join(STAGES))
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--repeat', type=int, default=3, help='повторов в каждом замере')
+    parser.add_argument('--max-dense-rows', type=int, default=2000,
+                        help='не выполнять плотные этапы для L с большим числом строк')
+    parser.add_argument('--timeout', type=float, default=600, help='ограничение времени замера, с')
+    parser.add_argument('--output', default=None, help='JSON-файл для результатов')
+    parser.add_argument('--baseline', default=None, help='JSON-файл предыдущего запуска для сравнения')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='допустимое замедление относительно baseline (во сколько раз)')
+    parser.add_argument('--run-one', nargs=3, metavar=('STAGE', 'BACKEND', 'PARAMS'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        stage, backend, params = args.run_one
+        result = _run_one(stage, backend, tuple(int(v) for v in params.split(',')), args.repeat)
+        print(json.dumps(result))
+        return 0
+
+    results = []
+    for size in (int(v) for v in args.sizes.split(',')):
+        params = _params_for_size(size)
+        rows = sum(a * b for i, a in enumerate(params[1:]) for b in params[i + 2:])
+        for stage in args.stages.split(','):
+            for backend in args.backends.split(','):
+                if backend == 'dense' and rows > args.max_dense_rows:
+                    continue
+                result = measure(stage, backend, params, args.repeat, args.timeout)
+                if result is not None:
+                    results.append(result)
+
+    exponents = scaling_exponents(results)
+    _print_table(results, exponents)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': results,
+                       'exponents': [{'stage': s, 'backend': b, 'exponent': p}
+                                     for (s, b), p in sorted(exponents.items())]}, f, indent=2)
+        print(f'\nРезультаты сохранены в файл: {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for stage, backend, params, ratio in regressions:
+            print(f'Замедление: {stage}/{backend} {params}: в {ratio:.2f} раза')
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
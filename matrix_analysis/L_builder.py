@@ -0,0 +1,226 @@
+import numpy as np
+import scipy.sparse as sp
+
+from .build_L_matrix import _L_block_layout, _kron_pattern, _layout_block_coordinates
+from .build_LLT_matrix import _LLT_block_layout, _LLT_block, _accumulation_dtype
+
+
+PARAM_NAMES = ('n_1', 'n1', 'n2', 'n3', 'n4')
+
+
+class LBuilder:
+    """
+    Построитель матриц L и L·L^T с кэшированием подблоков
+
+    Ненулевой подблок L (блок строк z_i на пересечении с группой столбцов
+    A, B, C или D) - это ±kron(E, 1, ...), и его позиции зависят только от
+    размеров множителей. Блоки z_i·z_j^T матрицы L·L^T имеют явный вид
+    c·kron(E, 1, ...) (см. _LLT_block_layout). Подблоки L и блоки L·L^T
+    кэшируются по размерам множителей и коэффициенту, поэтому при изменении
+    одного параметра заново строятся только затронутые блоки: например,
+    при смене n4 блоки z_4·z_5^T, z_5·z_6^T и другие блоки без n4 берутся
+    из кэша.
+
+    В кэше остаются только блоки, использованные при последнем
+    построении, поэтому память не растет при длинном переборе.
+    Собранные L и L·L^T хранятся до следующего изменения параметров:
+    повторные build()/LLT() возвращают те же объекты без склейки блоков,
+    поэтому изменять возвращенные матрицы на месте нельзя.
+
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы L (как в build_L_matrix)
+        format - формат разреженных результатов scipy.sparse ('csr', 'csc', ...)
+        dtype - тип элементов L (например, np.int8); для целого типа L·L^T
+                строится в int32 или int64
+
+    Пример:
+        builder = LBuilder(1, 2, 3, 4, 5)
+        for n4 in range(2, 10):
+            builder.update(n4=n4)
+            L, block_coords = builder.build()
+            L_LT = builder.LLT()
+    """
+
+    def __init__(self, n_1=1, n1=2, n2=3, n3=4, n4=5, format='csr', dtype=np.float64):
+        self.format = format
+        self.dtype = np.dtype(dtype)
+        self._params = dict(zip(PARAM_NAMES, (n_1, n1, n2, n3, n4)))
+        self._patterns = {}
+        self._products = {}
+        self._blocks = None
+        self._L = None
+        self._L_LT = None
+        self.stats = {'pattern_hits': 0, 'pattern_misses': 0, 'product_hits': 0, 'product_misses': 0,
+                      'assembled_hits': 0}
+
+    @property
+    def params(self):
+        """Текущие параметры (n_1, n1, n2, n3, n4)"""
+        return tuple(self._params[name] for name in PARAM_NAMES)
+
+    def update(self, **params):
+        """
+        Изменяет параметры матрицы; подблоки пересчитываются при следующем build()/LLT()
+
+        Параметры:
+            n_1, n1, n2, n3, n4 - новые значения (необязательные)
+
+        Возвращает:
+            self
+        """
+        unknown = set(params) - set(PARAM_NAMES)
+        if unknown:
+            raise ValueError(f'Неизвестные параметры матрицы L: {sorted(unknown)}')
+        if any(self._params[name] != value for name, value in params.items()):
+            self._params.update(params)
+            self._blocks = None
+            self._L = None
+            self._L_LT = None
+        return self
+
+    def _column_offsets(self):
+        n_1, n1, n2, n3, n4 = self.params
+        return np.cumsum([0, n2*n3*n4, n1*n3*n4, n1*n2*n4, n1*n2*n3])
+
+    def _structure(self):
+        """
+        Описание текущей матрицы: блоки строк и их ненулевые подблоки
+
+        Возвращает:
+            layout - описание блоков (см. _L_block_layout)
+            blocks - для каждого блока строк список (группа столбцов, ключ подблока)
+        """
+        layout = _L_block_layout(*self.params)
+        if self._blocks is not None:
+            return layout, self._blocks
+
+        col_offsets = self._column_offsets()
+        used = set()
+        blocks = []
+        for block_idx, (height, sub_blocks) in enumerate(layout):
+            entries = []
+            col_start = 0
+            for sub_idx, (width, sign, factors) in enumerate(sub_blocks):
+                if factors is not None:
+                    group = int(np.searchsorted(col_offsets, col_start, side='right')) - 1
+                    # Позиции подблока определяются его местом в L и размерами множителей
+                    key = (block_idx, sub_idx, tuple((f[0], f[1]) for f in factors))
+                    if key in self._patterns:
+                        self.stats['pattern_hits'] += 1
+                    else:
+                        self.stats['pattern_misses'] += 1
+                        f_rows, f_cols, rows, cols = _kron_pattern(factors)
+                        if (f_rows, f_cols) != (height, width):
+                            raise ValueError(f'Размер подблока {f_rows}x{f_cols} в блоке z_{block_idx + 1} '
+                                             f'не совпадает с ожидаемым {height}x{width}')
+                        # Подблок хранится в координатах своей группы столбцов
+                        cols = cols + (col_start - col_offsets[group])
+                        group_width = col_offsets[group + 1] - col_offsets[group]
+                        self._patterns[key] = sp.csr_matrix(
+                            (np.full(rows.size, sign, dtype=self.dtype), (rows, cols)), shape=(height, group_width))
+                    used.add(key)
+                    entries.append((group, key))
+                col_start += width
+            blocks.append(entries)
+
+        # Подблоки, не нужные текущим параметрам, удаляются из кэша
+        self._patterns = {key: value for key, value in self._patterns.items() if key in used}
+        self._blocks = blocks
+        return layout, blocks
+
+    def build(self):
+        """
+        Собирает матрицу L из кэшированных подблоков
+
+        Блоки строк склеиваются только после изменения параметров; при
+        неизменных параметрах возвращается ранее собранная матрица.
+
+        Возвращает:
+            L - разреженная матрица (совпадает с build_L_sparse)
+            block_coords - структура координат для визуализации блоков
+        """
+        if self._L is not None:
+            self.stats['assembled_hits'] += 1
+            return self._L
+        layout, blocks = self._structure()
+        widths = np.diff(self._column_offsets())
+
+        # Блоки строк склеиваются из подблоков CSR без сортировки индексов
+        block_rows = []
+        for (height, _), entries in zip(layout, blocks):
+            groups = dict(entries)
+            row = [self._patterns[groups[g]] if g in groups else sp.csr_matrix((height, width), dtype=self.dtype)
+                   for g, width in enumerate(widths)]
+            block_rows.append(sp.hstack(row, format='csr'))
+        L = sp.vstack(block_rows, format='csr').asformat(self.format)
+
+        n_1, n1, n2, n3, n4 = self.params
+        self._L = L, _layout_block_coordinates(layout, n1, n2, n3, n4)
+        return self._L
+
+    def _LLT_blocks(self):
+        """
+        Блоки z_i·z_j^T матрицы L·L^T для i <= j (с кэшированием)
+
+        Возвращает:
+            heights - размеры блоков строк
+            products - словарь {(i, j): (блок CSR, транспонированный блок CSR)}
+        """
+        n_1, n1, n2, n3, n4 = self.params
+        if n_1 != 1:
+            raise ValueError('Блочная структура матрицы L определена только для n_1 = 1')
+
+        heights, layout = _LLT_block_layout(n1, n2, n3, n4)
+        # Коэффициенты блоков не превосходят n1 + n2 + n3 + n4
+        dtype = _accumulation_dtype(self.dtype, n1 + n2 + n3 + n4)
+        products = {}
+        cache = {}
+        for (i, j), (coef, factors) in layout.items():
+            key = (i, j, coef, dtype, tuple((f[0], f[1]) for f in factors))
+            block = self._products.get(key)
+            if block is None:
+                self.stats['product_misses'] += 1
+                product = _LLT_block(coef, factors, (heights[i], heights[j]), dtype)
+                transposed = product.T.tocsr()
+                transposed.sort_indices()
+                block = (product, transposed)
+            else:
+                self.stats['product_hits'] += 1
+            cache[key] = products[i, j] = block
+
+        # Блоки, не нужные текущим параметрам, удаляются из кэша
+        self._products = cache
+        return heights, products
+
+    def LLT(self):
+        """
+        Собирает L·L^T из кэшированных блоков z_i·z_j^T
+
+        Блоки на диагонали и выше строятся по явным формулам (см.
+        _LLT_block_layout), блоки ниже диагонали берутся транспонированием.
+        Блоки хранятся в формате CSR с упорядоченными индексами и
+        склеиваются без сортировки, поэтому сборка занимает O(nnz(L·L^T));
+        при неизменных параметрах возвращается ранее собранная матрица.
+
+        Возвращает:
+            L_LT - разреженная матрица L·L^T
+        """
+        if self._L_LT is not None:
+            self.stats['assembled_hits'] += 1
+            return self._L_LT
+        heights, products = self._LLT_blocks()
+        n_1, n1, n2, n3, n4 = self.params
+        dtype = _accumulation_dtype(self.dtype, n1 + n2 + n3 + n4)
+
+        block_rows = []
+        for i, height in enumerate(heights):
+            row = []
+            for j, width in enumerate(heights):
+                block = products.get((i, j) if i <= j else (j, i))
+                if block is None:
+                    row.append(sp.csr_matrix((height, width), dtype=dtype))
+                else:
+                    row.append(block[0] if i <= j else block[1])
+            block_rows.append(sp.hstack(row, format='csr'))
+        self._L_LT = sp.vstack(block_rows, format='csr').asformat(self.format)
+        return self._L_LT
@@ -0,0 +1,156 @@
+import numpy as np
+from scipy.sparse.linalg import LinearOperator
+
+from .build_LLT_matrix import _accumulation_dtype
+
+
+class LOperator(LinearOperator):
+    """
+    Матрично-свободное представление матрицы L
+
+    Произведения L·x и L^T·y вычисляются через суммирование тензоров
+    вдоль осей, соответствующих кронекеровой структуре блоков, поэтому
+    сама матрица L никогда не хранится в памяти.
+
+    Столбцы L разбиты на четыре группы, которые интерпретируются как
+    тензоры A (n2, n3, n4), B (n1, n3, n4), C (n1, n2, n4), D (n1, n2, n3).
+    Строки L (блоки z_1, ..., z_6) соответствуют матрицам размеров
+    (n3, n4), (n2, n4), (n1, n4), (n2, n3), (n1, n3), (n1, n2).
+
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы (как в build_L_matrix)
+        dtype - тип элементов L (например, np.int8); произведение вычисляется
+                в общем типе dtype и входного вектора, целые суммы накапливаются
+                в int32 или int64 (см. _accumulation_dtype)
+    """
+
+    def __init__(self, n_1=1, n1=2, n2=3, n3=4, n4=5, dtype=np.float64):
+        if n_1 != 1:
+            raise ValueError('Блочная структура матрицы L определена только для n_1 = 1')
+
+        self.n1, self.n2, self.n3, self.n4 = n1, n2, n3, n4
+
+        # Размеры групп столбцов и блоков строк
+        self.col_shapes = [(n2, n3, n4), (n1, n3, n4), (n1, n2, n4), (n1, n2, n3)]
+        self.row_shapes = [(n3, n4), (n2, n4), (n1, n4), (n2, n3), (n1, n3), (n1, n2)]
+        self.col_offsets = np.cumsum([0] + [int(np.prod(s)) for s in self.col_shapes])
+        self.row_offsets = np.cumsum([0] + [int(np.prod(s)) for s in self.row_shapes])
+
+        super().__init__(dtype=np.dtype(dtype),
+                         shape=(int(self.row_offsets[-1]), int(self.col_offsets[-1])))
+
+    def _split(self, x, offsets, shapes):
+        """Разбивает матрицу столбцов x на блоки и приводит их к тензорному виду"""
+        k = x.shape[1]
+        return [x[offsets[i]:offsets[i + 1]].reshape(shape + (k,))
+                for i, shape in enumerate(shapes)]
+
+    def _result_dtype(self, X, row_length):
+        """
+        Тип произведения оператора на X
+
+        Параметры:
+            X - входная матрица столбцов
+            row_length - наибольшее число ненулевых элементов в строке оператора
+
+        Возвращает:
+            dtype - общий тип self.dtype и X; для целых типов - int32 или int64,
+                    в котором суммы row_length слагаемых не переполняются
+        """
+        dtype = np.result_type(self.dtype, X.dtype)
+        if np.issubdtype(dtype, np.integer):
+            scale = int(np.max(np.abs(X.astype(np.int64)), initial=0))
+            return _accumulation_dtype(dtype, row_length * scale)
+        return dtype
+
+    def _matmat(self, X):
+        X = np.asarray(X)
+        dtype = self._result_dtype(X, self.shape[1])
+        X = X.astype(dtype, copy=False)
+        A, B, C, D = self._split(X, self.col_offsets, self.col_shapes)
+
+        # Блоки z_1, ..., z_6: разность сумм вдоль общих осей
+        z_blocks = [
+            B.sum(axis=0) - A.sum(axis=0),    # z_1: (n3, n4)
+            C.sum(axis=0) - A.sum(axis=1),    # z_2: (n2, n4)
+            C.sum(axis=1) - B.sum(axis=1),    # z_3: (n1, n4)
+            D.sum(axis=0) - A.sum(axis=2),    # z_4: (n2, n3)
+            D.sum(axis=1) - B.sum(axis=2),    # z_5: (n1, n3)
+            D.sum(axis=2) - C.sum(axis=2),    # z_6: (n1, n2)
+        ]
+
+        k = X.shape[1]
+        return np.concatenate([z.reshape(-1, k) for z in z_blocks]).astype(dtype, copy=False)
+
+    def _rmatmat(self, Y):
+        Y = np.asarray(Y)
+        dtype = self._result_dtype(Y, self.shape[0])
+        Y = Y.astype(dtype, copy=False)
+        y1, y2, y3, y4, y5, y6 = self._split(Y, self.row_offsets, self.row_shapes)
+
+        # Каждый элемент группы столбцов собирает вклады трех блоков строк
+        A = -(y1[None, :, :] + y2[:, None, :] + y4[:, :, None])   # (n2, n3, n4)
+        B = y1[None, :, :] - y3[:, None, :] - y5[:, :, None]      # (n1, n3, n4)
+        C = y2[None, :, :] + y3[:, None, :] - y6[:, :, None]      # (n1, n2, n4)
+        D = y4[None, :, :] + y5[:, None, :] + y6[:, :, None]      # (n1, n2, n3)
+
+        k = Y.shape[1]
+        return np.concatenate([t.reshape(-1, k) for t in (A, B, C, D)]).astype(dtype, copy=False)
+
+    def _matvec(self, x):
+        return self._matmat(np.asarray(x).reshape(-1, 1)).ravel()
+
+    def _rmatvec(self, y):
+        return self._rmatmat(np.asarray(y).reshape(-1, 1)).ravel()
+
+    def _adjoint(self):
+        return _LTOperator(self)
+
+    def llt_matvec(self, y):
+        """
+        Вычисляет произведение (L·L^T)·y без построения L и L·L^T
+
+        Параметры:
+            y - вектор (или матрица столбцов) длины L.shape[0]
+
+        Возвращает:
+            вектор (L·L^T)·y
+        """
+        y = np.asarray(y)
+        if y.ndim == 1:
+            return self._matvec(self._rmatvec(y))
+        return self._matmat(self._rmatmat(y))
+
+    def LLT(self):
+        """
+        Возвращает матрично-свободный оператор L·L^T
+
+        Оператор симметричен, поэтому подходит для scipy.sparse.linalg.eigsh
+        и других итерационных методов.
+        """
+        return LinearOperator(shape=(self.shape[0], self.shape[0]), dtype=self.dtype,
+                              matvec=self.llt_matvec, rmatvec=self.llt_matvec,
+                              matmat=self.llt_matvec)
+
+
+class _LTOperator(LinearOperator):
+    """Транспонированный оператор L^T (используется в LOperator.T и LOperator.H)"""
+
+    def __init__(self, L_op):
+        self.L_op = L_op
+        super().__init__(dtype=L_op.dtype, shape=(L_op.shape[1], L_op.shape[0]))
+
+    def _matvec(self, y):
+        return self.L_op._rmatvec(y)
+
+    def _rmatvec(self, x):
+        return self.L_op._matvec(x)
+
+    def _matmat(self, Y):
+        return self.L_op._rmatmat(Y)
+
+    def _rmatmat(self, X):
+        return self.L_op._matmat(X)
+
+    def _adjoint(self):
+        return self.L_op
@@ -7,35 +7,106 @@ This package provides tools for:
 - Computing and visualizing eigenvalues
 - Analyzing matrix rank
 - Saving analysis results to files
+
+Submodules are imported lazily: "import matrix_analysis" loads nothing
+but this file, and matplotlib is imported only when a plotting function
+is first accessed.
 """
 
-# Import all important functions
-from .build_L_matrix import build_L_matrix
-from .visualize_matrix import visualize_matrix
-from .visualize_eigenvalues import visualize_eigenvalues
-from .display_matrix_blocks import display_matrix_blocks
-from .compute_matrix_rank import compute_matrix_rank
-from .create_custom_colormap import create_custom_colormap
-from .matrix_analysis_functions import save_characteristic_polynomial
-from .save_matrix_to_file import save_matrix_to_file
+import importlib
+import sys
+import types
 
 # Define package metadata
 __version__ = "0.1.0"
 __author__ = "Elena"
 __description__ = "Tools for analyzing matrices"
 
+# Public name -> submodule that defines it (loaded on first access)
+_EXPORTS = {
+    'build_L_matrix': 'build_L_matrix',
+    'build_L_sparse': 'build_L_matrix',
+    'build_L_basis': 'build_L_matrix',
+    'L_basis_row_map': 'build_L_matrix',
+    'LBuilder': 'L_builder',
+    'build_LLT_sparse': 'build_LLT_matrix',
+    'L_LT_product': 'build_LLT_matrix',
+    'block_eigh': 'block_decomposition',
+    'LLT_block_eigh': 'block_decomposition',
+    'diagonal_blocks': 'block_decomposition',
+    'batch_analyze': 'batch_analysis',
+    'batched_eigvalsh': 'batch_analysis',
+    'batched_matrix_rank': 'batch_analysis',
+    'LOperator': 'L_operator',
+    'visualize_matrix': 'visualize_matrix',
+    'downsample_matrix': 'visualize_matrix',
+    'FigureRenderer': 'rendering',
+    'render_many': 'rendering',
+    'visualize_eigenvalues': 'visualize_eigenvalues',
+    'display_matrix_blocks': 'display_matrix_blocks',
+    'compute_matrix_rank': 'compute_matrix_rank',
+    'compute_L_rank': 'compute_matrix_rank',
+    'find_basis_rows': 'basis',
+    'rref_mod_p': 'basis',
+    'SpectralAnalysis': 'spectral_analysis',
+    'analytic_spectrum': 'analytic_spectrum',
+    'analytic_eigenvalues': 'analytic_spectrum',
+    'verify_analytic_spectrum': 'analytic_spectrum',
+    'cluster_eigenvalues': 'spectrum_summary',
+    'compare_spectra': 'spectrum_summary',
+    'format_spectrum_summary': 'spectrum_summary',
+    'create_custom_colormap': 'create_custom_colormap',
+    'save_characteristic_polynomial': 'matrix_analysis_functions',
+    'charpoly_modular': 'characteristic_polynomial',
+    'charpoly_from_factors': 'characteristic_polynomial',
+    'factored_characteristic_polynomial': 'characteristic_polynomial',
+    'save_matrix_to_file': 'save_matrix_to_file',
+    'write_matrix_text': 'matrix_export',
+    'write_matrix_triplets': 'matrix_export',
+    'save_matrix': 'matrix_store',
+    'load_matrix': 'matrix_store',
+    'load_metadata': 'matrix_store',
+    'run_sweep': 'sweep',
+    'parameter_grid': 'sweep',
+    'MatrixCache': 'cache',
+    'RunReport': 'instrumentation',
+    'Pipeline': 'pipeline',
+}
+
 # Define what should be imported with "from matrix_analysis import *"
-__all__ = [
-    'build_L_matrix',
-    'visualize_matrix',
-    'visualize_eigenvalues',
-    'display_matrix_blocks',
-    'compute_matrix_rank',
-    'create_custom_colormap',
-    'save_characteristic_polynomial',
-    'save_matrix_to_file'
-]
-
-# Welcome message that will display when the package is imported directly
-print("Matrix Analysis Toolkit v{}".format(__version__))
-print("Use help(matrix_analysis) for more information on available functions.")
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Импортирует подмодуль при первом обращении к экспортируемому имени"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    # Последующие обращения не проходят через __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _LazyPackage(types.ModuleType):
+    """
+    Модуль пакета, в котором экспортируемые функции не заменяются одноименными подмодулями
+
+    При импорте подмодуля (например, build_L_matrix) система импорта
+    записывает его в атрибут пакета с тем же именем. Вместо подмодуля
+    сохраняется одноименная функция, как это было при явном импорте.
+    """
+
+    def __setattr__(self, name, value):
+        if (name in _EXPORTS and isinstance(value, types.ModuleType)
+                and value.__name__ == f'{__name__}.{name}'):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyPackage
@@ -0,0 +1,468 @@
+import numpy as np
+
+
+# Тип структурированного массива "значение - кратность"
+SPECTRUM_DTYPE = np.dtype([('value', np.int64), ('multiplicity', np.int64)])
+
+
+def _E(n):
+    """Единичная матрица размера n×n"""
+    return np.eye(n)
+
+
+def _I(rows, cols=None):
+    """Матрица из единиц размера rows×cols"""
+    if cols is None:
+        cols = rows
+    return np.ones((rows, cols))
+
+
+def _Z(rows, cols):
+    """Нулевая матрица размера rows×cols"""
+    return np.zeros((rows, cols))
+
+
+def Q_star(n):
+    """
+    Специальная матрица Q* размера n×(n-1):
+    Первая строка из единиц, остальное — минус единичная матрица
+    """
+    if n <= 1:
+        return np.empty((n, 0))
+    return np.vstack([np.ones((1, n-1)), -np.eye(n-1)])
+
+
+# Теоретические собственные векторы L·L^T (перенесены из analysis_master.ipynb).
+# Каждая функция возвращает (λ, список матриц собственных векторов по столбцам, кратность).
+# Строки векторов упорядочены по блокам z_1, ..., z_6 матрицы L.
+
+def eig1(n1, n2, n3, n4):
+    """λ = n1 + n2 + n3 + n4, кратность = 3"""
+    eigenvalue = n1 + n2 + n3 + n4
+    multiplicity = 3
+    
+    block1_1 = n1 * np.kron(np.ones((1, n3)), np.ones((1, n4)))
+    block1_2 = 0 * np.kron(np.ones((1, n2)), np.ones((1, n4)))
+    block1_3 = -n3 * np.kron(np.ones((1, n1)), np.ones((1, n4)))
+    block1_4 = 0 * np.kron(np.ones((1, n2)), np.ones((1, n3)))
+    block1_5 = -n4 * np.kron(np.ones((1, n1)), np.ones((1, n3)))
+    block1_6 = 0 * np.kron(np.ones((1, n1)), np.ones((1, n2)))
+    V1 = np.hstack((block1_1, block1_2, block1_3, block1_4, block1_5, block1_6))
+    
+    block2_1 = 0 * np.kron(np.ones((1, n3)), np.ones((1, n4)))
+    block2_2 = n1 * np.kron(np.ones((1, n2)), np.ones((1, n4)))
+    block2_3 = n2 * np.kron(np.ones((1, n1)), np.ones((1, n4)))
+    block2_4 = 0 * np.kron(np.ones((1, n2)), np.ones((1, n3)))
+    block2_5 = 0 * np.kron(np.ones((1, n1)), np.ones((1, n3)))
+    block2_6 = -n4 * np.kron(np.ones((1, n1)), np.ones((1, n2)))
+    V2 = np.hstack((block2_1, block2_2, block2_3, block2_4, block2_5, block2_6))
+    
+    block3_1 = 0 * np.kron(np.ones((1, n3)), np.ones((1, n4)))
+    block3_2 = 0 * np.kron(np.ones((1, n2)), np.ones((1, n4)))
+    block3_3 = 0 * np.kron(np.ones((1, n1)), np.ones((1, n4)))
+    block3_4 = n1 * np.kron(np.ones((1, n2)), np.ones((1, n3)))
+    block3_5 = n2 * np.kron(np.ones((1, n1)), np.ones((1, n3)))
+    block3_6 = n3 * np.kron(np.ones((1, n1)), np.ones((1, n2)))
+    V3 = np.hstack((block3_1, block3_2, block3_3, block3_4, block3_5, block3_6))
+    
+    return eigenvalue, [V1.T, V2.T, V3.T], multiplicity
+
+
+def eig2(n1, n2, n3, n4):
+    """λ = n1 + n2 + n3, кратность = 2*(n4-1)"""
+    lambda_val = n1 + n2 + n3
+    multiplicity = 2 * (n4 - 1)
+    if n4 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn4 = Q_star(n4)
+    
+    block1_1 = n1 * np.kron(_I(n3, 1), Qn4)
+    block1_2 = _Z(n2*n4, n4-1)
+    block1_3 = -n3 * np.kron(_I(n1, 1), Qn4)
+    block1_4 = _Z(n2*n3, n4-1)
+    block1_5 = _Z(n1*n3, n4-1)
+    block1_6 = _Z(n1*n2, n4-1)
+    v1 = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    block2_1 = _Z(n3*n4, n4-1)
+    block2_2 = n1 * np.kron(_I(n2, 1), Qn4)
+    block2_3 = n2 * np.kron(_I(n1, 1), Qn4)
+    block2_4 = _Z(n2*n3, n4-1)
+    block2_5 = _Z(n1*n3, n4-1)
+    block2_6 = _Z(n1*n2, n4-1)
+    v2 = np.vstack([block2_1, block2_2, block2_3, block2_4, block2_5, block2_6])
+    
+    return lambda_val, [v1, v2], multiplicity
+
+
+def eig3(n1, n2, n3, n4):
+    """λ = n1 + n2 + n4, кратность = 2*(n3-1)"""
+    lambda_val = n1 + n2 + n4
+    multiplicity = 2 * (n3 - 1)
+    if n3 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn3 = Q_star(n3)
+    block1_1 = _Z(n3*n4, n3-1)
+    block1_2 = _Z(n2*n4, n3-1)
+    block1_3 = _Z(n1*n4, n3-1)
+    block1_4 = n1 * np.kron(_I(n2, 1), Qn3)
+    block1_5 = n2 * np.kron(_I(n1, 1), Qn3)
+    block1_6 = _Z(n1*n2, n3-1)
+    v1 = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    block2_1 = n2 * np.kron(Qn3, _I(n4, 1))
+    block2_2 = _Z(n2*n4, n3-1)
+    block2_3 = _Z(n1*n4, n3-1)
+    block2_4 = n4 * np.kron(_I(n2, 1), Qn3)
+    block2_5 = _Z(n1*n3, n3-1)
+    block2_6 = _Z(n1*n2, n3-1)
+    v2 = np.vstack([block2_1, block2_2, block2_3, block2_4, block2_5, block2_6])
+    
+    return lambda_val, [v1, v2], multiplicity
+
+
+def eig4(n1, n2, n3, n4):
+    """λ = n1 + n3 + n4, кратность = 2*(n2-1)"""
+    lambda_val = n1 + n3 + n4
+    multiplicity = 2 * (n2 - 1)
+    if n2 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn2 = Q_star(n2)
+    block1_1 = _Z(n3*n4, n2-1)
+    block1_2 = n3 * np.kron(Qn2, _I(n4, 1))
+    block1_3 = _Z(n1*n4, n2-1)
+    block1_4 = n4 * np.kron(Qn2, _I(n3, 1))
+    block1_5 = _Z(n1*n3, n2-1)
+    block1_6 = _Z(n1*n2, n2-1)
+    v1 = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    block2_1 = _Z(n3*n4, n2-1)
+    block2_2 = _Z(n2*n4, n2-1)
+    block2_3 = _Z(n1*n4, n2-1)
+    block2_4 = n1 * np.kron(Qn2, _I(n3, 1))
+    block2_5 = _Z(n1*n3, n2-1)
+    block2_6 = n3 * np.kron(_I(n1, 1), Qn2)
+    v2 = np.vstack([block2_1, block2_2, block2_3, block2_4, block2_5, block2_6])
+    
+    return lambda_val, [v1, v2], multiplicity
+
+
+def eig5(n1, n2, n3, n4):
+    """λ = n2 + n3 + n4, кратность = 2*(n1-1)"""
+    lambda_val = n2 + n3 + n4
+    multiplicity = 2 * (n1 - 1)
+    if n1 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn1 = Q_star(n1)
+    block1_1 = _Z(n3*n4, n1-1)
+    block1_2 = _Z(n2*n4, n1-1)
+    block1_3 = n3 * np.kron(Qn1, _I(n4, 1))
+    block1_4 = _Z(n2*n3, n1-1)
+    block1_5 = n4 * np.kron(Qn1, _I(n3, 1))
+    block1_6 = _Z(n1*n2, n1-1)
+    v1 = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    block2_1 = _Z(n3*n4, n1-1)
+    block2_2 = _Z(n2*n4, n1-1)
+    block2_3 = _Z(n1*n4, n1-1)
+    block2_4 = _Z(n2*n3, n1-1)
+    block2_5 = n2 * np.kron(Qn1, _I(n3, 1))
+    block2_6 = n3 * np.kron(Qn1, _I(n2, 1))
+    v2 = np.vstack([block2_1, block2_2, block2_3, block2_4, block2_5, block2_6])
+    
+    return lambda_val, [v1, v2], multiplicity
+
+
+def eig6(n1, n2, n3, n4):
+    """λ = n1 + n2, кратность = (n3-1)*(n4-1)"""
+    lambda_val = n1 + n2
+    multiplicity = (n3 - 1) * (n4 - 1)
+    if n3 <= 1 or n4 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn3 = Q_star(n3)
+    Qn4 = Q_star(n4)
+    block1_1 = np.kron(Qn3, Qn4)
+    block1_2 = _Z(n2*n4, (n3-1)*(n4-1))
+    block1_3 = _Z(n1*n4, (n3-1)*(n4-1))
+    block1_4 = _Z(n2*n3, (n3-1)*(n4-1))
+    block1_5 = _Z(n1*n3, (n3-1)*(n4-1))
+    block1_6 = _Z(n1*n2, (n3-1)*(n4-1))
+    v = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    return lambda_val, [v], multiplicity
+
+
+def eig7(n1, n2, n3, n4):
+    """λ = n1 + n3, кратность = (n2-1)*(n4-1)"""
+    lambda_val = n1 + n3
+    multiplicity = (n2 - 1) * (n4 - 1)
+    if n2 <= 1 or n4 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn2 = Q_star(n2)
+    Qn4 = Q_star(n4)
+    block1_1 = _Z(n3*n4, (n2-1)*(n4-1))
+    block1_2 = np.kron(Qn2, Qn4)
+    block1_3 = _Z(n1*n4, (n2-1)*(n4-1))
+    block1_4 = _Z(n2*n3, (n2-1)*(n4-1))
+    block1_5 = _Z(n1*n3, (n2-1)*(n4-1))
+    block1_6 = _Z(n1*n2, (n2-1)*(n4-1))
+    v = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    return lambda_val, [v], multiplicity
+
+
+def eig8(n1, n2, n3, n4):
+    """λ = n1 + n4, кратность = (n2-1)*(n3-1)"""
+    lambda_val = n1 + n4
+    multiplicity = (n2 - 1) * (n3 - 1)
+    if n2 <= 1 or n3 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn2 = Q_star(n2)
+    Qn3 = Q_star(n3)
+    block1_1 = _Z(n3*n4, (n2-1)*(n3-1))
+    block1_2 = _Z(n2*n4, (n2-1)*(n3-1))
+    block1_3 = _Z(n1*n4, (n2-1)*(n3-1))
+    block1_4 = np.kron(Qn2, Qn3)
+    block1_5 = _Z(n1*n3, (n2-1)*(n3-1))
+    block1_6 = _Z(n1*n2, (n2-1)*(n3-1))
+    v = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    return lambda_val, [v], multiplicity
+
+
+def eig9(n1, n2, n3, n4):
+    """λ = n2 + n3, кратность = (n1-1)*(n4-1)"""
+    lambda_val = n2 + n3
+    multiplicity = (n1 - 1) * (n4 - 1)
+    if n1 <= 1 or n4 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn1 = Q_star(n1)
+    Qn4 = Q_star(n4)
+    block1_1 = _Z(n3*n4, (n1-1)*(n4-1))
+    block1_2 = _Z(n2*n4, (n1-1)*(n4-1))
+    block1_3 = np.kron(Qn1, Qn4)
+    block1_4 = _Z(n2*n3, (n1-1)*(n4-1))
+    block1_5 = _Z(n1*n3, (n1-1)*(n4-1))
+    block1_6 = _Z(n1*n2, (n1-1)*(n4-1))
+    v = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    return lambda_val, [v], multiplicity
+
+
+def eig10(n1, n2, n3, n4):
+    """λ = n2 + n4, кратность = (n1-1)*(n3-1)"""
+    lambda_val = n2 + n4
+    multiplicity = (n1 - 1) * (n3 - 1)
+    if n1 <= 1 or n3 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn1 = Q_star(n1)
+    Qn3 = Q_star(n3)
+    block1_1 = _Z(n3*n4, (n1-1)*(n3-1))
+    block1_2 = _Z(n2*n4, (n1-1)*(n3-1))
+    block1_3 = _Z(n1*n4, (n1-1)*(n3-1))
+    block1_4 = _Z(n2*n3, (n1-1)*(n3-1))
+    block1_5 = np.kron(Qn1, Qn3)
+    block1_6 = _Z(n1*n2, (n1-1)*(n3-1))
+    v = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    return lambda_val, [v], multiplicity
+
+
+def eig11(n1, n2, n3, n4):
+    """λ = n3 + n4, кратность = (n1-1)*(n2-1)"""
+    lambda_val = n3 + n4
+    multiplicity = (n1 - 1) * (n2 - 1)
+    if n1 <= 1 or n2 <= 1:
+        return lambda_val, [], multiplicity
+    
+    Qn1 = Q_star(n1)
+    Qn2 = Q_star(n2)
+    block1_1 = _Z(n3*n4, (n1-1)*(n2-1))
+    block1_2 = _Z(n2*n4, (n1-1)*(n2-1))
+    block1_3 = _Z(n1*n4, (n1-1)*(n2-1))
+    block1_4 = _Z(n2*n3, (n1-1)*(n2-1))
+    block1_5 = _Z(n1*n3, (n1-1)*(n2-1))
+    block1_6 = np.kron(Qn1, Qn2)
+    v = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    return lambda_val, [v], multiplicity
+
+
+def eig12(n1, n2, n3, n4):
+    """λ = 0, кратность = n1 + n2 + n3 + n4 - 1"""
+    lambda_val = 0
+    multiplicity = n1 + n2 + n3 + n4 - 1
+    if multiplicity <= 0:
+        return lambda_val, [], multiplicity
+    
+    block1_1 = -np.kron(_I(n3, 1), _E(n4))
+    block1_2 = np.kron(_I(n2, 1), _E(n4))
+    block1_3 = -np.kron(_I(n1, 1), _E(n4))
+    block1_4 = _Z(n2*n3, n4)
+    block1_5 = _Z(n1*n3, n4)
+    block1_6 = _Z(n1*n2, n4)
+    v1 = np.vstack([block1_1, block1_2, block1_3, block1_4, block1_5, block1_6])
+    
+    block2_1 = -np.kron(_E(n3), _I(n4, 1))
+    block2_2 = _Z(n2*n4, n3)
+    block2_3 = _Z(n1*n4, n3)
+    block2_4 = np.kron(_I(n2, 1), _E(n3))
+    block2_5 = -np.kron(_I(n1, 1), _E(n3))
+    block2_6 = _Z(n1*n2, n3)
+    v2 = np.vstack([block2_1, block2_2, block2_3, block2_4, block2_5, block2_6])
+    
+    block3_1 = _Z(n3*n4, n2)
+    block3_2 = -np.kron(_E(n2), _I(n4, 1))
+    block3_3 = _Z(n1*n4, n2)
+    block3_4 = np.kron(_E(n2), _I(n3, 1))
+    block3_5 = _Z(n1*n3, n2)
+    block3_6 = -np.kron(_I(n1, 1), _E(n2))
+    v3 = np.vstack([block3_1, block3_2, block3_3, block3_4, block3_5, block3_6])
+    
+    block4_1 = _Z(n3*n4, n1-1)
+    block4_2 = _Z(n2*n4, n1-1)
+    block4_3 = -np.kron(Q_star(n1), _I(n4, 1))
+    block4_4 = _Z(n2*n3, n1-1)
+    block4_5 = np.kron(Q_star(n1), _I(n3, 1))
+    block4_6 = -np.kron(Q_star(n1), _I(n2, 1))
+    v4 = np.vstack([block4_1, block4_2, block4_3, block4_4, block4_5, block4_6])
+    
+    return lambda_val, [v1, v2, v3, v4], multiplicity
+
+
+EIGENVECTOR_BUILDERS = [eig1, eig2, eig3, eig4, eig5, eig6, eig7, eig8, eig9, eig10, eig11, eig12]
+
+
+def _spectrum_terms(n1, n2, n3, n4):
+    """Собственные числа и кратности по формулам eig1..eig12 (без построения векторов)"""
+    return [
+        (n1 + n2 + n3 + n4, 3),
+        (n1 + n2 + n3, 2 * (n4 - 1)),
+        (n1 + n2 + n4, 2 * (n3 - 1)),
+        (n1 + n3 + n4, 2 * (n2 - 1)),
+        (n2 + n3 + n4, 2 * (n1 - 1)),
+        (n1 + n2, (n3 - 1) * (n4 - 1)),
+        (n1 + n3, (n2 - 1) * (n4 - 1)),
+        (n1 + n4, (n2 - 1) * (n3 - 1)),
+        (n2 + n3, (n1 - 1) * (n4 - 1)),
+        (n2 + n4, (n1 - 1) * (n3 - 1)),
+        (n3 + n4, (n1 - 1) * (n2 - 1)),
+        (0, n1 + n2 + n3 + n4 - 1),
+    ]
+
+
+def analytic_spectrum(n1, n2, n3, n4):
+    """
+    Вычисляет спектр L·L^T по явным формулам, без построения матрицы
+    
+    Совпадающие собственные числа (например, при n1 = n2) объединяются,
+    их кратности суммируются.
+    
+    Параметры:
+        n1, n2, n3, n4 - параметры матрицы L
+        
+    Возвращает:
+        spectrum - структурированный массив SPECTRUM_DTYPE с полями 'value' и
+                   'multiplicity', отсортированный по убыванию собственных чисел
+    """
+    if min(n1, n2, n3, n4) < 1:
+        raise ValueError('Параметры n1..n4 должны быть натуральными числами')
+
+    multiplicities = {}
+    for value, multiplicity in _spectrum_terms(n1, n2, n3, n4):
+        if multiplicity > 0:
+            multiplicities[value] = multiplicities.get(value, 0) + multiplicity
+
+    spectrum = np.array(sorted(multiplicities.items(), reverse=True), dtype=SPECTRUM_DTYPE)
+    return spectrum
+
+
+def analytic_eigenvalues(n1, n2, n3, n4):
+    """
+    Возвращает все собственные числа L·L^T с учетом кратности
+    
+    Параметры:
+        n1, n2, n3, n4 - параметры матрицы L
+        
+    Возвращает:
+        eigenvalues - собственные числа по убыванию (тот же порядок, что и у SpectralAnalysis)
+    """
+    spectrum = analytic_spectrum(n1, n2, n3, n4)
+    return np.repeat(spectrum['value'].astype(np.float64), spectrum['multiplicity'])
+
+
+def analytic_eigenvectors(n1, n2, n3, n4):
+    """
+    Строит теоретические собственные векторы L·L^T
+    
+    Параметры:
+        n1, n2, n3, n4 - параметры матрицы L
+        
+    Возвращает:
+        eigenpairs - список пар (λ, V), где столбцы V - собственные векторы для λ
+    """
+    eigenpairs = []
+    for builder in EIGENVECTOR_BUILDERS:
+        value, vectors, multiplicity = builder(n1, n2, n3, n4)
+        if multiplicity > 0 and vectors:
+            eigenpairs.append((value, np.hstack(vectors)))
+    return eigenpairs
+
+
+def verify_analytic_spectrum(n1, n2, n3, n4, tolerance=1e-9, check_eigenvectors=True):
+    """
+    Проверяет явные формулы спектра по eigh матрицы L·L^T (для малых параметров)
+    
+    Параметры:
+        n1, n2, n3, n4 - параметры матрицы L
+        tolerance - допустимая погрешность
+        check_eigenvectors - проверять ли также собственные векторы
+        
+    Возвращает:
+        report - словарь с результатами проверки:
+            'passed' - пройдена ли проверка целиком
+            'max_eigenvalue_error' - максимальное отклонение собственных чисел
+            'max_residual' - максимальная невязка ||(L·L^T)v - λv|| по векторам
+            'rank_deficient' - список λ, для которых векторы линейно зависимы
+    """
+    from .build_L_matrix import build_L_matrix
+    from .build_LLT_matrix import L_LT_product
+
+    L, _ = build_L_matrix(1, n1, n2, n3, n4, dtype=np.int8)
+    L_LT = L_LT_product(L)
+
+    numeric = np.sort(np.linalg.eigvalsh(L_LT))[::-1]
+    analytic = analytic_eigenvalues(n1, n2, n3, n4)
+    max_eigenvalue_error = float(np.max(np.abs(numeric - analytic))) if numeric.size else 0.0
+
+    report = {
+        'params': (n1, n2, n3, n4),
+        'max_eigenvalue_error': max_eigenvalue_error,
+        'max_residual': 0.0,
+        'rank_deficient': [],
+    }
+
+    if check_eigenvectors:
+        for builder in EIGENVECTOR_BUILDERS:
+            value, vectors, multiplicity = builder(n1, n2, n3, n4)
+            if multiplicity <= 0 or not vectors:
+                continue
+            V = np.hstack(vectors)
+            residual = np.max(np.abs(L_LT @ V - value * V))
+            report['max_residual'] = max(report['max_residual'], float(residual))
+            if np.linalg.matrix_rank(V) < V.shape[1]:
+                report['rank_deficient'].append(value)
+
+    report['passed'] = (max_eigenvalue_error <= tolerance
+                        and report['max_residual'] <= tolerance
+                        and not report['rank_deficient'])
+    return report
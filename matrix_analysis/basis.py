@@ -0,0 +1,134 @@
+import numpy as np
+
+
+# Простой модуль для плотного исключения: меньше 2^20, поэтому сумма 4096
+# произведений вычетов меньше 2^53 и точно считается в float64 (через BLAS)
+_BASIS_PRIME = 1048573
+# Число слагаемых в одном частичном матричном произведении
+_DOT_CHUNK = 4096
+# Число строк, обрабатываемых за один шаг
+_BLOCK_ROWS = 128
+
+
+def _integer_rows(block, p):
+    """Плотная копия блока строк в виде вычетов по модулю p (целые значения в float64)"""
+    if hasattr(block, 'toarray'):
+        block = block.toarray()
+    block = np.asarray(block)
+    if np.issubdtype(block.dtype, np.integer):
+        # Малые целые типы (например, int8) не вмещают модуль p
+        values = block.astype(np.int64)
+    else:
+        values = np.rint(block)
+        if not np.array_equal(values, block):
+            raise ValueError('Базисные строки вычисляются точно только для целочисленных матриц')
+    return np.mod(values, p).astype(np.float64)
+
+
+def _matmul_mod(X, Y, p):
+    """Произведение X @ Y по модулю p без потери точности float64"""
+    result = np.zeros((X.shape[0], Y.shape[1]), dtype=np.float64)
+    for start in range(0, X.shape[1], _DOT_CHUNK):
+        result += X[:, start:start + _DOT_CHUNK] @ Y[start:start + _DOT_CHUNK]
+        np.fmod(result, p, out=result)
+    return result
+
+
+def _sub_mod(a, b, p):
+    """Разность (a - b) mod p для вычетов a и b из [0, p)"""
+    result = a - b
+    result[result < 0] += p
+    return result
+
+
+def rref_mod_p(matrix, p=_BASIS_PRIME, block_rows=_BLOCK_ROWS):
+    """
+    Приведенная ступенчатая форма целочисленной матрицы по модулю простого числа
+
+    Строки обрабатываются блоками: блок сначала приводится по уже найденному
+    базису одним матричным произведением, затем внутри блока выполняется
+    исключение Гаусса. Строка попадает в базис, если она не выражается
+    через предыдущие строки, поэтому basis_rows совпадает с жадным выбором
+    независимых строк по порядку. Для матриц с малыми целыми элементами
+    (как L) ранг по модулю простого числа порядка 10^6 совпадает с рангом над Q,
+    если p не делит все миноры максимального порядка.
+
+    Параметры:
+        matrix - целочисленная матрица (numpy или scipy.sparse)
+        p - простой модуль (меньше 2^20)
+        block_rows - число строк в блоке
+
+    Возвращает:
+        R - ненулевые строки приведенной ступенчатой формы (вычеты по модулю p),
+            упорядоченные по ведущим столбцам
+        pivot_columns - ведущие столбцы строк R
+        basis_rows - индексы линейно независимых строк исходной матрицы
+    """
+    if hasattr(matrix, 'tocsr'):
+        matrix = matrix.tocsr()
+    n_rows, n_cols = matrix.shape
+
+    B = np.empty((0, n_cols), dtype=np.float64)
+    pivots = []
+    basis_rows = []
+
+    for start in range(0, n_rows, block_rows):
+        X = _integer_rows(matrix[start:start + block_rows], p)
+
+        # Приведение блока по найденному базису (B в приведенной форме)
+        if pivots:
+            X = _sub_mod(X, _matmul_mod(X[:, pivots], B, p), p)
+
+        # Исключение внутри блока, строки по порядку
+        new_rows = []
+        new_pivots = []
+        for i in range(X.shape[0]):
+            nonzero = np.flatnonzero(X[i])
+            if nonzero.size == 0:
+                continue
+            c = nonzero[0]
+            # Левее ведущего столбца строка нулевая, поэтому обновляются столбцы c:
+            X[i, c:] = np.fmod(X[i, c:] * pow(int(X[i, c]), -1, p), p)
+            below = np.flatnonzero(X[i + 1:, c]) + i + 1
+            if below.size:
+                X[below, c:] = _sub_mod(X[below, c:], np.fmod(X[below, c][:, None] * X[i, c:], p), p)
+            new_rows.append(i)
+            new_pivots.append(c)
+
+        if not new_rows:
+            continue
+
+        # Обратный ход внутри новых строк и исключение их ведущих столбцов из B
+        N = X[new_rows]
+        for t in range(len(new_pivots) - 1, 0, -1):
+            c = new_pivots[t]
+            above = np.flatnonzero(N[:t, c])
+            if above.size:
+                N[above, c:] = _sub_mod(N[above, c:], np.fmod(N[above, c][:, None] * N[t, c:], p), p)
+        if pivots:
+            B = _sub_mod(B, _matmul_mod(B[:, new_pivots], N, p), p)
+
+        B = np.vstack([B, N])
+        pivots.extend(int(c) for c in new_pivots)
+        basis_rows.extend(start + i for i in new_rows)
+
+    order = np.argsort(pivots, kind='stable')
+    return B[order].astype(np.int64), np.asarray(pivots, dtype=np.int64)[order], np.asarray(basis_rows, dtype=np.int64)
+
+
+def find_basis_rows(matrix, block_rows=_BLOCK_ROWS):
+    """
+    Находит линейно независимые строки целочисленной матрицы (например, L)
+
+    Используется блочное исключение по модулю простого числа (rref_mod_p);
+    строки разреженной матрицы уплотняются по block_rows за раз.
+
+    Параметры:
+        matrix - целочисленная матрица (numpy или scipy.sparse)
+        block_rows - число строк в блоке
+
+    Возвращает:
+        basis_rows - индексы независимых строк по возрастанию (жадный выбор по
+                     порядку строк); их количество равно рангу матрицы
+    """
+    return rref_mod_p(matrix, block_rows=block_rows)[2]
@@ -0,0 +1,221 @@
+import numpy as np
+
+from .build_L_matrix import _L_block_layout, _kron_pattern
+from .compute_matrix_rank import compute_L_rank
+
+
+# Наибольшее число элементов float64 в одной стопке матриц (128 МБ)
+_MAX_STACK_ELEMENTS = 1 << 24
+
+
+def _dense(matrix):
+    """Плотная копия матрицы numpy или scipy.sparse"""
+    if hasattr(matrix, 'toarray'):
+        return matrix.toarray()
+    return np.asarray(matrix)
+
+
+def _shape_batches(shapes, max_elements=_MAX_STACK_ELEMENTS):
+    """
+    Группирует номера матриц по размеру и делит группы на стопки ограниченного объема
+
+    Параметры:
+        shapes - размеры матриц
+        max_elements - наибольшее число элементов в одной стопке
+
+    Возвращает:
+        batches - список (размер, номера матриц) в порядке первого появления размера
+    """
+    groups = {}
+    for index, shape in enumerate(shapes):
+        groups.setdefault(tuple(shape), []).append(index)
+
+    batches = []
+    for shape, indices in groups.items():
+        step = max(1, max_elements // max(1, shape[0] * shape[1]))
+        for start in range(0, len(indices), step):
+            batches.append((shape, indices[start:start + step]))
+    return batches
+
+
+def _stack(matrices, indices, dtype=np.float64):
+    """Стопка (B, m, n) из матриц с номерами indices"""
+    return np.stack([_dense(matrices[i]) for i in indices]).astype(dtype, copy=False)
+
+
+def _stack_ranks(values, shape, tolerance=None):
+    """
+    Ранги по сингулярным (или собственным) числам стопки матриц
+
+    Параметры:
+        values - массив (B, k) неотрицательных чисел
+        shape - размер каждой матрицы
+        tolerance - общий порог; None - адаптивный порог σ_max · max(m, n) · eps
+                    для каждой матрицы (как default_rank_tolerance)
+
+    Возвращает:
+        ranks - массив (B,) рангов
+    """
+    if values.shape[1] == 0:
+        return np.zeros(len(values), dtype=np.int64)
+    if tolerance is None:
+        tolerance = values.max(axis=1) * max(shape) * np.finfo(np.float64).eps
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), (len(values),))
+    return np.sum(values > tolerance[:, None], axis=1)
+
+
+def _layout_shape(layout):
+    """Размер матрицы по описанию блочной структуры (см. _L_block_layout)"""
+    return (sum(height for height, _ in layout),
+            sum(width for width, _, _ in layout[0][1]))
+
+
+def _fill_layout(out, layout, patterns):
+    """
+    Записывает элементы ±1 матрицы L в плотный массив по описанию блоков
+
+    Параметры:
+        out - плотный массив размера L
+        layout - описание блоков (см. _L_block_layout)
+        patterns - общий для наборов кэш позиций подблоков: позиции зависят
+                   только от места подблока и размеров множителей (как в LBuilder)
+
+    Размеры подблоков проверяются до записи (как в _assemble_layout), поэтому
+    несогласованные параметры (например, n_1 != 1) дают ValueError, а не
+    выход за границы out.
+
+    Возвращает:
+        nnz - число записанных ненулевых элементов
+    """
+    nnz = 0
+    row_start = 0
+    for block_idx, (height, sub_blocks) in enumerate(layout):
+        col_start = 0
+        for sub_idx, (width, sign, factors) in enumerate(sub_blocks):
+            if factors is not None:
+                dims = tuple((f[0], f[1]) for f in factors)
+                f_rows, f_cols = np.prod(dims, axis=0)
+                if (f_rows, f_cols) != (height, width):
+                    raise ValueError(f'Размер подблока {f_rows}x{f_cols} в блоке z_{block_idx + 1} '
+                                     f'не совпадает с ожидаемым {height}x{width}')
+                key = (block_idx, sub_idx, row_start, col_start, dims)
+                flat = patterns.get(key)
+                if flat is None:
+                    _, _, rows, cols = _kron_pattern(factors)
+                    flat = patterns[key] = (rows + row_start) * out.shape[1] + (cols + col_start)
+                out.flat[flat] = sign
+                nnz += flat.size
+            col_start += width
+        row_start += height
+    return nnz
+
+
+def batched_eigvalsh(matrices, max_elements=_MAX_STACK_ELEMENTS):
+    """
+    Собственные числа многих симметричных матриц пакетными вызовами eigvalsh
+
+    Матрицы одного размера собираются в стопку (B, n, n) и решаются одним
+    вызовом np.linalg.eigvalsh, поэтому накладные расходы интерпретатора и
+    вызова LAPACK приходятся на стопку, а не на каждую матрицу.
+
+    Параметры:
+        matrices - список симметричных матриц (numpy или scipy.sparse), размеры могут различаться
+        max_elements - наибольшее число элементов в одной стопке
+
+    Возвращает:
+        spectra - список массивов собственных чисел (по убыванию) в порядке matrices
+    """
+    spectra = [None] * len(matrices)
+    for shape, indices in _shape_batches([m.shape for m in matrices], max_elements):
+        values = np.linalg.eigvalsh(_stack(matrices, indices))[:, ::-1]
+        for i, row in zip(indices, values):
+            spectra[i] = row
+    return spectra
+
+
+def batched_matrix_rank(matrices, tolerance=None, method='svd', max_elements=_MAX_STACK_ELEMENTS):
+    """
+    Ранги многих матриц пакетными вызовами svd или eigvalsh
+
+    Параметры:
+        matrices - список матриц (numpy или scipy.sparse), размеры могут различаться
+        tolerance - порог для сингулярных чисел; None - адаптивный (как в compute_matrix_rank)
+        method - 'svd' (сингулярные числа стопки) или 'gram' (eigvalsh стопки
+                 меньших матриц Грама; порог задается для λ = σ²)
+        max_elements - наибольшее число элементов в одной стопке
+
+    Возвращает:
+        ranks - массив рангов в порядке matrices
+    """
+    if method not in ('svd', 'gram'):
+        raise ValueError(f'Неизвестный метод вычисления ранга: {method}')
+
+    ranks = np.zeros(len(matrices), dtype=np.int64)
+    for shape, indices in _shape_batches([m.shape for m in matrices], max_elements):
+        stack = _stack(matrices, indices)
+        if method == 'svd':
+            values = np.linalg.svd(stack, compute_uv=False)
+            ranks[indices] = _stack_ranks(values, shape, tolerance)
+        else:
+            m, n = shape
+            transposed = stack.transpose(0, 2, 1)
+            gram = stack @ transposed if m <= n else transposed @ stack
+            values = np.linalg.eigvalsh(gram)
+            ranks[indices] = _stack_ranks(values, shape, None if tolerance is None else tolerance ** 2)
+    return ranks
+
+
+def batch_analyze(grid, rank_method='eigh', max_elements=_MAX_STACK_ELEMENTS):
+    """
+    Ранг L и спектр L·L^T для многих наборов параметров пакетными вызовами LAPACK
+
+    Наборы с одинаковым размером L объединяются: элементы L записываются
+    сразу в общую стопку по кронекеровой структуре блоков (без плотных
+    kron и hstack), L·L^T вычисляется одним пакетным matmul, а
+    спектры - одним вызовом np.linalg.eigvalsh на всю стопку. Для
+    тысяч маленьких наборов время определяется LAPACK, а не
+    интерпретатором.
+
+    Параметры:
+        grid - список наборов (n_1, n1, n2, n3, n4)
+        rank_method - способ вычисления ранга:
+            'eigh' - число собственных чисел L·L^T больше порога (как SpectralAnalysis.rank)
+            'svd' - пакетное SVD стопки матриц L
+            'analytic' - явная формула compute_L_rank
+        max_elements - наибольшее число элементов в одной стопке
+
+    Возвращает:
+        results - список словарей в порядке grid с полями
+                  'params', 'shape' (размер L), 'nnz', 'rank' и 'eigenvalues' (по убыванию)
+    """
+    if rank_method not in ('eigh', 'svd', 'analytic'):
+        raise ValueError(f'Неизвестный метод вычисления ранга: {rank_method}')
+
+    grid = [tuple(params) for params in grid]
+    layouts = [_L_block_layout(*params) for params in grid]
+    results = [None] * len(grid)
+
+    for shape, indices in _shape_batches([_layout_shape(layout) for layout in layouts], max_elements):
+        L_stack = np.zeros((len(indices),) + shape, dtype=np.float32)
+        patterns = {}
+        nnz = [_fill_layout(L, layouts[i], patterns) for L, i in zip(L_stack, indices)]
+        # Суммы произведений ±1 - целые числа, меньшие 2^24, поэтому L·L^T в float32 точное
+        L_LT_stack = (L_stack @ L_stack.transpose(0, 2, 1)).astype(np.float64)
+        eigenvalues = np.linalg.eigvalsh(L_LT_stack)[:, ::-1]
+
+        if rank_method == 'svd':
+            ranks = _stack_ranks(np.linalg.svd(L_stack.astype(np.float64), compute_uv=False), shape)
+        elif rank_method == 'eigh':
+            ranks = _stack_ranks(eigenvalues, (shape[0], shape[0]))
+        else:
+            ranks = [compute_L_rank(*grid[i]) for i in indices]
+
+        for k, i in enumerate(indices):
+            results[i] = {
+                'params': grid[i],
+                'shape': shape,
+                'nnz': nnz[k],
+                'rank': int(ranks[k]),
+                'eigenvalues': eigenvalues[k],
+            }
+    return results
@@ -0,0 +1,261 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from .build_LLT_matrix import _LLT_block_layout
+
+
+# Индексы мод (n1, n2, n3, n4) строк блоков z_1, ..., z_6
+_ROW_MODES = [(3, 4), (2, 4), (1, 4), (2, 3), (1, 3), (1, 2)]
+
+
+def helmert_matrix(n):
+    """
+    Ортогональная матрица Хельмерта размера n×n
+
+    Первая строка - постоянный вектор 1/√n, остальные строки образуют
+    ортонормированный базис его ортогонального дополнения.
+    """
+    H = np.zeros((n, n))
+    if n == 0:
+        return H
+    H[0] = 1.0 / np.sqrt(n)
+    for k in range(1, n):
+        H[k, :k] = 1.0 / np.sqrt(k * (k + 1))
+        H[k, k] = -k / np.sqrt(k * (k + 1))
+    return H
+
+
+def LLT_symmetry_transform(n_1=1, n1=2, n2=3, n3=4, n4=5):
+    """
+    Ортогональное преобразование T, приводящее L·L^T к блочно-диагональному виду
+
+    Блок строк z_i индексируется парой мод (например, z_1 - парой (n3, n4)),
+    и T действует на нем как kron(H_a, H_b), где H - матрицы Хельмерта.
+    Перестановки индексов каждой моды не меняют L·L^T, поэтому
+    T·(L·L^T)·T^T распадается на независимые блоки размером не больше 6×6.
+
+    Возвращает:
+        T - разреженная ортогональная матрица размера L.shape[0]
+    """
+    import scipy.sparse as sp
+
+    if n_1 != 1:
+        raise ValueError('Блочная структура матрицы L определена только для n_1 = 1')
+    sizes = {1: n1, 2: n2, 3: n3, 4: n4}
+    return sp.block_diag([sp.csr_matrix(np.kron(helmert_matrix(sizes[a]), helmert_matrix(sizes[b])))
+                          for a, b in _ROW_MODES], format='csr')
+
+
+def _collapse_ones(factor):
+    """
+    Множитель kron после преобразования Хельмерта
+
+    H_r·1(r×c)·H_c^T = √(rc)·e_0·e_0^T, а единичная матрица не меняется.
+
+    Возвращает:
+        factor - множитель (строки, столбцы, индексы строк, индексы столбцов)
+        scale - числовой множитель
+    """
+    rows, cols, r, c = factor
+    if r.size == rows * cols and r.size > 1:
+        zero = np.zeros(1, dtype=np.int64)
+        return (rows, cols, zero, zero), np.sqrt(rows * cols)
+    return factor, 1.0
+
+
+def symmetry_reduced_LLT(n_1=1, n1=2, n2=3, n3=4, n4=5):
+    """
+    Строит T·(L·L^T)·T^T (см. LLT_symmetry_transform) по явным формулам блоков
+
+    Матрицы из единиц в кронекеровых множителях переходят в один элемент
+    √(rc), поэтому результат получается без умножения матриц и без
+    ошибок округления вне блоков.
+
+    Возвращает:
+        M - разреженная симметричная матрица (CSR), подобная L·L^T
+    """
+    import scipy.sparse as sp
+    from .build_L_matrix import _kron_pattern
+
+    if n_1 != 1:
+        raise ValueError('Блочная структура матрицы L определена только для n_1 = 1')
+
+    heights, layout = _LLT_block_layout(n1, n2, n3, n4)
+    offsets = np.cumsum([0] + heights)
+    rows_parts, cols_parts, data_parts = [], [], []
+    for (i, j), (coef, factors) in layout.items():
+        collapsed = [_collapse_ones(factor) for factor in factors]
+        scale = coef * np.prod([s for _, s in collapsed])
+        _, _, rows, cols = _kron_pattern([factor for factor, _ in collapsed])
+        data = np.full(rows.size, scale)
+        rows_parts.append(rows + offsets[i])
+        cols_parts.append(cols + offsets[j])
+        data_parts.append(data)
+        if i != j:
+            rows_parts.append(cols + offsets[j])
+            cols_parts.append(rows + offsets[i])
+            data_parts.append(data)
+
+    n = int(offsets[-1])
+    return sp.coo_matrix(
+        (np.concatenate(data_parts), (np.concatenate(rows_parts), np.concatenate(cols_parts))),
+        shape=(n, n)
+    ).tocsr()
+
+
+def diagonal_blocks(matrix):
+    """
+    Находит независимые диагональные блоки симметричной матрицы
+
+    Блоки - компоненты связности графа ненулевых элементов: после
+    перестановки строк и столбцов по компонентам матрица становится
+    блочно-диагональной.
+
+    Параметры:
+        matrix - симметричная матрица (numpy или scipy.sparse)
+
+    Возвращает:
+        labels - номер блока для каждой строки
+        sizes - размеры блоков
+    """
+    import scipy.sparse as sp
+    from scipy.sparse.csgraph import connected_components
+
+    graph = sp.csr_matrix(matrix)
+    graph.eliminate_zeros()
+    n_blocks, labels = connected_components(graph, directed=False)
+    return labels, np.bincount(labels, minlength=n_blocks)
+
+
+def _block_stacks(matrix, labels, sizes):
+    """
+    Собирает плотные диагональные блоки, сгруппированные по размеру
+
+    Возвращает:
+        groups - список (indices, stack), где indices (число блоков × размер) -
+                 номера строк блоков, stack (число блоков × размер × размер) -
+                 сами блоки
+    """
+    import scipy.sparse as sp
+
+    n = matrix.shape[0]
+    order = np.argsort(labels, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    # Положение строки внутри своего блока
+    local = np.empty(n, dtype=np.int64)
+    local[order] = np.arange(n) - np.repeat(starts, sizes)
+
+    coo = sp.csr_matrix(matrix).tocoo()
+    coo.sum_duplicates()
+    block_of_entry = labels[coo.row]
+
+    groups = []
+    for size in np.unique(sizes):
+        blocks = np.flatnonzero(sizes == size)
+        slot = np.full(len(sizes), -1, dtype=np.int64)
+        slot[blocks] = np.arange(len(blocks))
+
+        indices = order[starts[blocks][:, None] + np.arange(size)[None, :]]
+        stack = np.zeros((len(blocks), size, size))
+        mask = slot[block_of_entry] >= 0
+        rows, cols = coo.row[mask], coo.col[mask]
+        stack[slot[labels[rows]], local[rows], local[cols]] = coo.data[mask]
+        groups.append((indices, stack))
+    return groups
+
+
+def _eigh_stack(stack, compute_eigenvectors):
+    """Собственные числа (и векторы) стопки симметричных матриц"""
+    if compute_eigenvectors:
+        return np.linalg.eigh(stack)
+    return np.linalg.eigvalsh(stack), None
+
+
+def block_eigh(matrix, compute_eigenvectors=False, transform=None, max_workers=None, chunk=4096):
+    """
+    Полный спектр симметричной матрицы через разбиение на независимые блоки
+
+    Матрица разбивается на компоненты связности (diagonal_blocks), блоки
+    одного размера собираются в стопки, совпадающие блоки решаются один
+    раз, а стопки обрабатываются параллельно в пуле потоков (LAPACK
+    освобождает GIL). Время определяется самым большим блоком, а не
+    размером всей матрицы.
+
+    Параметры:
+        matrix - симметричная матрица (numpy или scipy.sparse)
+        compute_eigenvectors - вычислять ли собственные векторы
+        transform - ортогональная матрица T, если matrix = T·A·T^T (например,
+                    LLT_symmetry_transform); собственные векторы возвращаются
+                    для A, то есть умноженными на T^T
+        max_workers - число потоков (None - по числу процессоров)
+        chunk - наибольшее число блоков в одной задаче пула
+
+    Возвращает:
+        eigenvalues - собственные числа по убыванию
+        eigenvectors - собственные векторы по столбцам (None, если не вычислялись)
+    """
+    n = matrix.shape[0]
+    labels, sizes = diagonal_blocks(matrix)
+
+    groups = []
+    tasks = []
+    for indices, stack in _block_stacks(matrix, labels, sizes):
+        # Одинаковые блоки (например, копии одного сектора симметрии) решаются один раз
+        unique, inverse = np.unique(stack.reshape(len(stack), -1), axis=0, return_inverse=True)
+        unique = unique.reshape(-1, stack.shape[1], stack.shape[2])
+        for start in range(0, len(unique), chunk):
+            tasks.append((len(groups), unique[start:start + chunk]))
+        groups.append((indices, inverse.ravel()))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda task: _eigh_stack(task[1], compute_eigenvectors), tasks))
+
+    # Объединение спектров блоков (задачи одной группы идут подряд)
+    solved = [([], []) for _ in groups]
+    for (group, _), (values, vectors) in zip(tasks, results):
+        solved[group][0].append(values)
+        solved[group][1].append(vectors)
+
+    eigenvalues_parts = []
+    eigenvectors = np.zeros((n, n)) if compute_eigenvectors else None
+    column = 0
+    for (indices, inverse), (values_list, vectors_list) in zip(groups, solved):
+        values = np.concatenate(values_list)[inverse]
+        eigenvalues_parts.append(values.ravel())
+        if compute_eigenvectors:
+            vectors = np.concatenate(vectors_list)[inverse]
+            count, size = indices.shape
+            columns = column + np.arange(count * size).reshape(count, size)
+            # vectors[b, :, k] - k-й собственный вектор блока b в его строках indices[b]
+            eigenvectors[indices[:, :, None], columns[:, None, :]] = vectors
+        column += indices.size
+
+    eigenvalues = np.concatenate(eigenvalues_parts) if eigenvalues_parts else np.empty(0)
+    order = np.argsort(eigenvalues, kind='stable')[::-1]
+    eigenvalues = eigenvalues[order]
+    if compute_eigenvectors:
+        eigenvectors = eigenvectors[:, order]
+        if transform is not None:
+            eigenvectors = transform.T @ eigenvectors
+    return eigenvalues, eigenvectors
+
+
+def LLT_block_eigh(n_1=1, n1=2, n2=3, n3=4, n4=5, compute_eigenvectors=False, max_workers=None):
+    """
+    Полный спектр L·L^T через разложение по секторам симметрии
+
+    Матрица T·(L·L^T)·T^T строится по явным формулам (symmetry_reduced_LLT)
+    и решается по блокам (block_eigh); самый большой блок имеет размер 6×6.
+
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы L (n_1 = 1)
+        compute_eigenvectors - вычислять ли собственные векторы L·L^T
+        max_workers - число потоков
+
+    Возвращает:
+        eigenvalues - собственные числа L·L^T по убыванию
+        eigenvectors - собственные векторы L·L^T по столбцам (None, если не вычислялись)
+    """
+    M = symmetry_reduced_LLT(n_1, n1, n2, n3, n4)
+    transform = LLT_symmetry_transform(n_1, n1, n2, n3, n4) if compute_eigenvectors else None
+    return block_eigh(M, compute_eigenvectors, transform=transform, max_workers=max_workers)
@@ -0,0 +1,158 @@
+import numpy as np
+
+from .build_L_matrix import _eye_factor, _ones_factor, _kron_pattern
+
+
+def _LLT_block_layout(n1, n2, n3, n4):
+    """
+    Описывает блоки z_i·z_j^T матрицы L·L^T в явном кронекеровом виде
+
+    Каждый блок - произведение двух блоков строк L, состоящих из
+    подблоков ±kron(E, 1), поэтому он сам имеет вид c·kron(E, 1, ...)
+    (например, kron(1, E)·kron(1, E)^T = kron(1, E)). Формулы совпадают
+    с build_M_from_image_swapped из eigenvectors.ipynb.
+
+    Возвращает:
+        heights - размеры блоков строк z_1, ..., z_6
+        blocks - словарь {(i, j): (коэффициент, множители kron)} для i <= j;
+                 отсутствующие пары - нулевые блоки
+    """
+    E, I = _eye_factor, _ones_factor
+    heights = [n3*n4, n2*n4, n1*n4, n2*n3, n1*n3, n1*n2]
+    blocks = {
+        # Блочная строка z_1
+        (0, 0): (n1 + n2, [E(n3*n4)]),
+        (0, 1): (1, [I(n3, n2), E(n4)]),
+        (0, 2): (-1, [I(n3, n1), E(n4)]),
+        (0, 3): (1, [I(1, n2), E(n3), I(n4, 1)]),
+        (0, 4): (-1, [I(1, n1), E(n3), I(n4, 1)]),
+        # Блочная строка z_2
+        (1, 1): (n1 + n3, [E(n2*n4)]),
+        (1, 2): (1, [I(n2, n1), E(n4)]),
+        (1, 3): (1, [E(n2), I(n4, n3)]),
+        (1, 5): (-1, [I(1, n1), E(n2), I(n4, 1)]),
+        # Блочная строка z_3
+        (2, 2): (n2 + n3, [E(n1*n4)]),
+        (2, 4): (1, [E(n1), I(n4, n3)]),
+        (2, 5): (-1, [E(n1), I(n4, n2)]),
+        # Блочная строка z_4
+        (3, 3): (n1 + n4, [E(n2*n3)]),
+        (3, 4): (1, [I(n2, n1), E(n3)]),
+        (3, 5): (1, [I(1, n1), E(n2), I(n3, 1)]),
+        # Блочная строка z_5
+        (4, 4): (n2 + n4, [E(n1*n3)]),
+        (4, 5): (1, [E(n1), I(n3, n2)]),
+        # Блочная строка z_6
+        (5, 5): (n3 + n4, [E(n1*n2)]),
+    }
+    return heights, blocks
+
+
+def _accumulation_dtype(dtype, bound):
+    """
+    Тип для точного накопления произведения целочисленных матриц
+
+    Параметры:
+        dtype - тип элементов множителей
+        bound - оценка наибольшего модуля элемента произведения
+
+    Возвращает:
+        dtype - int32, если bound в него помещается, иначе int64;
+                для нецелых типов возвращается сам dtype
+    """
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.integer):
+        return dtype
+    if bound <= np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def L_LT_product(L):
+    """
+    Вычисляет L·L^T; для целочисленной L результат точный и целочисленный
+
+    Произведение целочисленной матрицы накапливается в int32 или int64
+    (см. _accumulation_dtype), чтобы элементы int8 не переполнялись.
+    Плотное произведение при этом выполняется через BLAS в float32 или
+    float64: пока модули сумм меньше 2^24 (2^53), все промежуточные
+    суммы представлены точно, а целочисленный matmul numpy не использует
+    BLAS и во много раз медленнее.
+
+    Параметры:
+        L - матрица (numpy или scipy.sparse)
+
+    Возвращает:
+        L_LT - произведение L·L^T того же вида (плотное или разреженное)
+    """
+    if not np.issubdtype(L.dtype, np.integer):
+        return L @ L.T
+
+    is_sparse = hasattr(L, 'tocsr')
+    data = L.data if is_sparse else np.asarray(L)
+    scale = int(np.max(np.abs(data.astype(np.int64)), initial=0))
+    bound = L.shape[1] * scale * scale
+    dtype = _accumulation_dtype(L.dtype, bound)
+
+    if is_sparse:
+        A = L.astype(dtype)
+        return A @ A.T
+    if bound < 2 ** 24:
+        A = data.astype(np.float32)
+    elif bound < 2 ** 53:
+        A = data.astype(np.float64)
+    else:
+        A = data.astype(dtype)
+        return A @ A.T
+    return (A @ A.T).astype(dtype)
+
+
+def _LLT_block(coef, factors, shape, dtype=np.float64):
+    """Блок c·kron(...) в формате CSR"""
+    import scipy.sparse as sp
+
+    f_rows, f_cols, rows, cols = _kron_pattern(factors)
+    if (f_rows, f_cols) != shape:
+        raise ValueError(f'Размер блока {f_rows}x{f_cols} не совпадает с ожидаемым {shape[0]}x{shape[1]}')
+    return sp.csr_matrix((np.full(rows.size, coef, dtype=dtype), (rows, cols)), shape=shape)
+
+
+def build_LLT_sparse(n_1=1, n1=2, n2=3, n3=4, n4=5, format='csr', blocks=False, dtype=np.float64):
+    """
+    Строит L·L^T по явным формулам блоков, не вычисляя произведение L на L^T
+
+    Блоки z_i·z_j^T записываются напрямую по кронекеровой структуре (см.
+    _LLT_block_layout), поэтому время и память пропорциональны числу
+    ненулевых элементов результата, а не rows²·cols, как у L @ L.T.
+
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы L (n_1 = 1)
+        format - формат разреженной матрицы scipy.sparse ('csr', 'coo', 'csc', ...)
+        blocks - если True, возвращается сетка 6×6 блоков CSR (None для нулевых
+                 блоков), пригодная для scipy.sparse.bmat
+        dtype - тип элементов; для целочисленной L (например, np.int8)
+                задается целый тип результата, например, np.int32
+
+    Возвращает:
+        L_LT - разреженная матрица L·L^T или сетка ее блоков
+    """
+    import scipy.sparse as sp
+
+    if n_1 != 1:
+        raise ValueError('Блочная структура матрицы L определена только для n_1 = 1')
+
+    heights, layout = _LLT_block_layout(n1, n2, n3, n4)
+    grid = [[None] * len(heights) for _ in heights]
+    for (i, j), (coef, factors) in layout.items():
+        block = _LLT_block(coef, factors, (heights[i], heights[j]), dtype)
+        grid[i][j] = block
+        if i != j:
+            grid[j][i] = block.T.tocsr()
+
+    if blocks:
+        return grid
+    # Пустые блоковые строки (например, z_3 при n1 = 0) задаются явно нулевыми блоками
+    for i, row in enumerate(grid):
+        if all(block is None for block in row):
+            row[i] = sp.csr_matrix((heights[i], heights[i]), dtype=dtype)
+    return sp.bmat(grid, format=format)
@@ -1,67 +1,73 @@
 import numpy as np
 
 
-def build_L_matrix(n_1=1, n1=2, n2=3, n3=4, n4=5):
+def build_L_matrix(n_1=1, n1=2, n2=3, n3=4, n4=5, sparse=False, dtype=np.float64):
     """
     Создает матрицу L с определенной блочной структурой
     
     Параметры:
         n_1, n1, n2, n3, n4 - параметры для построения матрицы
+        sparse - если True, матрица строится сразу в формате scipy.sparse (CSR)
+                 без создания плотных блоков (см. build_L_sparse)
+        dtype - тип элементов; все элементы L равны -1, 0 или 1, поэтому
+                np.int8 точно хранит L и занимает в 8 раз меньше памяти, чем float64
         
     Возвращает:
         L - построенная матрица
         block_coords - структура координат для визуализации блоков
     """
-    
+    if sparse:
+        return build_L_sparse(n_1, n1, n2, n3, n4, dtype=dtype)
+
     # Создание блоков матрицы L в прямом виде
     # Блок z_1
     z1_blocks = [
-        -np.kron(np.ones((n_1, n2)), np.eye(n3*n4)),            # Блок 1.1
-        np.kron(np.ones((n_1, n1)), np.eye(n3*n4)),             # Блок 1.2
-        np.zeros((n3*n4, n1*n2*n4 + n1*n2*n3))                 # Блок 1.3
+        -np.kron(np.ones((n_1, n2), dtype=dtype), np.eye(n3*n4, dtype=dtype)),            # Блок 1.1
+        np.kron(np.ones((n_1, n1), dtype=dtype), np.eye(n3*n4, dtype=dtype)),             # Блок 1.2
+        np.zeros((n3*n4, n1*n2*n4 + n1*n2*n3), dtype=dtype)                 # Блок 1.3
     ]
     z_1 = np.hstack(z1_blocks)
 
     # Блок z_2
     z2_blocks = [
-        -np.kron(np.kron(np.eye(n2), np.ones((n_1, n3))), np.eye(n4)), # Блок 2.1
-        np.zeros((n2*n4, n1*n3*n4)),                           # Блок 2.2
-        np.kron(np.ones((n_1, n1)), np.eye(n2*n4)),            # Блок 2.3
-        np.zeros((n2*n4, n1*n2*n3))                           # Блок 2.4
+        -np.kron(np.kron(np.eye(n2, dtype=dtype), np.ones((n_1, n3), dtype=dtype)), np.eye(n4, dtype=dtype)), # Блок 2.1
+        np.zeros((n2*n4, n1*n3*n4), dtype=dtype),                           # Блок 2.2
+        np.kron(np.ones((n_1, n1), dtype=dtype), np.eye(n2*n4, dtype=dtype)),            # Блок 2.3
+        np.zeros((n2*n4, n1*n2*n3), dtype=dtype)                           # Блок 2.4
     ]
     z_2 = np.hstack(z2_blocks)
 
     # Блок z_3
     z3_blocks = [
-        np.zeros((n1*n4, n2*n3*n4)),                          # Блок 3.1
-        -np.kron(np.kron(np.eye(n1), np.ones((n_1, n3))), np.eye(n4)), # Блок 3.2
-        np.kron(np.kron(np.eye(n1), np.ones((n_1, n2))), np.eye(n4)), # Блок 3.3
-        np.zeros((n1*n4, n1*n2*n3))                          # Блок 3.4
+        np.zeros((n1*n4, n2*n3*n4), dtype=dtype),                          # Блок 3.1
+        -np.kron(np.kron(np.eye(n1, dtype=dtype), np.ones((n_1, n3), dtype=dtype)), np.eye(n4, dtype=dtype)), # Блок 3.2
+        np.kron(np.kron(np.eye(n1, dtype=dtype), np.ones((n_1, n2), dtype=dtype)), np.eye(n4, dtype=dtype)), # Блок 3.3
+        np.zeros((n1*n4, n1*n2*n3), dtype=dtype)                          # Блок 3.4
     ]
     z_3 = np.hstack(z3_blocks)
 
     # Блок z_4
     z4_blocks = [
-        -np.kron(np.eye(n2*n3), np.ones((n_1, n4))),         # Блок 4.1
-        np.zeros((n2*n3, n1*n3*n4 + n1*n2*n4)),              # Блок 4.2
-        np.kron(np.ones((n_1, n1)), np.eye(n2*n3))           # Блок 4.3
+        -np.kron(np.eye(n2*n3, dtype=dtype), np.ones((n_1, n4), dtype=dtype)),         # Блок 4.1
+        np.zeros((n2*n3, n1*n3*n4 + n1*n2*n4), dtype=dtype),              # Блок 4.2
+        np.kron(np.ones((n_1, n1), dtype=dtype), np.eye(n2*n3, dtype=dtype))           # Блок 4.3
     ]
     z_4 = np.hstack(z4_blocks)
 
     # Блок z_5
     z5_blocks = [
-        np.zeros((n1*n3, n2*n3*n4)),                        # Блок 5.1
-        -np.kron(np.eye(n1*n3), np.ones((n_1, n4))),         # Блок 5.2
-        np.zeros((n1*n3, n1*n2*n4)),                        # Блок 5.3
-        np.kron(np.kron(np.eye(n1), np.ones((n_1, n2))), np.eye(n3)) # Блок 5.4
+        np.zeros((n1*n3, n2*n3*n4), dtype=dtype),                        # Блок 5.1
+        -np.kron(np.eye(n1*n3, dtype=dtype), np.ones((n_1, n4), dtype=dtype)),         # Блок 5.2
+        np.zeros((n1*n3, n1*n2*n4), dtype=dtype),                        # Блок 5.3
+        np.kron(np.kron(np.eye(n1, dtype=dtype), np.ones((n_1, n2), dtype=dtype)), np.eye(n3, dtype=dtype)) # Блок 5.4
     ]
     z_5 = np.hstack(z5_blocks)
 
     # Блок z_6
     z6_blocks = [
-        np.zeros((n1*n2, n2*n3*n4 + n1*n3*n4)),              # Блок 6.1
-        -np.kron(np.eye(n1*n2), np.ones((n_1, n4))),          # Блок 6.2
-        np.kron(np.eye(n1*n2), np.ones((n_1, n3)))           # Блок 6.3
+        np.zeros((n1*n2, n2*n3*n4 + n1*n3*n4), dtype=dtype),              # Блок 6.1
+        -np.kron(np.eye(n1*n2, dtype=dtype), np.ones((n_1, n4), dtype=dtype)),          # Блок 6.2
+        np.kron(np.eye(n1*n2, dtype=dtype), np.ones((n_1, n3), dtype=dtype))           # Блок 6.3
     ]
     z_6 = np.hstack(z6_blocks)
 
@@ -90,6 +96,24 @@ def compute_block_coordinates(z_blocks, all_sub_blocks, n1, n2, n3, n4):
     Возвращает:
         coords - словарь с координатами блоков
     """
+    block_heights = [z_block.shape[0] for z_block in z_blocks]
+    sub_block_widths = [[sub_block.shape[1] for sub_block in sub_blocks]
+                        for sub_blocks in all_sub_blocks]
+    return compute_block_coordinates_from_sizes(block_heights, sub_block_widths, n1, n2, n3, n4)
+
+
+def compute_block_coordinates_from_sizes(block_heights, sub_block_widths, n1, n2, n3, n4):
+    """
+    Вычисляет координаты блоков по их размерам, не требуя самих блоков
+    
+    Параметры:
+        block_heights - высоты основных блоков z_1, ..., z_6
+        sub_block_widths - ширины подблоков для каждого основного блока
+        n1, n2, n3, n4 - параметры размеров
+        
+    Возвращает:
+        coords - словарь с координатами блоков (тот же формат, что и у compute_block_coordinates)
+    """
     coords = {
         'main_blocks': [],
         'sub_blocks': []
@@ -97,33 +121,26 @@ def compute_block_coordinates(z_blocks, all_sub_blocks, n1, n2, n3, n4):
 
     # Вычисляем координаты для основных блоков
     row_start = 0
-    for i, z_block in enumerate(z_blocks):
-        rows, cols = z_block.shape
-        
+    for i, rows in enumerate(block_heights):
+        cols = sum(sub_block_widths[i]) if i < len(sub_block_widths) else 0
+
         # Добавляем координаты блока
         coords['main_blocks'].append({
             'rows': [row_start, row_start + rows - 1],
             'cols': [0, cols - 1]
         })
-        
+
         row_start += rows
 
     # Вычисляем координаты для подблоков
     row_start = 0
-    sub_block_idx = 0
-
-    for i, z_block in enumerate(z_blocks):
-        block_height = z_block.shape[0]
 
+    for i, block_height in enumerate(block_heights):
         # Если есть информация о подблоках для этого блока
-        if i < len(all_sub_blocks):
-            sub_blocks = all_sub_blocks[i]
-
+        if i < len(sub_block_widths):
             # Обрабатываем каждый подблок
             col_start = 0
-            for j, sub_block in enumerate(sub_blocks):
-                sub_width = sub_block.shape[1]
-
+            for sub_width in sub_block_widths[i]:
                 # Добавляем координаты подблока
                 coords['sub_blocks'].append({
                     'parent': i,
@@ -132,13 +149,236 @@ def compute_block_coordinates(z_blocks, all_sub_blocks, n1, n2, n3, n4):
                 })
 
                 col_start += sub_width
-                sub_block_idx += 1
 
         row_start += block_height
 
     # Добавляем линии для совместимости с графическим отображением
-    main_block_heights = [z_blocks[b].shape[0] for b in range(len(z_blocks)-1)]
-    coords['hlines'] = np.cumsum(main_block_heights)
+    coords['hlines'] = np.cumsum(block_heights[:-1])
     coords['vlines'] = np.cumsum([n2*n3*n4, n1*n3*n4, n1*n2*n4, n1*n2*n3])
     
     return coords
+
+
+def _eye_factor(n):
+    """Множитель кронекерова произведения: единичная матрица n×n (индексы ненулевых элементов)"""
+    idx = np.arange(n)
+    return n, n, idx, idx
+
+
+def _eye_drop_last_factor(n):
+    """Множитель кронекерова произведения: единичная матрица без последней строки ((n-1)×n)"""
+    idx = np.arange(n - 1)
+    return n - 1, n, idx, idx
+
+
+def _ones_factor(rows, cols):
+    """Множитель кронекерова произведения: матрица из единиц rows×cols"""
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    return rows, cols, r, c
+
+
+def _kron_pattern(factors):
+    """
+    Вычисляет позиции ненулевых элементов кронекерова произведения множителей
+    
+    Параметры:
+        factors - список множителей (строки, столбцы, индексы строк, индексы столбцов)
+        
+    Возвращает:
+        n_rows, n_cols - размер произведения
+        rows, cols - индексы ненулевых элементов произведения
+    """
+    n_rows, n_cols = 1, 1
+    rows = np.zeros(1, dtype=np.int64)
+    cols = np.zeros(1, dtype=np.int64)
+    for f_rows, f_cols, r, c in factors:
+        # Индекс в kron(A, B) равен i_A * size_B + i_B
+        rows = (rows[:, None] * f_rows + r[None, :]).ravel()
+        cols = (cols[:, None] * f_cols + c[None, :]).ravel()
+        n_rows *= f_rows
+        n_cols *= f_cols
+    return n_rows, n_cols, rows, cols
+
+
+def _L_block_layout(n_1, n1, n2, n3, n4, basis=False):
+    """
+    Описывает блочную структуру матрицы L без построения самих блоков
+    
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы
+        basis - если True, в блоках z_3, z_5, z_6 остаются только линейно
+                независимые строки: множитель E(n1) (и E(n2) в z_6) заменяется
+                единичной матрицей без последней строки
+    
+    Возвращает:
+        layout - список основных блоков z_1, ..., z_6 в виде (высота, подблоки),
+                 где каждый подблок задан как (ширина, знак, множители kron);
+                 для нулевых подблоков множители равны None
+    """
+    E, I = _eye_factor, _ones_factor
+    # Множители, задающие строки блоков z_3, z_5, z_6
+    W = _eye_drop_last_factor if basis else _eye_factor
+    h1 = n1 - 1 if basis else n1
+    h2 = n2 - 1 if basis else n2
+    return [
+        # Блок z_1
+        (n3*n4, [
+            (n2*n3*n4, -1, [I(n_1, n2), E(n3*n4)]),                    # Блок 1.1
+            (n1*n3*n4, 1, [I(n_1, n1), E(n3*n4)]),                     # Блок 1.2
+            (n1*n2*n4 + n1*n2*n3, 0, None),                            # Блок 1.3
+        ]),
+        # Блок z_2
+        (n2*n4, [
+            (n2*n3*n4, -1, [E(n2), I(n_1, n3), E(n4)]),                # Блок 2.1
+            (n1*n3*n4, 0, None),                                       # Блок 2.2
+            (n1*n2*n4, 1, [I(n_1, n1), E(n2*n4)]),                     # Блок 2.3
+            (n1*n2*n3, 0, None),                                       # Блок 2.4
+        ]),
+        # Блок z_3
+        (h1*n4, [
+            (n2*n3*n4, 0, None),                                       # Блок 3.1
+            (n1*n3*n4, -1, [W(n1), I(n_1, n3), E(n4)]),                # Блок 3.2
+            (n1*n2*n4, 1, [W(n1), I(n_1, n2), E(n4)]),                 # Блок 3.3
+            (n1*n2*n3, 0, None),                                       # Блок 3.4
+        ]),
+        # Блок z_4
+        (n2*n3, [
+            (n2*n3*n4, -1, [E(n2*n3), I(n_1, n4)]),                    # Блок 4.1
+            (n1*n3*n4 + n1*n2*n4, 0, None),                            # Блок 4.2
+            (n1*n2*n3, 1, [I(n_1, n1), E(n2*n3)]),                     # Блок 4.3
+        ]),
+        # Блок z_5
+        (h1*n3, [
+            (n2*n3*n4, 0, None),                                       # Блок 5.1
+            (n1*n3*n4, -1, [W(n1), E(n3), I(n_1, n4)]),                # Блок 5.2
+            (n1*n2*n4, 0, None),                                       # Блок 5.3
+            (n1*n2*n3, 1, [W(n1), I(n_1, n2), E(n3)]),                 # Блок 5.4
+        ]),
+        # Блок z_6
+        (h1*h2, [
+            (n2*n3*n4 + n1*n3*n4, 0, None),                            # Блок 6.1
+            (n1*n2*n4, -1, [W(n1), W(n2), I(n_1, n4)]),                # Блок 6.2
+            (n1*n2*n3, 1, [W(n1), W(n2), I(n_1, n3)]),                 # Блок 6.3
+        ]),
+    ]
+
+
+def build_L_sparse(n_1=1, n1=2, n2=3, n3=4, n4=5, format='csr', dtype=np.float64):
+    """
+    Создает матрицу L в разреженном формате, не создавая плотных блоков
+    
+    Элементы ±1 записываются напрямую по индексам, вычисленным из
+    кронекеровой структуры блоков, поэтому память и время построения
+    пропорциональны числу ненулевых элементов.
+    
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры для построения матрицы
+        format - формат разреженной матрицы scipy.sparse ('csr', 'coo', 'csc', ...)
+        dtype - тип элементов (например, np.int8 для компактного точного хранения)
+        
+    Возвращает:
+        L - построенная разреженная матрица
+        block_coords - структура координат для визуализации блоков
+    """
+    layout = _L_block_layout(n_1, n1, n2, n3, n4)
+    L = _assemble_layout(layout, format, dtype)
+
+    # Создание структуры координат для визуализации
+    block_coords = _layout_block_coordinates(layout, n1, n2, n3, n4)
+
+    return L, block_coords
+
+
+def _assemble_layout(layout, format='csr', dtype=np.float64):
+    """
+    Собирает разреженную матрицу по описанию блочной структуры (см. _L_block_layout)
+    
+    Параметры:
+        layout - описание блоков
+        format - формат разреженной матрицы scipy.sparse
+        dtype - тип элементов
+    
+    Возвращает:
+        matrix - разреженная матрица в формате format
+    """
+    import scipy.sparse as sp
+
+    rows_parts, cols_parts, data_parts = [], [], []
+    row_start = 0
+    for block_idx, (height, sub_blocks) in enumerate(layout):
+        col_start = 0
+        for width, sign, factors in sub_blocks:
+            if factors is not None:
+                f_rows, f_cols, rows, cols = _kron_pattern(factors)
+                if (f_rows, f_cols) != (height, width):
+                    raise ValueError(f'Размер подблока {f_rows}x{f_cols} в блоке z_{block_idx + 1} '
+                                     f'не совпадает с ожидаемым {height}x{width}')
+                rows_parts.append(rows + row_start)
+                cols_parts.append(cols + col_start)
+                data_parts.append(np.full(rows.size, sign, dtype=dtype))
+            col_start += width
+        row_start += height
+
+    return sp.coo_matrix(
+        (np.concatenate(data_parts), (np.concatenate(rows_parts), np.concatenate(cols_parts))),
+        shape=(row_start, col_start)
+    ).asformat(format)
+
+
+def _layout_block_coordinates(layout, n1, n2, n3, n4):
+    """Координаты блоков для визуализации по описанию блочной структуры"""
+    block_heights = [height for height, _ in layout]
+    sub_block_widths = [[width for width, _, _ in sub_blocks] for _, sub_blocks in layout]
+    return compute_block_coordinates_from_sizes(block_heights, sub_block_widths, n1, n2, n3, n4)
+
+
+def L_basis_row_map(n_1=1, n1=2, n2=3, n3=4, n4=5):
+    """
+    Индексы строк L, образующих базис пространства строк (строки build_L_basis)
+    
+    В блоках z_3 и z_5 отбрасываются строки с последним значением индекса
+    по n1, в блоке z_6 - строки с последним значением индекса по n1 или
+    по n2; остальные блоки сохраняются целиком.
+    
+    Возвращает:
+        row_map - возрастающий массив индексов строк L (длина равна рангу L)
+    """
+    heights = [n3*n4, n2*n4, n1*n4, n2*n3, n1*n3, n1*n2]
+    offsets = np.concatenate([[0], np.cumsum(heights[:-1])])
+    z6_rows = (np.arange(n1 - 1)[:, None] * n2 + np.arange(n2 - 1)[None, :]).ravel()
+    kept = [
+        np.arange(n3*n4),               # z_1
+        np.arange(n2*n4),               # z_2
+        np.arange((n1 - 1) * n4),       # z_3: строки i1*n4 + i4, i1 < n1-1
+        np.arange(n2*n3),               # z_4
+        np.arange((n1 - 1) * n3),       # z_5: строки i1*n3 + i3, i1 < n1-1
+        z6_rows,                        # z_6: строки i1*n2 + i2, i1 < n1-1, i2 < n2-1
+    ]
+    return np.concatenate([offset + rows for offset, rows in zip(offsets, kept)]).astype(np.int64)
+
+
+def build_L_basis(n_1=1, n1=2, n2=3, n3=4, n4=5, format='csr', dtype=np.float64):
+    """
+    Создает матрицу из линейно независимых строк L, не создавая зависимых строк
+    
+    Строки строятся напрямую по кронекеровой структуре, в которой
+    единичные множители E(n1), E(n2) блоков z_3, z_5, z_6 заменены
+    единичными матрицами без последней строки, поэтому память
+    пропорциональна рангу L, а не числу строк L.
+    Число строк равно n3·n4 + n2·n4 + n2·n3 + (n1-1)(n4 + n3 + n2 - 1),
+    то есть рангу L (см. compute_L_rank).
+    
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы L
+        format - формат разреженной матрицы scipy.sparse ('csr', 'coo', 'csc', ...)
+        dtype - тип элементов (например, np.int8)
+        
+    Возвращает:
+        L_basis - разреженная матрица из базисных строк (L_basis = L[row_map])
+        row_map - индексы этих строк в матрице L
+        block_coords - структура координат для визуализации блоков
+    """
+    layout = _L_block_layout(n_1, n1, n2, n3, n4, basis=True)
+    L_basis = _assemble_layout(layout, format, dtype)
+    block_coords = _layout_block_coordinates(layout, n1, n2, n3, n4)
+    return L_basis, L_basis_row_map(n_1, n1, n2, n3, n4), block_coords
@@ -0,0 +1,306 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+
+# Имя файла с описанием структуры результата внутри записи кэша
+_META_FILE = 'result.json'
+
+# Версия формата записей и смысла сохраняемых результатов; входит в ключ.
+# Увеличивается при изменениях, которые не видны по исходному коду
+# вычисляющей функции (например, в вызываемых ею функциях)
+CACHE_SCHEMA = 2
+
+# Поля результатов-словарей, зависящие от конкретного запуска (время
+# вычисления); в кэш они не записываются
+VOLATILE_FIELDS = ('seconds',)
+
+
+class MatrixCache:
+    """
+    Дисковый кэш результатов с адресацией по содержимому
+
+    Ключ записи - хэш от (имя функции, хэш ее исходного кода, аргументы,
+    версия пакета, CACHE_SCHEMA); массивы в аргументах хэшируются по
+    содержимому, поэтому правка вычисляющей функции делает старые записи
+    недоступными. Поля VOLATILE_FIELDS (время вычисления) у результатов-
+    словарей в кэш не записываются. Массивы результата хранятся
+    в формате .npy и загружаются через отображение в память (mmap),
+    поэтому повторное обращение не требует чтения всего файла. При
+    превышении max_bytes удаляются записи, к которым дольше всего не
+    обращались (LRU).
+
+    Параметры:
+        directory - каталог кэша
+        max_bytes - максимальный суммарный размер записей (None - без ограничения)
+        mmap_mode - режим отображения массивов при загрузке ('r', 'c' или None)
+        volatile_fields - поля результатов-словарей, не записываемые в кэш
+
+    Пример:
+        cache = MatrixCache('.matrix_cache')
+        build = cache.memoize(build_L_matrix)
+        L, block_coords = build(1, 2, 3, 4, 5)
+    """
+
+    def __init__(self, directory='.matrix_cache', max_bytes=2 * 1024**3, mmap_mode='r',
+                 volatile_fields=VOLATILE_FIELDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self.volatile_fields = tuple(volatile_fields)
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, name, *args, **kwargs):
+        """Вычисляет ключ записи по имени функции и ее аргументам (без хэша исходного кода)"""
+        return self._key(name, None, args, kwargs)
+
+    def _key(self, name, code, args, kwargs):
+        """Ключ записи: имя, хэш исходного кода функции, аргументы, версия пакета и CACHE_SCHEMA"""
+        from . import __version__
+
+        h = hashlib.sha256()
+        _hash_update(h, (name, code, __version__, CACHE_SCHEMA, args, sorted(kwargs.items())))
+        return h.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key, default=None):
+        """
+        Загружает результат из кэша
+
+        Возвращает:
+            сохраненный результат или default, если записи нет
+        """
+        path = self._entry_path(key)
+        try:
+            with open(os.path.join(path, _META_FILE)) as f:
+                meta = json.load(f)
+            result = _restore(meta['result'], path, self.mmap_mode)
+        except (FileNotFoundError, NotADirectoryError):
+            return default
+
+        # Обновляем время обращения для политики LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result, name=None):
+        """Сохраняет результат в кэш без полей volatile_fields (запись появляется атомарно)"""
+        path = self._entry_path(key)
+        if os.path.exists(path):
+            return
+
+        # Запись собирается во временном каталоге и переименовывается целиком,
+        # поэтому параллельные процессы никогда не видят частично записанных данных
+        if isinstance(result, dict) and self.volatile_fields:
+            result = {k: v for k, v in result.items() if k not in self.volatile_fields}
+        tmp_path = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+        try:
+            arrays = []
+            meta = {
+                'function': name,
+                'created': time.time(),
+                'result': _serialize(result, arrays),
+            }
+            for idx, array in enumerate(arrays):
+                if hasattr(array, 'tocsr'):
+                    import scipy.sparse as sp
+                    sp.save_npz(os.path.join(tmp_path, f'{idx}.npz'), array, compressed=False)
+                else:
+                    np.save(os.path.join(tmp_path, f'{idx}.npy'), array)
+            with open(os.path.join(tmp_path, _META_FILE), 'w') as f:
+                json.dump(meta, f)
+            os.rename(tmp_path, path)
+        except OSError:
+            # Запись с тем же ключом уже создана другим процессом
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.exists(path):
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        self.evict()
+
+    def get_or_compute(self, name, compute, *args, **kwargs):
+        """
+        Возвращает результат compute(*args, **kwargs) из кэша или вычисляет и сохраняет его
+
+        Параметры:
+            name - имя вычисления (часть ключа)
+            compute - вычисляющая функция (хэш ее исходного кода - часть ключа)
+            args, kwargs - аргументы функции (часть ключа)
+        """
+        key = self._key(name, _code_identity(compute), args, kwargs)
+        missing = object()
+        result = self.get(key, missing)
+        if result is missing:
+            result = compute(*args, **kwargs)
+            self.put(key, result, name)
+            # Возвращаем результат в том же виде, в каком он будет загружаться из кэша
+            result = self.get(key, result)
+        return result
+
+    def get_or_compute_many(self, name, compute, items, *args, **kwargs):
+        """
+        Пакетный вариант get_or_compute для функций, обрабатывающих список элементов
+
+        Каждый элемент кэшируется отдельно, а отсутствующие в кэше элементы
+        вычисляются одним вызовом compute, поэтому пакетная обработка
+        сохраняется и при частично заполненном кэше.
+
+        Параметры:
+            name - имя вычисления (часть ключа)
+            compute - функция compute(список элементов, *args, **kwargs) -> список результатов
+            items - элементы (каждый - часть ключа своей записи)
+            args, kwargs - общие аргументы функции (часть ключа)
+
+        Возвращает:
+            results - список результатов в порядке items
+        """
+        code = _code_identity(compute)
+        keys = [self._key(name, code, (item,) + args, kwargs) for item in items]
+        missing = object()
+        results = [self.get(key, missing) for key in keys]
+        todo = [idx for idx, result in enumerate(results) if result is missing]
+        if todo:
+            computed = compute([items[idx] for idx in todo], *args, **kwargs)
+            for idx, result in zip(todo, computed):
+                self.put(keys[idx], result, name)
+                results[idx] = self.get(keys[idx], result)
+        return results
+
+    def memoize(self, func, name=None):
+        """
+        Оборачивает функцию так, чтобы ее результаты брались из кэша
+
+        Параметры:
+            func - функция без побочных эффектов (например, build_L_matrix или compute_matrix_rank)
+            name - имя для ключа (по умолчанию - полное имя функции)
+        """
+        name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.get_or_compute(name, func, *args, **kwargs)
+
+        return wrapper
+
+    def entries(self):
+        """Список записей кэша: (время последнего обращения, размер в байтах, путь)"""
+        result = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or entry.name.startswith('.tmp-'):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                result.append((entry.stat().st_mtime, size, entry.path))
+            except FileNotFoundError:
+                # Запись удалена другим процессом
+                continue
+        return result
+
+    def size(self):
+        """Суммарный размер записей кэша в байтах"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Удаляет давно не использовавшиеся записи, пока размер кэша превышает max_bytes"""
+        if self.max_bytes is None:
+            return
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Удаляет все записи кэша"""
+        for _, _, path in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _code_identity(func):
+    """Хэш исходного кода функции (для встроенных функций - ее полное имя)"""
+    target = inspect.unwrap(func)
+    try:
+        source = inspect.getsource(target)
+    except (OSError, TypeError):
+        source = f'{getattr(target, "__module__", None)}.{getattr(target, "__qualname__", repr(target))}'
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def _hash_update(h, obj):
+    """Добавляет в хэш однозначное представление объекта (массивы - по содержимому)"""
+    if isinstance(obj, np.ndarray):
+        h.update(f'ndarray{obj.dtype.str}{obj.shape}'.encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif hasattr(obj, 'tocsr'):
+        csr = obj.tocsr()
+        csr.sum_duplicates()
+        h.update(f'sparse{csr.dtype.str}{csr.shape}'.encode())
+        for array in (csr.data, csr.indices, csr.indptr):
+            h.update(np.ascontiguousarray(array).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f'{type(obj).__name__}{len(obj)}'.encode())
+        for item in obj:
+            _hash_update(h, item)
+    elif isinstance(obj, dict):
+        h.update(f'dict{len(obj)}'.encode())
+        for k in sorted(obj):
+            _hash_update(h, k)
+            _hash_update(h, obj[k])
+    elif obj is None or isinstance(obj, (bool, int, float, str, np.generic)):
+        h.update(f'{type(obj).__name__}:{obj!r}'.encode())
+    else:
+        raise TypeError(f'Аргумент типа {type(obj).__name__} нельзя использовать в ключе кэша')
+
+
+def _serialize(obj, arrays):
+    """Преобразует результат в JSON-структуру, вынося массивы в список arrays"""
+    if isinstance(obj, np.ndarray) or hasattr(obj, 'tocsr'):
+        arrays.append(obj)
+        kind = '__sparse__' if hasattr(obj, 'tocsr') else '__array__'
+        return {kind: len(arrays) - 1}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, tuple):
+        return {'__tuple__': [_serialize(item, arrays) for item in obj]}
+    if isinstance(obj, list):
+        return [_serialize(item, arrays) for item in obj]
+    if isinstance(obj, dict):
+        if not all(isinstance(k, str) for k in obj):
+            raise TypeError('В кэше можно хранить только словари со строковыми ключами')
+        return {'__dict__': {k: _serialize(v, arrays) for k, v in obj.items()}}
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    raise TypeError(f'Результат типа {type(obj).__name__} нельзя сохранить в кэше')
+
+
+def _restore(obj, path, mmap_mode):
+    """Восстанавливает результат из JSON-структуры и файлов массивов"""
+    if isinstance(obj, list):
+        return [_restore(item, path, mmap_mode) for item in obj]
+    if isinstance(obj, dict):
+        if '__array__' in obj:
+            return np.load(os.path.join(path, f'{obj["__array__"]}.npy'), mmap_mode=mmap_mode)
+        if '__sparse__' in obj:
+            import scipy.sparse as sp
+            return sp.load_npz(os.path.join(path, f'{obj["__sparse__"]}.npz'))
+        if '__tuple__' in obj:
+            return tuple(_restore(item, path, mmap_mode) for item in obj['__tuple__'])
+        return {k: _restore(v, path, mmap_mode) for k, v in obj['__dict__'].items()}
+    return obj
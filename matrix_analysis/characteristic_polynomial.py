@@ -0,0 +1,304 @@
+import math
+
+import numpy as np
+
+from .spectrum_summary import DEFAULT_RTOL, cluster_eigenvalues
+
+
+# Простые модули для вычислений по модулю: меньше 2^31, поэтому произведения
+# двух вычетов помещаются в int64
+_PRIME_LIMIT = 2**31
+
+
+def _small_primes(limit):
+    """Простые числа меньше limit (решето Эратосфена)"""
+    sieve = np.ones(limit, dtype=bool)
+    sieve[:2] = False
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = False
+    return np.flatnonzero(sieve)
+
+
+def _modular_primes(count):
+    """
+    Возвращает count наибольших простых чисел меньше 2^31
+
+    Возвращает:
+        primes - список простых чисел в порядке убывания
+    """
+    divisors = _small_primes(math.isqrt(_PRIME_LIMIT) + 1)
+    primes = []
+    candidate = _PRIME_LIMIT - 1
+    while len(primes) < count:
+        # Проверяем сразу блок нечетных кандидатов
+        block = np.arange(candidate, candidate - 2000, -2, dtype=np.int64)
+        is_prime = np.all(block[:, None] % divisors[None, :] != 0, axis=1)
+        primes.extend(int(p) for p in block[is_prime])
+        candidate -= 2000
+    return primes[:count]
+
+
+def _integer_matrix(matrix):
+    """Приводит квадратную целочисленную матрицу к плотному массиву int64"""
+    if hasattr(matrix, 'toarray'):
+        matrix = matrix.toarray()
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError('Матрица должна быть квадратной для вычисления характеристического многочлена')
+    values = np.rint(matrix)
+    if not np.array_equal(values, matrix):
+        raise ValueError('Точный многочлен вычисляется только для целочисленных матриц')
+    return values.astype(np.int64)
+
+
+def _hessenberg_mod(A, p):
+    """
+    Приводит матрицу к верхней форме Хессенберга преобразованиями подобия по модулю p
+
+    Параметры:
+        A - матрица int64 с элементами из [0, p)
+        p - простой модуль
+
+    Возвращает:
+        H - матрица, подобная A над полем вычетов, с нулями ниже первой поддиагонали
+    """
+    H = A.copy()
+    n = H.shape[0]
+    for m in range(1, n - 1):
+        j = m - 1
+        nonzero = np.flatnonzero(H[m:, j]) + m
+        if nonzero.size == 0:
+            continue
+
+        # Перестановка строк и столбцов, чтобы ведущий элемент был ненулевым
+        pivot = nonzero[0]
+        if pivot != m:
+            H[[m, pivot], :] = H[[pivot, m], :]
+            H[:, [m, pivot]] = H[:, [pivot, m]]
+
+        u = H[m + 1:, j] * pow(int(H[m, j]), -1, p) % p
+        if not u.any():
+            continue
+        # Строки: r_i -= u_i * r_m (левее столбца j строки уже нулевые);
+        # столбцы (обратное преобразование): c_m += Σ u_i * c_i
+        H[m + 1:, j:] = (H[m + 1:, j:] - u[:, None] * H[m, j:][None, :] % p) % p
+        H[:, m] = (H[:, m] + (H[:, m + 1:] * u[None, :] % p).sum(axis=1)) % p
+    return H
+
+
+def _hessenberg_charpoly_mod(H, p):
+    """
+    Характеристический многочлен верхней матрицы Хессенберга по модулю p
+
+    Используется рекуррентная формула по ведущим главным подматрицам:
+    p_m(λ) = (λ - h_mm)·p_{m-1}(λ) - Σ_i h_im·(h_{i+1,i}···h_{m,m-1})·p_{i-1}(λ).
+
+    Возвращает:
+        coeffs - коэффициенты det(λI - H) mod p в порядке возрастания степеней
+    """
+    n = H.shape[0]
+    # P[k] - коэффициенты p_k по возрастанию степеней
+    P = np.zeros((n + 1, n + 1), dtype=np.int64)
+    P[0, 0] = 1
+    for m in range(1, n + 1):
+        col = m - 1
+        # λ·p_{m-1} - h_mm·p_{m-1}
+        current = np.zeros(n + 1, dtype=np.int64)
+        current[1:m + 1] = P[m - 1, :m]
+        current = (current - H[col, col] * P[m - 1] % p) % p
+
+        if m > 1:
+            # products[i] - произведение поддиагональных элементов h_{i+1,i}···h_{m-1,m-2}
+            subdiag = H[np.arange(1, m), np.arange(0, m - 1)]
+            products = np.empty(m - 1, dtype=np.int64)
+            products[m - 2] = subdiag[m - 2]
+            for i in range(m - 3, -1, -1):
+                products[i] = products[i + 1] * subdiag[i] % p
+            factors = H[:m - 1, col] * products % p
+            # Вклад Σ factors_i · p_i (здесь p_i соответствует p_{i-1} в нумерации формулы)
+            terms = factors[:, None] * P[:m - 1] % p
+            current = (current - terms.sum(axis=0)) % p
+
+        P[m] = current
+    return P[n]
+
+
+def _coefficient_bound_bits(A):
+    """
+    Число бит, достаточное для модулей всех коэффициентов характеристического многочлена
+
+    Коэффициент c_k равен (с точностью до знака) элементарной симметрической
+    функции e_k собственных чисел, поэтому |c_k| ≤ e_k(|λ|) ≤ C(n, k)·r^k,
+    где r = ||A||_F / √n не меньше среднего модуля собственных чисел
+    (неравенства Маклорена и Шура).
+    """
+    n = A.shape[0]
+    r = math.sqrt(float(np.sum(A.astype(np.float64) ** 2)) / n)
+    if r == 0:
+        return 2
+    log_binom = [math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1) for k in range(n + 1)]
+    bits = max((lb + k * math.log(r)) / math.log(2) for k, lb in enumerate(log_binom))
+    return bits + 2
+
+
+def _crt_symmetric(residues, primes):
+    """
+    Восстанавливает целые числа по вычетам (китайская теорема об остатках)
+
+    Параметры:
+        residues - массив вычетов формы (число модулей, число коэффициентов)
+        primes - модули
+
+    Возвращает:
+        values - список целых Python в симметричном диапазоне (-M/2, M/2]
+    """
+    values = [int(r) for r in residues[0]]
+    modulus = primes[0]
+    for r, p in zip(residues[1:], primes[1:]):
+        inv = pow(modulus, -1, p)
+        values = [x + modulus * ((int(ri) - x) * inv % p) for x, ri in zip(values, r)]
+        modulus *= p
+    half = modulus // 2
+    return [x - modulus if x > half else x for x in values]
+
+
+def charpoly_modular(matrix):
+    """
+    Точный характеристический многочлен целочисленной матрицы
+
+    Многочлен вычисляется по модулю нескольких простых чисел (приведение
+    к форме Хессенберга и рекуррентная формула, O(n^3) векторных операций
+    на модуль) и восстанавливается по китайской теореме об остатках.
+    Число модулей выбирается по оценке (1 + ρ)^n модулей коэффициентов,
+    поэтому результат точный, а не вероятностный.
+
+    Параметры:
+        matrix - квадратная целочисленная матрица (numpy или scipy.sparse)
+
+    Возвращает:
+        coeffs - коэффициенты det(λI - A) (целые Python, массив dtype=object)
+                 в порядке убывания степеней
+    """
+    A = _integer_matrix(matrix)
+    n = A.shape[0]
+    if n == 0:
+        return np.array([1], dtype=object)
+
+    count = int(math.ceil(_coefficient_bound_bits(A) / 30.0))
+    primes = _modular_primes(count)
+    residues = np.empty((count, n + 1), dtype=np.int64)
+    for k, p in enumerate(primes):
+        H = _hessenberg_mod(A % p, p)
+        residues[k] = _hessenberg_charpoly_mod(H, p)
+
+    coeffs = _crt_symmetric(residues, primes)
+    return np.array(coeffs[::-1], dtype=object)
+
+
+def charpoly_from_factors(values, multiplicities):
+    """
+    Раскрывает многочлен Π (λ - μ)^k с целыми корнями μ в точные коэффициенты
+
+    Параметры:
+        values - корни μ
+        multiplicities - кратности k
+
+    Возвращает:
+        coeffs - коэффициенты (целые Python, массив dtype=object) в порядке убывания степеней
+    """
+    coeffs = np.array([1], dtype=object)
+    for value, multiplicity in zip(values, multiplicities):
+        mu, k = int(value), int(multiplicity)
+        if k <= 0:
+            continue
+        # (λ - μ)^k = Σ_j C(k, j)·(-μ)^j·λ^(k-j)
+        factor = np.array([math.comb(k, j) * (-mu) ** j for j in range(k + 1)], dtype=object)
+        coeffs = np.convolve(coeffs, factor)
+    return coeffs
+
+
+def factored_characteristic_polynomial(eigenvalues=None, params=None, rtol=DEFAULT_RTOL):
+    """
+    Характеристический многочлен в виде произведения Π (λ - μ)^k
+
+    Параметры:
+        eigenvalues - собственные числа матрицы (близкие объединяются
+                      функцией cluster_eigenvalues)
+        params - кортеж (n1, n2, n3, n4): корни и кратности L·L^T берутся
+                 из явных формул analytic_spectrum, матрица не нужна
+        rtol - относительный допуск объединения собственных чисел
+
+    Возвращает:
+        factors - структурированный массив с полями 'value' (корень μ) и
+                  'multiplicity' (кратность k), по убыванию корней;
+                  для целых корней поле 'value' имеет тип int64
+    """
+    if params is not None:
+        from .analytic_spectrum import analytic_spectrum
+        return analytic_spectrum(*params)
+    if eigenvalues is None:
+        raise ValueError('Нужно задать собственные числа или параметры n1..n4')
+
+    summary = cluster_eigenvalues(eigenvalues, rtol=rtol)
+    values, counts = summary['value'], summary['multiplicity']
+    if np.array_equal(values, np.rint(values)):
+        from .analytic_spectrum import SPECTRUM_DTYPE
+        dtype = SPECTRUM_DTYPE
+    else:
+        dtype = np.dtype([('value', np.float64), ('multiplicity', np.int64)])
+    factors = np.empty(len(values), dtype=dtype)
+    factors['value'] = values
+    factors['multiplicity'] = counts
+    return factors
+
+
+def format_factored_polynomial(factors, variable='λ'):
+    """Строка вида (λ - 20)^3·(λ - 11)^4·λ^13 для массива корней и кратностей"""
+    terms = []
+    for value, multiplicity in zip(factors['value'], factors['multiplicity']):
+        value = value.item()
+        if value == 0:
+            base = variable
+        elif value > 0:
+            base = f'({variable} - {value:.10g})'
+        else:
+            base = f'({variable} + {-value:.10g})'
+        terms.append(base if multiplicity == 1 else f'{base}^{multiplicity}')
+    return '·'.join(terms) if terms else '1'
+
+
+def format_polynomial(coeffs, variable='λ', tolerance=1e-10):
+    """
+    Строка многочлена по коэффициентам в порядке убывания степеней
+
+    Нулевые члены пропускаются; для целых коэффициентов (dtype=object)
+    сравнение с нулем и единицей точное.
+    """
+    degree = len(coeffs) - 1
+    terms = []
+    for i, coef in enumerate(coeffs):
+        power = degree - i
+        if isinstance(coef, (int, np.integer)):
+            is_zero, magnitude = coef == 0, abs(int(coef))
+            is_one = magnitude == 1
+            text = str(magnitude)
+        else:
+            is_zero, magnitude = abs(coef) < tolerance, abs(float(coef))
+            is_one = abs(magnitude - 1) < tolerance
+            text = f'{magnitude:.10g}'
+        if is_zero:
+            continue
+
+        if power == 0:
+            term = text
+        elif is_one:
+            term = variable if power == 1 else f'{variable}^{power}'
+        else:
+            term = f'{text}*{variable}' if power == 1 else f'{text}*{variable}^{power}'
+
+        if not terms:
+            terms.append(term if coef > 0 else f'-{term}')
+        else:
+            terms.append((' + ' if coef > 0 else ' - ') + term)
+    return ''.join(terms) if terms else '0'
@@ -1,18 +1,123 @@
 import numpy as np
 
+from .basis import rref_mod_p
 
-def compute_matrix_rank(matrix, tolerance=1e-10):
+
+def default_rank_tolerance(sigma_max, shape):
+    """
+    Адаптивный порог для определения ранга
+
+    Параметры:
+        sigma_max - наибольшее сингулярное число матрицы
+        shape - размер матрицы
+
+    Возвращает:
+        tolerance - порог σ_max · max(m, n) · eps (как в numpy.linalg.matrix_rank)
+    """
+    return float(sigma_max) * max(shape) * np.finfo(np.float64).eps
+
+
+def compute_matrix_rank(matrix, tolerance=None, method='auto', params=None):
     """
     Вычисляет ранг матрицы
-    
+
     Параметры:
-        matrix - матрица для анализа
-        tolerance - порог для определения значимых собственных чисел
-        
+        matrix - матрица для анализа (numpy или scipy.sparse)
+        tolerance - порог для определения значимых сингулярных чисел;
+                    None - адаптивный порог относительно σ_max (default_rank_tolerance)
+        method - способ вычисления:
+            'analytic' - явная формула compute_L_rank для L или L·L^T (нужны params)
+            'sparse' - точное исключение по модулю простого числа для целочисленных
+                       матриц (rref_mod_p; разреженная матрица уплотняется
+                       блоками строк, порог не используется)
+            'qr' - QR-разложение с выбором ведущего столбца
+            'gram' - eigh меньшей из матриц Грама A·A^T или A^T·A
+            'svd' - сингулярное разложение (эталон для проверки, самый медленный)
+            'auto' - 'analytic' при заданных params, 'sparse' для разреженных матриц,
+                     'gram' для плотных (в том числе L в int8: матрица Грама меньшего
+                     размера и eigh во много раз быстрее SVD прямоугольной L)
+        params - кортеж (n_1, n1, n2, n3, n4), если matrix - это L или L·L^T
+
     Возвращает:
         matrix_rank - ранг матрицы
     """
-    # Используем SVD для вычисления ранга
-    s = np.linalg.svd(matrix, compute_uv=False)
-    matrix_rank = np.sum(s > tolerance)
-    return matrix_rank
+    is_sparse = hasattr(matrix, 'tocsr')
+    if method == 'auto':
+        if params is not None:
+            method = 'analytic'
+        else:
+            method = 'sparse' if is_sparse else 'gram'
+
+    if method == 'analytic':
+        if params is None:
+            raise ValueError("Для способа 'analytic' нужны параметры (n_1, n1, n2, n3, n4)")
+        n_1, n1, n2, n3, n4 = params
+        rows = n3*n4 + n2*n4 + n1*n4 + n2*n3 + n1*n3 + n1*n2
+        if matrix.shape[0] != rows:
+            raise ValueError(f'Число строк матрицы {matrix.shape[0]} не соответствует параметрам {tuple(params)}')
+        return compute_L_rank(*params)
+
+    if method == 'sparse':
+        return len(rref_mod_p(matrix)[2])
+
+    if is_sparse:
+        matrix = matrix.toarray()
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.size == 0:
+        return 0
+
+    if method == 'svd':
+        # Используем SVD для вычисления ранга
+        s = np.linalg.svd(matrix, compute_uv=False)
+        if tolerance is None:
+            tolerance = default_rank_tolerance(s[0], matrix.shape)
+        matrix_rank = np.sum(s > tolerance)
+    elif method == 'qr':
+        from scipy.linalg import qr
+
+        # Модули диагонали R приближают сингулярные числа (в порядке убывания)
+        R = qr(matrix, mode='r', pivoting=True)[0]
+        r_diag = np.abs(np.diag(R))
+        if tolerance is None:
+            tolerance = default_rank_tolerance(r_diag[0], matrix.shape)
+        matrix_rank = np.sum(r_diag > tolerance)
+    elif method == 'gram':
+        # Собственные числа матрицы Грама равны квадратам сингулярных чисел
+        m, n = matrix.shape
+        gram = matrix @ matrix.T if m <= n else matrix.T @ matrix
+        eigenvalues = np.linalg.eigvalsh(gram)
+        if tolerance is None:
+            # Погрешность eigh пропорциональна λ_max, поэтому порог задается для λ
+            eig_tolerance = default_rank_tolerance(eigenvalues[-1], matrix.shape)
+        else:
+            eig_tolerance = tolerance ** 2
+        matrix_rank = np.sum(eigenvalues > eig_tolerance)
+    else:
+        raise ValueError(f'Неизвестный метод вычисления ранга: {method}')
+
+    return int(matrix_rank)
+
+
+def compute_L_rank(n_1=1, n1=2, n2=3, n3=4, n4=5):
+    """
+    Вычисляет ранг матрицы L (и L·L^T) по явной формуле, не строя матрицу
+
+    Ядро L·L^T имеет размерность n1 + n2 + n3 + n4 - 1 (собственное число 0
+    в analytic-анализе), а число строк L равно сумме попарных произведений
+    n1..n4, поэтому rank = Σ n_i·n_j - (n1 + n2 + n3 + n4) + 1.
+
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы L (n_1 = 1)
+
+    Возвращает:
+        matrix_rank - ранг матрицы L
+    """
+    if n_1 != 1:
+        raise ValueError('Блочная структура матрицы L определена только для n_1 = 1')
+    n = [n1, n2, n3, n4]
+    if min(n) < 1:
+        raise ValueError('Параметры n1..n4 должны быть натуральными числами')
+
+    pair_products = sum(n[i] * n[j] for i in range(4) for j in range(i + 1, 4))
+    return pair_products - sum(n) + 1
+
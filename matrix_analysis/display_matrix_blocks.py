@@ -1,55 +1,67 @@
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
+import numpy as np
+from matplotlib.collections import LineCollection
 
 
-def display_matrix_blocks(L, block_coords):
+def _rectangle_segments(blocks):
+    """
+    Отрезки границ прямоугольников блоков
+
+    Возвращает:
+        segments - массив формы (4 * число блоков, 2, 2): четыре стороны каждого блока
+    """
+    if not blocks:
+        return np.empty((0, 2, 2))
+    rows = np.array([block['rows'] for block in blocks], dtype=np.float64)
+    cols = np.array([block['cols'] for block in blocks], dtype=np.float64)
+
+    # Границы проходят по краям пикселей: [начало - 0.5, конец + 0.5]
+    x0, x1 = cols[:, 0] - 0.5, cols[:, 1] + 0.5
+    y0, y1 = rows[:, 0] - 0.5, rows[:, 1] + 0.5
+
+    corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    segments = [np.stack([np.column_stack(corners[k]), np.column_stack(corners[(k + 1) % 4])], axis=1)
+                for k in range(4)]
+    return np.concatenate(segments)
+
+
+def display_matrix_blocks(L, block_coords, ax=None):
     """
     Отображает блоки матрицы L
     
+    Все границы рисуются одним объектом LineCollection, поэтому время
+    отрисовки не зависит от числа блоков так сильно, как при добавлении
+    отдельного Rectangle для каждого блока.
+
     Параметры:
         L - матрица для отображения
         block_coords - словарь с координатами блоков
+        ax - объект осей matplotlib (по умолчанию - текущие оси)
+
+    Возвращает:
+        lines - добавленный объект LineCollection
     """
     # Настройка цвета и типа линий для всех границ
     BORDER_COLOR = (0.5, 0.5, 0.5)  # Серый цвет
     BORDER_STYLE = '--'             # Пунктирная линия
     MAIN_WIDTH = 1.2                # Ширина линии основных блоков
     SUB_WIDTH = 0.8                 # Ширина линии подблоков
-    
-    # Рисуем основные блоки (z_1, z_2, ..., z_6)
-    for block in block_coords['main_blocks']:
-        rows = block['rows']
-        cols = block['cols']
-        
-        # Позиция прямоугольника [x, y, width, height]
-        x = cols[0] - 0.5
-        y = rows[0] - 0.5
-        width = cols[1] - cols[0] + 1
-        height = rows[1] - rows[0] + 1
-        
-        # Рисуем прямоугольник для основного блока
-        rect = Rectangle((x, y), width, height, 
-                        fill=False, 
-                        edgecolor=BORDER_COLOR, 
-                        linewidth=MAIN_WIDTH, 
-                        linestyle=BORDER_STYLE)
-        plt.gca().add_patch(rect)
-    
-    # Рисуем подблоки (компоненты внутри z_1, z_2, ...)
-    for block in block_coords['sub_blocks']:
-        rows = block['rows']
-        cols = block['cols']
-        
-        # Позиция прямоугольника
-        x = cols[0] - 0.5
-        y = rows[0] - 0.5
-        width = cols[1] - cols[0] + 1
-        height = rows[1] - rows[0] + 1
-        
-        # Рисуем прямоугольник для подблока
-        rect = Rectangle((x, y), width, height, 
-                        fill=False, 
-                        edgecolor=BORDER_COLOR, 
-                        linewidth=SUB_WIDTH, 
-                        linestyle=BORDER_STYLE)
-        plt.gca().add_patch(rect)
+
+    if ax is None:
+        import matplotlib.pyplot as plt
+
+        ax = plt.gca()
+
+    # Границы основных блоков (z_1, z_2, ..., z_6) и подблоков (компоненты внутри z_1, z_2, ...)
+    main_segments = _rectangle_segments(block_coords['main_blocks'])
+    sub_segments = _rectangle_segments(block_coords['sub_blocks'])
+    segments = np.concatenate([main_segments, sub_segments])
+    widths = np.concatenate([np.full(len(main_segments), MAIN_WIDTH),
+                             np.full(len(sub_segments), SUB_WIDTH)])
+
+    lines = LineCollection(segments,
+                           colors=[BORDER_COLOR],
+                           linewidths=widths,
+                           linestyles=BORDER_STYLE)
+    # Границы не должны менять пределы осей, заданные изображением матрицы
+    ax.add_collection(lines, autolim=False)
+    return lines
@@ -0,0 +1,220 @@
+import contextlib
+import functools
+import json
+import platform
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+
+def matrix_info(matrix):
+    """
+    Краткое описание размера матрицы для отчета
+
+    Параметры:
+        matrix - матрица (numpy, scipy.sparse или LinearOperator)
+
+    Возвращает:
+        info - словарь с полями shape, dtype, nnz и nbytes (если они определены)
+    """
+    info = {'shape': [int(n) for n in matrix.shape], 'dtype': str(matrix.dtype)}
+    if hasattr(matrix, 'nnz'):
+        info['nnz'] = int(matrix.nnz)
+        # Для CSR/CSC учитываются массивы данных и индексов, для COO - координаты
+        arrays = [getattr(matrix, name, None) for name in ('data', 'indices', 'indptr', 'row', 'col')]
+        info['nbytes'] = int(sum(a.nbytes for a in arrays if isinstance(a, np.ndarray)))
+    elif isinstance(matrix, np.ndarray):
+        info['nnz'] = int(np.count_nonzero(matrix))
+        info['nbytes'] = int(matrix.nbytes)
+    return info
+
+
+class StageRecord:
+    """
+    Результаты замера одного этапа
+
+    Атрибуты:
+        name - имя этапа
+        wall_time - астрономическое время, с
+        cpu_time - процессорное время процесса, с
+        peak_alloc - пик памяти, выделенной через Python/numpy во время этапа,
+                     сверх занятой в его начале, байт (None без tracemalloc)
+        matrices - размеры матриц, отмеченных через matrix()
+        info - дополнительные сведения, переданные в stage() или note()
+        error - описание исключения, если этап завершился ошибкой
+    """
+
+    def __init__(self, name, info=None):
+        self.name = name
+        self.wall_time = None
+        self.cpu_time = None
+        self.peak_alloc = None
+        self.matrices = {}
+        self.info = dict(info or {})
+        self.error = None
+        self._start_alloc = 0
+        self._max_alloc = 0
+
+    def matrix(self, label, matrix):
+        """Добавляет в отчет размер матрицы, полученной или использованной на этапе"""
+        self.matrices[label] = matrix_info(matrix)
+        return matrix
+
+    def note(self, **info):
+        """Добавляет в отчет произвольные сведения об этапе"""
+        self.info.update(info)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'peak_alloc': self.peak_alloc,
+            'matrices': self.matrices,
+            'info': self.info,
+            'error': self.error,
+        }
+
+
+class RunReport:
+    """
+    Отчет о выполнении анализа: время, память и размеры матриц по этапам
+
+    Каждый этап оборачивается в контекстный менеджер stage() или в
+    декоратор track(). Пик памяти измеряется через tracemalloc: при
+    вложенных этапах внешний этап учитывает пики внутренних. tracemalloc
+    отслеживает процесс целиком, поэтому у этапов, выполняемых
+    одновременно в разных потоках, пики памяти общие.
+
+    Параметры:
+        name - имя запуска
+        params - параметры запуска (например, n_1..n4)
+        trace_memory - измерять пик памяти (tracemalloc замедляет выделение памяти)
+
+    Пример:
+        report = RunReport('main', params={'n1': 2})
+        with report.stage('build') as stage:
+            L, block_coords = build_L_matrix()
+            stage.matrix('L', L)
+        report.save('run_report.json')
+    """
+
+    def __init__(self, name='run', params=None, trace_memory=True):
+        self.name = name
+        self.params = dict(params or {})
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.created = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self._started_tracing = False
+        self._active = []
+        self._lock = threading.Lock()
+
+    def _update_active_peaks(self):
+        """Переносит текущий пик tracemalloc во все выполняющиеся этапы"""
+        _, peak = tracemalloc.get_traced_memory()
+        for record in self._active:
+            record._max_alloc = max(record._max_alloc, peak)
+
+    @contextlib.contextmanager
+    def stage(self, name, **info):
+        """
+        Замеряет этап анализа
+
+        Параметры:
+            name - имя этапа
+            info - дополнительные сведения для отчета
+
+        Возвращает (в with ... as):
+            record - StageRecord, в который можно добавить размеры матриц
+        """
+        record = StageRecord(name, info)
+
+        with self._lock:
+            if self.trace_memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracing = True
+                self._update_active_peaks()
+                tracemalloc.reset_peak()
+                record._start_alloc, record._max_alloc = tracemalloc.get_traced_memory()
+            self._active.append(record)
+            self.stages.append(record)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        except BaseException as e:
+            record.error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            record.wall_time = time.perf_counter() - wall_start
+            record.cpu_time = time.process_time() - cpu_start
+            with self._lock:
+                if self.trace_memory and tracemalloc.is_tracing():
+                    self._update_active_peaks()
+                    record.peak_alloc = max(0, record._max_alloc - record._start_alloc)
+                self._active.remove(record)
+
+    def track(self, name=None):
+        """
+        Декоратор: каждый вызов функции замеряется как отдельный этап
+
+        Параметры:
+            name - имя этапа (по умолчанию - имя функции)
+        """
+        def decorator(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def close(self):
+        """Останавливает tracemalloc, если он был запущен этим отчетом"""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+    def to_dict(self):
+        """Структура отчета для записи в JSON"""
+        return {
+            'name': self.name,
+            'created': self.created,
+            'params': self.params,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'total_wall_time': time.perf_counter() - self._start,
+            'stages': [record.to_dict() for record in self.stages],
+        }
+
+    def save(self, filename):
+        """
+        Записывает отчет в JSON-файл
+
+        Возвращает:
+            report - записанная структура отчета
+        """
+        report = self.to_dict()
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+    def summary(self):
+        """Текстовая таблица этапов, отсортированная по времени выполнения"""
+        lines = [f'{"этап":<28}{"время, с":>10}{"CPU, с":>10}{"пик, МБ":>10}']
+        for record in sorted(self.stages, key=lambda r: r.wall_time or 0, reverse=True):
+            peak = f'{record.peak_alloc / 2**20:.1f}' if record.peak_alloc is not None else '-'
+            wall = record.wall_time if record.wall_time is not None else 0.0
+            cpu = record.cpu_time if record.cpu_time is not None else 0.0
+            lines.append(f'{record.name:<28}{wall:>10.4f}{cpu:>10.4f}{peak:>10}')
+        return '\n'.join(lines)
@@ -1,190 +1,237 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 from datetime import datetime
 
 # Импорт собственных функций
 from .build_L_matrix import build_L_matrix
-from .visualize_matrix import visualize_matrix
-from .visualize_eigenvalues import visualize_eigenvalues
-from .display_matrix_blocks import display_matrix_blocks
-from .compute_matrix_rank import compute_matrix_rank
-from .create_custom_colormap import create_custom_colormap
+from .build_LLT_matrix import build_LLT_sparse
+from .rendering import FigureRenderer
 from .matrix_analysis_functions import save_characteristic_polynomial
+from .spectral_analysis import SpectralAnalysis
+from .block_decomposition import LLT_block_eigh
+from .analytic_spectrum import analytic_spectrum
+from .spectrum_summary import DEFAULT_RTOL, cluster_eigenvalues, format_spectrum_summary
+from .matrix_export import write_matrix_text
+from .instrumentation import RunReport
+from .pipeline import Pipeline
+
+
+# Файлы результатов анализа и их описания (имя файла совпадает с именем артефакта конвейера)
+RESULT_FILES = {
+    'matrix_L.txt': 'матрица L в текстовом формате',
+    'matrix_L_LT.txt': 'матрица L*L^T в текстовом формате',
+    'eigenvalues_L_LT.txt': 'собственные числа матрицы L*L^T',
+    'characteristic_polynomial.txt': 'характеристический многочлен',
+    'matrix_rank.txt': 'информация о ранге матрицы',
+    'heatmap.png': 'визуализация матрицы L',
+    'L_LT_heatmap.png': 'визуализация матрицы L*L^T',
+    'eigenvalues_L_LT.png': 'визуализация собственных чисел',
+}
+
+
+def _export_L_text(L):
+    """Сохраняет матрицу L в текстовый файл"""
+    L_txt_filename = 'matrix_L.txt'
+    write_matrix_text(L, L_txt_filename, '%8.4f',
+                      header=f'# Матрица L размера {L.shape[0]}x{L.shape[1]}')
+    print(f'Матрица L сохранена в текстовый файл: {L_txt_filename}')
+    return L_txt_filename
+
+
+def _heatmap_L(L, block_coords):
+    """Визуализация матрицы L с выделенными блоками"""
+    filename = 'heatmap.png'
+    # Фигура Agg без pyplot, поэтому этап выполняется параллельно с остальными графиками
+    FigureRenderer().render_blocks(L, block_coords, filename, 'Матрица L с выделенными блоками')
+    print(f'Изображение сохранено в файл: {filename}')
+    return filename
+
+
+def _export_L_LT_text(L_LT):
+    """Сохраняет матрицу L*L^T в текстовый файл"""
+    L_LT_txt_filename = 'matrix_L_LT.txt'
+    write_matrix_text(L_LT, L_LT_txt_filename, '%12.6f',
+                      header=f'# Матрица L*L^T размера {L_LT.shape[0]}x{L_LT.shape[1]}')
+    print(f'Матрица L*L^T сохранена в текстовый файл: {L_LT_txt_filename}')
+    return L_LT_txt_filename
+
+
+def _heatmap_L_LT(L_LT):
+    """Визуализация матрицы L*L^T с отображением максимального значения"""
+    filename = 'L_LT_heatmap.png'
+    # Отдельная фигура Agg без pyplot, поэтому этап не ждет другие графики
+    FigureRenderer().render_matrix(L_LT, filename, 'Матрица L * L^T', show_max_value=True)
+    print(f'Изображение сохранено в файл: {filename}')
+    return filename
+
+
+def _save_eigenvalues(L_LT, spectral, params=None):
+    """
+    Сохраняет различные собственные числа L*L^T с кратностями в текстовый файл
 
-
-def main():
+    Различные значения объединяются с относительным допуском
+    (cluster_eigenvalues), поэтому размер файла пропорционален их числу.
+    При заданных params = (n1, n2, n3, n4) спектр сравнивается с явными
+    формулами analytic_spectrum.
     """
-    Основной скрипт для построения и визуализации матрицы L
+    eigen_filename = 'eigenvalues_L_LT.txt'
+    with open(eigen_filename, 'w') as f:
+        f.write('АНАЛИЗ СОБСТВЕННЫХ ЧИСЕЛ МАТРИЦЫ L*L^T\n')
+        f.write('===========================================\n\n')
+        f.write(f'Дата создания: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n\n')
+        f.write(f'РАЗМЕР МАТРИЦЫ: {L_LT.shape[0]} x {L_LT.shape[1]}\n\n')
+        f.write(f'РАНГ МАТРИЦЫ: {spectral.rank}\n\n')
+        reference = None
+        if params is not None:
+            try:
+                reference = analytic_spectrum(*params)
+            except ValueError as e:
+                # Явные формулы определены только для натуральных n1..n4
+                print(f'Сравнение с явным спектром пропущено: {e}')
+        summary = cluster_eigenvalues(spectral.eigenvalues, rtol=DEFAULT_RTOL, assume_sorted=True)
+        f.write(format_spectrum_summary(summary, reference, DEFAULT_RTOL))
+
+    print(f'Анализ собственных чисел сохранен в файл: {eigen_filename}')
+    return eigen_filename
+
+
+def _plot_eigenvalues(spectral):
+    """Визуализация собственных чисел"""
+    filename = 'eigenvalues_L_LT.png'
+    FigureRenderer().render_eigenvalues(spectral.eigenvalues, filename, 'Собственные числа матрицы L*L^T',
+                                        assume_sorted=True)
+    print(f'Изображение сохранено в файл: {filename}')
+    return filename
+
+
+def _characteristic_polynomial(L_LT, spectral, params=None):
     """
-    # Определение переменных
-    n_1 = 1
-    n1 = 2
-    n2 = 3
-    n3 = 4
-    n4 = 5
-
-    # Вызов функции построения матрицы L
-    L, block_coords = build_L_matrix(n_1, n1, n2, n3, n4)
-
-    # Настройка визуализации
-    d_limits = {
-        'x_top': L.shape[1],
-        'x_bottom': 0,
-        'y_top': L.shape[0],
-        'y_bottom': 0
-    }
-
-    # Сохранение матрицы L в отдельный файл
-    # Используем альтернативный метод из-за проблем с правами доступа
-    try:
-        # Сначала пробуем текстовый формат, который должен работать
-        L_txt_filename = 'matrix_L.txt'
-        with open(L_txt_filename, 'w') as f:
-            f.write(f'# Матрица L размера {L.shape[0]}x{L.shape[1]}\n')
-            for i in range(L.shape[0]):
-                for j in range(L.shape[1]):
-                    f.write(f'{L[i,j]:8.4f} ')
-                f.write('\n')
-        print(f'Матрица L сохранена в текстовый файл: {L_txt_filename}')
-    except Exception as e:
-        print(f'Ошибка при сохранении матрицы L: {str(e)}')
-
-    # Визуализация матрицы L с выделенными блоками
-    plt.figure(figsize=(10, 10))
-
-    # Отрисовка матрицы
-    plt.imshow(L)
-    plt.colorbar(cmap=create_custom_colormap())
-
-    # Устанавливаем равные пропорции осей
-    plt.axis('equal')
-
-    # Устанавливаем границы осей, чтобы каждый элемент занимал ровно 1 пиксель
-    plt.xlim(0.5, L.shape[1] + 0.5)
-    plt.ylim(0.5, L.shape[0] + 0.5)
-
-    # Исправляем направление оси Y
-    plt.gca().invert_yaxis()  # Переворачиваем ось Y, чтобы строки шли сверху вниз
-
-    # Применение пользовательской цветовой схемы
-    plt.imshow(L, cmap=create_custom_colormap())
-    plt.colorbar()
-    plt.clim(-1, 1)
+    Вычисляет и сохраняет характеристический многочлен
 
-    # Добавление прямоугольных областей для выделения блоков
-    display_matrix_blocks(L, block_coords)
-
-    # Настройка заголовка и меток осей
-    plt.title('Матрица L с выделенными блоками', fontsize=14)
-    plt.xlabel('Столбцы (j)', fontsize=12)
-    plt.ylabel('Строки (i)', fontsize=12)
-
-    # Настройка внешнего вида графика
-    plt.grid(False)
-    plt.box(True)
-
-    # Сохранение изображения
-    plt.savefig('heatmap.png', dpi=300)
-    plt.close()
-
-    # Вычисление и визуализация матрицы L*L^T
-    Lt = L.T
-    L_LT = L @ Lt
-
-    # Сохранение матрицы L*L^T в текстовый файл
-    try:
-        L_LT_txt_filename = 'matrix_L_LT.txt'
-        with open(L_LT_txt_filename, 'w') as f:
-            f.write(f'# Матрица L*L^T размера {L_LT.shape[0]}x{L_LT.shape[1]}\n')
-            for i in range(L_LT.shape[0]):
-                for j in range(L_LT.shape[1]):
-                    f.write(f'{L_LT[i,j]:12.6f} ')
-                f.write('\n')
-        print(f'Матрица L*L^T сохранена в текстовый файл: {L_LT_txt_filename}')
-    except Exception as e:
-        print(f'Ошибка при сохранении матрицы L*L^T: {str(e)}')
-
-    # Визуализация матрицы L*L^T с отображением максимального значения
-    visualize_matrix(L_LT, 'Матрица L * L^T', create_custom_colormap, 'L_LT_heatmap.png', True)
-
-    # Анализ собственных чисел матрицы L*L^T
-    # Вычисление собственных чисел
-    eigenvalues_LLT, V_LLT = np.linalg.eig(L_LT)
-    sorted_idx = np.argsort(eigenvalues_LLT)[::-1]
-    sorted_eigenvalues = eigenvalues_LLT[sorted_idx]
-    sorted_eigenvectors = V_LLT[:, sorted_idx]
-
-    # Вычисление ранга матрицы
-    matrix_rank = compute_matrix_rank(L_LT)
-    matrix_rank_L = compute_matrix_rank(L)
-
-    # Сохранение в текстовый файл
-    try:
-        eigen_filename = 'eigenvalues_L_LT.txt'
-        with open(eigen_filename, 'w') as f:
-            f.write('АНАЛИЗ СОБСТВЕННЫХ ЧИСЕЛ МАТРИЦЫ L*L^T\n')
-            f.write('===========================================\n\n')
-            f.write(f'Дата создания: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n\n')
-            f.write(f'РАЗМЕР МАТРИЦЫ: {L_LT.shape[0]} x {L_LT.shape[1]}\n\n')
-            f.write(f'РАНГ МАТРИЦЫ: {matrix_rank}\n\n')
-            f.write('СОБСТВЕННЫЕ ЧИСЛА (отсортированы по убыванию):\n')
-            f.write('========================================================\n\n')
-
-            for i, val in enumerate(sorted_eigenvalues):
-                f.write(f'  λ{i+1} = {val:.15g}\n')
-
-        print(f'Анализ собственных чисел сохранен в файл: {eigen_filename}')
-    except Exception as e:
-        print(f'Ошибка при сохранении собственных чисел: {str(e)}')
-
-    # Визуализация собственных чисел
-    visualize_eigenvalues(sorted_eigenvalues, 'Собственные числа матрицы L*L^T', 'eigenvalues_L_LT.png')
-
-    # Вычисление и сохранение характеристического многочлена
+    При заданных params = (n1, n2, n3, n4) точные коэффициенты и разложение
+    на множители берутся из явного спектра L*L^T.
+    """
+    eigenvalues_LLT = spectral.eigenvalues
     try:
         # Вычисляем и сохраняем характеристический многочлен
-        save_characteristic_polynomial(L_LT, 'L*L^T', 'characteristic_polynomial.txt')
+        save_characteristic_polynomial(L_LT, 'L*L^T', 'characteristic_polynomial.txt', eigenvalues_LLT, params)
+        return 'characteristic_polynomial.txt'
     except Exception as e:
         print(f'Ошибка при вычислении характеристического многочлена: {str(e)}')
-        # Альтернативный метод, если основной не сработал
-        try:
-            poly_coeffs = np.poly(eigenvalues_LLT)
 
-            with open('characteristic_polynomial_simple.txt', 'w') as f:
-                f.write('КОЭФФИЦИЕНТЫ ХАРАКТЕРИСТИЧЕСКОГО МНОГОЧЛЕНА МАТРИЦЫ L*L^T\n')
-                f.write('========================================================\n\n')
-                f.write('Коэффициенты в порядке убывания степеней:\n')
+    # Альтернативный метод, если основной не сработал
+    poly_coeffs = np.poly(eigenvalues_LLT)
+
+    with open('characteristic_polynomial_simple.txt', 'w') as f:
+        f.write('КОЭФФИЦИЕНТЫ ХАРАКТЕРИСТИЧЕСКОГО МНОГОЧЛЕНА МАТРИЦЫ L*L^T\n')
+        f.write('========================================================\n\n')
+        f.write('Коэффициенты в порядке убывания степеней:\n')
+
+        for i, coef in enumerate(poly_coeffs):
+            f.write(f'a{len(poly_coeffs)-i-1} = {coef:.15g}\n')
+
+    print('Упрощенный характеристический многочлен сохранен в файл: characteristic_polynomial_simple.txt')
+    return 'characteristic_polynomial_simple.txt'
+
+
+def _save_rank(L, L_LT, spectral):
+    """Сохраняет ранг в отдельный файл"""
+    # rank(L) = rank(L*L^T), поэтому отдельное SVD матрицы L не требуется
+    matrix_rank = spectral.rank
+    matrix_rank_L = spectral.rank
+
+    rank_filename = 'matrix_rank.txt'
+    with open(rank_filename, 'w') as f:
+        f.write('АНАЛИЗ РАНГА МАТРИЦ\n')
+        f.write('===========================================\n\n')
+        f.write(f'Дата создания: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n\n')
+        f.write(f'Размер матрицы L: {L.shape[0]} x {L.shape[1]}\n')
+        f.write(f'Размер матрицы L*L^T: {L_LT.shape[0]} x {L_LT.shape[1]}\n\n')
+        f.write(f'Ранг матрицы L*L^T: {matrix_rank}\n')
+        f.write('\nПояснение: ранг матрицы - это количество линейно независимых строк или столбцов.\n')
+        f.write('Для симметричной матрицы L*L^T ранг равен количеству ненулевых собственных чисел.\n')
+        f.write('===========================================\n\n')
+        f.write('Ранг L:\n')
+        f.write(f'  {matrix_rank_L}\n\n')
+    print(f'Информация о ранге сохранена в файл: {rank_filename}')
+    return rank_filename
+
+
+def build_analysis_pipeline(n_1=1, n1=2, n2=3, n3=4, n4=5, max_workers=4, report=None):
+    """
+    Создает конвейер анализа матрицы L
 
-                for i, coef in enumerate(poly_coeffs):
-                    f.write(f'a{len(poly_coeffs)-i-1} = {coef:.15g}\n')
+    Промежуточные артефакты: 'L', 'block_coords', 'L_LT' и 'spectral'
+    (разложение eigh матрицы L*L^T, общее для спектра, ранга и многочлена).
+    Файлы результатов являются артефактами с именами из RESULT_FILES.
 
-            print('Упрощенный характеристический многочлен сохранен в файл: characteristic_polynomial_simple.txt')
-        except Exception as e2:
-            print(f'Не удалось сохранить даже упрощенную версию многочлена: {str(e2)}')
+    Параметры:
+        n_1, n1, n2, n3, n4 - параметры матрицы L
+        max_workers - число потоков для независимых этапов
+        report - RunReport для замера этапов (None - без замеров)
 
-    # Сохранение ранга в отдельный файл
-    try:
-        rank_filename = 'matrix_rank.txt'
-        with open(rank_filename, 'w') as f:
-            f.write('АНАЛИЗ РАНГА МАТРИЦ\n')
-            f.write('===========================================\n\n')
-            f.write(f'Дата создания: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n\n')
-            f.write(f'Размер матрицы L: {L.shape[0]} x {L.shape[1]}\n')
-            f.write(f'Размер матрицы L*L^T: {L_LT.shape[0]} x {L_LT.shape[1]}\n\n')
-            f.write(f'Ранг матрицы L*L^T: {matrix_rank}\n')
-            f.write('\nПояснение: ранг матрицы - это количество линейно независимых строк или столбцов.\n')
-            f.write('Для симметричной матрицы L*L^T ранг равен количеству ненулевых собственных чисел.\n')
-            f.write('===========================================\n\n')
-            f.write('Ранг L:\n')
-            f.write(f'  {matrix_rank_L}\n\n')
-        print(f'Информация о ранге сохранена в файл: {rank_filename}')
-    except Exception as e:
-        print(f'Ошибка при сохранении информации о ранге: {str(e)}')
+    Возвращает:
+        pipeline - объект Pipeline
+    """
+    pipeline = Pipeline(max_workers=max_workers, report=report)
+
+    # Элементы L равны -1, 0, 1 и хранятся точно в int8
+    pipeline.add('build_L', lambda: build_L_matrix(n_1, n1, n2, n3, n4, dtype=np.int8),
+                 outputs=('L', 'block_coords'))
+    pipeline.add('export_L_text', _export_L_text, inputs=('L',), outputs=('matrix_L.txt',))
+    # Графики строит FigureRenderer на собственных фигурах Agg без pyplot, поэтому блокировка не нужна
+    pipeline.add('heatmap_L', _heatmap_L, inputs=('L', 'block_coords'), outputs=('heatmap.png',))
+
+    # L*L^T собирается по явным формулам блоков z_i*z_j^T, без умножения матриц
+    pipeline.add('compute_L_LT', lambda: build_LLT_sparse(n_1, n1, n2, n3, n4, dtype=np.int32).toarray(),
+                 outputs=('L_LT',))
+    pipeline.add('export_L_LT_text', _export_L_LT_text, inputs=('L_LT',), outputs=('matrix_L_LT.txt',))
+    pipeline.add('heatmap_L_LT', _heatmap_L_LT, inputs=('L_LT',), outputs=('L_LT_heatmap.png',))
+
+    # L*L^T симметрична, поэтому достаточно одного разложения eigh:
+    # из него берутся спектр, собственные векторы, ранг и многочлен.
+    # Разложение выполняется по независимым блокам не больше 6x6 (LLT_block_eigh)
+    pipeline.add('eigh_L_LT', lambda L_LT: SpectralAnalysis.from_eigenpairs(
+                     *LLT_block_eigh(n_1, n1, n2, n3, n4, compute_eigenvectors=True), L_LT.shape),
+                 inputs=('L_LT',), outputs=('spectral',))
+    pipeline.add('save_eigenvalues',
+                 lambda L_LT, spectral: _save_eigenvalues(L_LT, spectral, (n1, n2, n3, n4)),
+                 inputs=('L_LT', 'spectral'),
+                 outputs=('eigenvalues_L_LT.txt',))
+    pipeline.add('plot_eigenvalues', _plot_eigenvalues, inputs=('spectral',),
+                 outputs=('eigenvalues_L_LT.png',))
+    pipeline.add('characteristic_polynomial',
+                 lambda L_LT, spectral: _characteristic_polynomial(L_LT, spectral, (n1, n2, n3, n4)),
+                 inputs=('L_LT', 'spectral'), outputs=('characteristic_polynomial.txt',))
+    pipeline.add('save_rank', _save_rank, inputs=('L', 'L_LT', 'spectral'), outputs=('matrix_rank.txt',))
+
+    return pipeline
+
+
+def main(report_file='run_report.json', targets=None, max_workers=4):
+    """
+    Основной скрипт для построения и визуализации матрицы L
+
+    Параметры:
+        report_file - JSON-файл с отчетом о времени и памяти по этапам (None - не сохранять)
+        targets - имена файлов результатов (из RESULT_FILES), которые нужно получить;
+                  None - все файлы
+        max_workers - число потоков для независимых этапов
+    """
+    # Определение переменных
+    n_1 = 1
+    n1 = 2
+    n2 = 3
+    n3 = 4
+    n4 = 5
+
+    report = RunReport('main_script', params={'n_1': n_1, 'n1': n1, 'n2': n2, 'n3': n3, 'n4': n4})
+    pipeline = build_analysis_pipeline(n_1, n1, n2, n3, n4, max_workers=max_workers, report=report)
+    artifacts = pipeline.run(list(RESULT_FILES) if targets is None else targets)
 
     # Вывод информации о собственных числах и их значении
-    print('\nПояснение к функции eig():\n')
-    print('[eigenvalues, eigenvectors] = np.linalg.eig(A) возвращает два массива:')
+    print('\nПояснение к функции eigh():\n')
+    print('[eigenvalues, eigenvectors] = np.linalg.eigh(A) возвращает два массива:')
     print('- eigenvalues - массив собственных чисел матрицы A')
     print('- eigenvectors - матрица, столбцы которой являются собственными векторами, соответствующими этим собственным числам\n')
 
@@ -203,14 +250,19 @@ def main():
     print('Корни характеристического многочлена - это собственные числа матрицы.\n')
 
     print('Всего создано файлов с результатами анализа:')
-    print('  - matrix_L.txt - матрица L в текстовом формате')
-    print('  - matrix_L_LT.txt - матрица L*L^T в текстовом формате')
-    print('  - eigenvalues_L_LT.txt - собственные числа матрицы L*L^T')
-    print('  - characteristic_polynomial.txt - характеристический многочлен')
-    print('  - matrix_rank.txt - информация о ранге матрицы')
-    print('  - heatmap.png - визуализация матрицы L')
-    print('  - L_LT_heatmap.png - визуализация матрицы L*L^T')
-    print('  - eigenvalues_L_LT.png - визуализация собственных чисел')
+    for name, description in RESULT_FILES.items():
+        if name in artifacts:
+            print(f'  - {artifacts[name]} - {description}')
+
+    # Отчет о времени и памяти по этапам
+    report.close()
+    print('\nВремя и память по этапам:')
+    print(report.summary())
+    if report_file:
+        report.save(report_file)
+        print(f'Отчет о выполнении сохранен в файл: {report_file}')
+
+    return artifacts
 
 
 if __name__ == "__main__":
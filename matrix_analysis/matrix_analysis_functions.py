@@ -1,13 +1,11 @@
 import numpy as np
 import os
 from datetime import datetime
-import matplotlib.pyplot as plt
-from .compute_matrix_rank import compute_matrix_rank
-from .visualize_matrix import visualize_matrix
-from .visualize_eigenvalues import visualize_eigenvalues
-from .create_custom_colormap import create_custom_colormap
-from .display_matrix_blocks import display_matrix_blocks
 from .save_matrix_to_file import save_matrix_to_file
+from .spectral_analysis import SpectralAnalysis
+from .spectrum_summary import DEFAULT_RTOL, cluster_eigenvalues, format_spectrum_summary
+from .characteristic_polynomial import (charpoly_modular, charpoly_from_factors, factored_characteristic_polynomial,
+                                        format_factored_polynomial, format_polynomial)
 
 
 def save_vector_to_file(vector, description, filename):
@@ -29,28 +27,37 @@ def save_vector_to_file(vector, description, filename):
     print(f'Вектор сохранен в файл: {filename}')
 
 
-def analyze_and_save_eigenvalues(matrix, matrix_name, output_file):
+def analyze_and_save_eigenvalues(matrix, matrix_name, output_file, spectral=None, cache=None,
+                                 reference=None, rtol=DEFAULT_RTOL):
     """
-    Анализирует собственные числа матрицы
+    Анализирует собственные числа симметричной матрицы
+    
+    В текстовый отчет записываются различные собственные числа с
+    кратностями (cluster_eigenvalues), поэтому его размер пропорционален
+    числу различных значений; полный спектр сохраняется в NPZ файл.
     
     Параметры:
-        matrix - анализируемая матрица
+        matrix - анализируемая симметричная матрица (например, L*L^T)
         matrix_name - имя матрицы для отчета
         output_file - имя файла для сохранения результатов
+        spectral - готовый SpectralAnalysis этой матрицы (опционально)
+        cache - MatrixCache для повторного использования разложения (опционально)
+        reference - эталонный спектр для сравнения, например analytic_spectrum (опционально)
+        rtol - относительный допуск объединения собственных чисел
         
     Возвращает:
         result - словарь с результатами анализа
     """
-    # Вычисление собственных чисел и векторов
-    eigenvalues, eigenvectors = np.linalg.eig(matrix)
-    
-    # Сортировка собственных чисел по убыванию
-    idx = np.argsort(eigenvalues)[::-1]
-    sorted_eigenvalues = eigenvalues[idx]
-    sorted_eigenvectors = eigenvectors[:, idx]
-    
-    # Вычисление ранга матрицы
-    matrix_rank = compute_matrix_rank(matrix)
+    # Одно симметричное разложение дает и спектр, и векторы, и ранг
+    if spectral is None and cache is not None:
+        eigenvalues, eigenvectors = cache.get_or_compute('numpy.linalg.eigh', np.linalg.eigh, matrix)
+        spectral = SpectralAnalysis.from_eigenpairs(eigenvalues, eigenvectors, matrix.shape)
+    elif spectral is None:
+        spectral = SpectralAnalysis(matrix)
+    sorted_eigenvalues = spectral.eigenvalues
+    sorted_eigenvectors = spectral.eigenvectors
+    matrix_rank = spectral.rank
+    spectrum = cluster_eigenvalues(sorted_eigenvalues, rtol=rtol, assume_sorted=True)
     
     # Сохранение в файл
     with open(output_file, 'w') as f:
@@ -61,9 +68,7 @@ def analyze_and_save_eigenvalues(matrix, matrix_name, output_file):
         f.write(f'РАЗМЕР МАТРИЦЫ: {matrix.shape[0]} x {matrix.shape[1]}\n\n')
         f.write(f'РАНГ МАТРИЦЫ: {matrix_rank}\n\n')
         
-        f.write('СОБСТВЕННЫЕ ЧИСЛА (отсортированы по убыванию):\n')
-        for i, val in enumerate(sorted_eigenvalues):
-            f.write(f'  λ{i+1} = {val:.10f}\n')
+        f.write(format_spectrum_summary(spectrum, reference, rtol))
     
     print(f'Анализ собственных чисел сохранен в файл: {output_file}')
     
@@ -71,7 +76,8 @@ def analyze_and_save_eigenvalues(matrix, matrix_name, output_file):
     result = {
         'eigenvalues': sorted_eigenvalues,
         'eigenvectors': sorted_eigenvectors,
-        'rank': matrix_rank
+        'rank': matrix_rank,
+        'spectrum': spectrum
     }
     
     # Сохраняем также в NPZ файл
@@ -81,23 +87,53 @@ def analyze_and_save_eigenvalues(matrix, matrix_name, output_file):
     return result
 
 
-def compute_characteristic_polynomial(matrix):
+def compute_characteristic_polynomial(matrix, eigenvalues=None, method='eigenvalues', params=None):
     """
     Вычисляет характеристический многочлен матрицы
     
     Параметры:
         matrix - квадратная матрица для анализа
+        eigenvalues - уже вычисленные собственные числа матрицы (опционально,
+                      позволяет не повторять разложение)
+        method - способ вычисления:
+            'eigenvalues' - np.poly по собственным числам (приближенно, float)
+            'exact' - точные целые коэффициенты для целочисленной матрицы
+                      (вычисления по модулю простых чисел, charpoly_modular)
+            'analytic' - точные целые коэффициенты по явному спектру L·L^T
+                         (нужны params = (n1, n2, n3, n4))
+            'auto' - 'analytic' при заданных params, 'exact' для целочисленной
+                     матрицы, иначе 'eigenvalues'
+        params - параметры (n1, n2, n3, n4) матрицы L, если matrix = L·L^T
         
     Возвращает:
-        poly_coeffs - коэффициенты характеристического многочлена
+        poly_coeffs - коэффициенты характеристического многочлена в порядке убывания
+                      степеней (для точных способов - целые Python, dtype=object)
     """
     # Проверяем, является ли матрица квадратной
     m, n = matrix.shape
     if m != n:
         raise ValueError('Матрица должна быть квадратной для вычисления характеристического многочлена')
-    
-    # Вычисляем собственные числа
-    eigenvalues = np.linalg.eigvals(matrix)
+
+    if method == 'auto':
+        method = _auto_polynomial_method(matrix, params)
+
+    if method == 'analytic':
+        if params is None:
+            raise ValueError("Для способа 'analytic' нужны параметры n1..n4")
+        factors = factored_characteristic_polynomial(params=params)
+        if factors['multiplicity'].sum() != n:
+            raise ValueError('Параметры n1..n4 не соответствуют размеру матрицы')
+        return charpoly_from_factors(factors['value'], factors['multiplicity'])
+    if method == 'exact':
+        return charpoly_modular(matrix)
+    if method != 'eigenvalues':
+        raise ValueError(f'Неизвестный способ вычисления многочлена: {method}')
+    
+    # Вычисляем собственные числа, если они не переданы
+    if eigenvalues is None:
+        if hasattr(matrix, 'toarray'):
+            matrix = matrix.toarray()
+        eigenvalues = np.linalg.eigvals(matrix)
     
     # Вычисляем коэффициенты характеристического многочлена
     # Используем np.poly для вычисления через собственные числа
@@ -106,25 +142,55 @@ def compute_characteristic_polynomial(matrix):
     return poly_coeffs
 
 
-def save_characteristic_polynomial(matrix, matrix_name, filename):
+def _auto_polynomial_method(matrix, params):
+    """Выбирает способ вычисления многочлена для compute_characteristic_polynomial"""
+    if params is not None:
+        return 'analytic'
+    data = matrix.data if hasattr(matrix, 'tocsr') else np.asarray(matrix)
+    if np.issubdtype(data.dtype, np.integer) or np.array_equal(data, np.rint(data)):
+        return 'exact'
+    return 'eigenvalues'
+
+
+def save_characteristic_polynomial(matrix, matrix_name, filename, eigenvalues=None, params=None, method='auto'):
     """
     Вычисляет и сохраняет характеристический многочлен
     
+    Для целочисленной матрицы (например, L*L^T) коэффициенты записываются
+    точно, в виде целых чисел; рядом записывается разложение на множители
+    (λ - μ)^k по собственным числам.
+
     Параметры:
         matrix - квадратная матрица
         matrix_name - имя матрицы для отчета
         filename - имя файла для сохранения результатов
+        eigenvalues - уже вычисленные собственные числа матрицы (опционально)
+        params - параметры (n1, n2, n3, n4), если matrix = L·L^T: разложение
+                 и коэффициенты берутся из явного спектра
+        method - способ вычисления коэффициентов (см. compute_characteristic_polynomial)
     """
     # Проверяем, является ли матрица квадратной
     m, n = matrix.shape
     if m != n:
         raise ValueError('Матрица должна быть квадратной для вычисления характеристического многочлена')
+
+    if method == 'auto':
+        method = _auto_polynomial_method(matrix, params)
     
     # Вычисляем характеристический многочлен
-    poly_coeffs = compute_characteristic_polynomial(matrix)
-    
-    # Получаем степень многочлена (размер матрицы)
-    n = len(poly_coeffs) - 1
+    poly_coeffs = compute_characteristic_polynomial(matrix, eigenvalues, method, params)
+    exact = poly_coeffs.dtype == object
+
+    # Разложение на множители по явному спектру или по собственным числам
+    factors = None
+    if params is not None:
+        factors = factored_characteristic_polynomial(params=params)
+    elif eigenvalues is not None:
+        factors = factored_characteristic_polynomial(eigenvalues)
+    factors_match = None
+    if exact and factors is not None and np.issubdtype(factors['value'].dtype, np.integer):
+        expanded = charpoly_from_factors(factors['value'], factors['multiplicity'])
+        factors_match = list(expanded) == list(poly_coeffs)
     
     # Сохраняем в файл
     try:
@@ -132,52 +198,28 @@ def save_characteristic_polynomial(matrix, matrix_name, filename):
             f.write(f'ХАРАКТЕРИСТИЧЕСКИЙ МНОГОЧЛЕН МАТРИЦЫ {matrix_name}\n')
             f.write('===========================================\n\n')
             f.write(f'Дата создания: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n\n')
-            f.write(f'Размер матрицы: {m} x {n}\n\n')
+            f.write(f'Размер матрицы: {m} x {n}\n')
+            f.write(f'Способ вычисления: {method}' + (' (точные целые коэффициенты)' if exact else '') + '\n\n')
+
+            if factors is not None:
+                f.write('Разложение на множители:\n')
+                f.write(f'{format_factored_polynomial(factors)}\n')
+                if factors_match is not None:
+                    f.write('Проверка: произведение множителей ' +
+                            ('совпадает' if factors_match else 'НЕ совпадает') +
+                            ' с точным многочленом\n')
+                f.write('\n')
             
             # Выводим многочлен в читаемом виде
             f.write('Характеристический многочлен det(λI - A):\n')
-            
-            # Формируем строку многочлена для отображения
-            poly_str = ''
-            for i in range(n+1):
-                coef = poly_coeffs[i]
-                power = n - i
-                
-                # Пропускаем нулевые коэффициенты, кроме свободного члена, если он - единственный
-                if abs(coef) < 1e-10 and (power > 0 or i < n):
-                    continue
-                
-                # Определяем знак для отображения
-                if i == 0:
-                    sign_str = ''  # Первый коэффициент без знака
-                elif coef > 0:
-                    sign_str = ' + '
-                else:
-                    sign_str = ' - '
-                    coef = abs(coef)  # Используем модуль, так как знак уже в строке
-                
-                # Формируем член многочлена
-                if power == 0:
-                    term = f'{coef:.10g}'  # Свободный член
-                elif power == 1:
-                    if abs(coef - 1) < 1e-10:
-                        term = 'λ'  # Коэффициент 1 при λ не пишем
-                    else:
-                        term = f'{coef:.10g}*λ'
-                else:
-                    if abs(coef - 1) < 1e-10:
-                        term = f'λ^{power}'  # Коэффициент 1 не пишем
-                    else:
-                        term = f'{coef:.10g}*λ^{power}'
-                
-                poly_str += sign_str + term
-            
-            f.write(f'{poly_str}\n\n')
+            f.write(f'{format_polynomial(poly_coeffs)}\n\n')
             
             # Выводим коэффициенты в виде массива для удобства использования
             f.write('Коэффициенты многочлена (в порядке убывания степеней):\n[')
-            coef_strings = [f'{c:.15g}' for c in poly_coeffs]
-            f.write(', '.join(coef_strings))
+            if exact:
+                f.write(', '.join(map(str, poly_coeffs)))
+            else:
+                f.write(', '.join(f'{c:.15g}' for c in poly_coeffs))
             f.write(']\n')
         
         print(f'Характеристический многочлен сохранен в файл: {filename}')
@@ -185,9 +227,29 @@ def save_characteristic_polynomial(matrix, matrix_name, filename):
         # Также сохраняем коэффициенты в NPZ-файл
         npz_filename = filename.replace('.txt', '.npz')
         try:
-            np.savez(npz_filename, poly_coeffs=poly_coeffs)
+            arrays = {'poly_coeffs': _float_coefficients(poly_coeffs)}
+            if exact:
+                # Точные коэффициенты могут не помещаться в int64, поэтому хранятся строками
+                arrays['poly_coeffs_exact'] = np.array([str(c) for c in poly_coeffs])
+            if factors is not None:
+                arrays['roots'] = factors['value']
+                arrays['multiplicities'] = factors['multiplicity']
+            np.savez(npz_filename, **arrays)
             print(f'Коэффициенты многочлена сохранены в файл: {npz_filename}')
         except Exception as e:
             print(f'Не удалось сохранить коэффициенты в NPZ-файл: {str(e)}')
     except Exception as e:
         print(f'Ошибка при сохранении характеристического многочлена: {str(e)}')
+
+
+def _float_coefficients(poly_coeffs):
+    """Коэффициенты как float64; слишком большие целые заменяются на ±inf"""
+    if poly_coeffs.dtype != object:
+        return np.asarray(poly_coeffs, dtype=np.float64)
+    result = np.empty(len(poly_coeffs))
+    for i, c in enumerate(poly_coeffs):
+        try:
+            result[i] = float(c)
+        except OverflowError:
+            result[i] = np.inf if c > 0 else -np.inf
+    return result
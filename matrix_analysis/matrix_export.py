@@ -0,0 +1,113 @@
+import itertools
+
+import numpy as np
+
+
+# Примерное число элементов, форматируемых за один вызов
+_CHUNK_ELEMENTS = 1 << 18
+# Размер буфера записи в байтах
+_BUFFER_SIZE = 1 << 20
+
+
+def _chunk_rows(n_cols, chunk_rows):
+    """Число строк в блоке: либо заданное, либо ограниченное числом элементов"""
+    if chunk_rows is not None:
+        return max(1, int(chunk_rows))
+    return max(1, _CHUNK_ELEMENTS // max(1, n_cols))
+
+
+def _dense_rows(matrix, start, end):
+    """Плотная копия строк [start, end) для плотной или разреженной матрицы"""
+    block = matrix[start:end]
+    if hasattr(block, 'toarray'):
+        block = block.toarray()
+    return np.asarray(block)
+
+
+def _default_format(matrix, float_fmt):
+    """Формат элемента по умолчанию: '%d' для целого типа, float_fmt для остальных"""
+    if np.issubdtype(matrix.dtype, np.integer):
+        return '%d'
+    return float_fmt
+
+
+def write_matrix_text(matrix, filename, fmt=None, header=None, chunk_rows=None):
+    """
+    Сохраняет матрицу в текстовый файл построчно, блоками строк
+
+    Каждое значение записывается по формату fmt и отделяется пробелом,
+    строка матрицы заканчивается переводом строки. Блок строк
+    форматируется одним вызовом, поэтому затраты не зависят от числа
+    вызовов на элемент, а память ограничена размером блока.
+
+    Параметры:
+        matrix - матрица (numpy или scipy.sparse)
+        filename - имя файла
+        fmt - формат одного элемента (printf-стиль); None - '%d' для
+              целочисленной матрицы (например, L в int8) и '%8.4f' для остальных
+        header - строка заголовка (записывается первой, если задана)
+        chunk_rows - число строк в блоке (None - подбирается автоматически)
+    """
+    n_rows, n_cols = matrix.shape
+    if fmt is None:
+        fmt = _default_format(matrix, '%8.4f')
+    step = _chunk_rows(n_cols, chunk_rows)
+    row_fmt = (fmt + ' ') * n_cols + '\n'
+
+    with open(filename, 'w', buffering=_BUFFER_SIZE) as f:
+        if header is not None:
+            f.write(header.rstrip('\n') + '\n')
+
+        for start in range(0, n_rows, step):
+            block = _dense_rows(matrix, start, min(start + step, n_rows))
+            f.write((row_fmt * block.shape[0]) % tuple(block.ravel().tolist()))
+
+
+def write_matrix_triplets(matrix, filename, fmt=None, header=None, one_based=False, chunk_rows=None):
+    """
+    Сохраняет только ненулевые элементы матрицы в формате "i j значение"
+
+    Параметры:
+        matrix - матрица (numpy или scipy.sparse)
+        filename - имя файла
+        fmt - формат значения (printf-стиль); None - '%d' для целочисленной
+              матрицы и '%.10g' для остальных
+        header - строка заголовка (если задана, записывается с префиксом '# ')
+        one_based - нумеровать строки и столбцы с единицы
+        chunk_rows - число строк матрицы в блоке (None - подбирается автоматически)
+    """
+    n_rows, n_cols = matrix.shape
+    offset = 1 if one_based else 0
+    if fmt is None:
+        fmt = _default_format(matrix, '%.10g')
+    triplet_fmt = '%d %d ' + fmt + '\n'
+
+    if hasattr(matrix, 'tocsr'):
+        matrix = matrix.tocsr()
+        # Для разреженной матрицы размер блока определяется числом ненулевых элементов
+        nnz_per_row = max(1, matrix.nnz // max(1, n_rows))
+        step = _chunk_rows(nnz_per_row, chunk_rows)
+    else:
+        step = _chunk_rows(n_cols, chunk_rows)
+
+    with open(filename, 'w', buffering=_BUFFER_SIZE) as f:
+        if header:
+            f.write(f'# {header.rstrip()}\n')
+        f.write(f'# {n_rows} {n_cols}\n')
+
+        for start in range(0, n_rows, step):
+            end = min(start + step, n_rows)
+            if hasattr(matrix, 'tocsr'):
+                block = matrix[start:end].tocoo()
+                rows, cols, values = block.row, block.col, block.data
+                keep = values != 0
+                rows, cols, values = rows[keep], cols[keep], values[keep]
+            else:
+                block = np.asarray(matrix[start:end])
+                rows, cols = np.nonzero(block)
+                values = block[rows, cols]
+
+            if rows.size == 0:
+                continue
+            triplets = zip((rows + start + offset).tolist(), (cols + offset).tolist(), values.tolist())
+            f.write((triplet_fmt * rows.size) % tuple(itertools.chain.from_iterable(triplets)))
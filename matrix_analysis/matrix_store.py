@@ -0,0 +1,145 @@
+import json
+import os
+import uuid
+
+import numpy as np
+
+
+# Суффикс файла с метаданными матрицы
+METADATA_SUFFIX = '.json'
+
+
+def atomic_write(filename, write_func):
+    """
+    Записывает файл атомарно: во временный файл в том же каталоге, затем переименование
+
+    Читатели видят либо старую, либо полностью записанную новую версию файла,
+    а данные пишутся один раз, без промежуточного копирования.
+
+    Параметры:
+        filename - имя целевого файла
+        write_func - функция, записывающая данные в переданный двоичный файловый объект
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    tmp_filename = os.path.join(directory, f'.{os.path.basename(filename)}.{uuid.uuid4().hex}.tmp')
+
+    # os.open учитывает umask, поэтому права у файла будут такими же, как при обычной записи
+    fd = os.open(tmp_filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_func(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+
+
+def _to_json(value):
+    """Приводит метаданные (в том числе block_coords с массивами numpy) к JSON-совместимому виду"""
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def save_matrix(matrix, filename, params=None, block_coords=None, metadata=None):
+    """
+    Сохраняет матрицу в двоичный файл и записывает рядом файл метаданных
+
+    Плотная матрица сохраняется в .npy (может быть открыта через mmap),
+    разреженная - в .npz формата scipy.sparse. Для имени с расширением
+    .npz плотная матрица сохраняется под ключом 'matrix' (как раньше
+    делала save_matrix_to_file).
+
+    Параметры:
+        matrix - матрица (numpy или scipy.sparse)
+        filename - имя файла (.npy или .npz)
+        params - параметры построения матрицы (например, словарь n_1..n4)
+        block_coords - координаты блоков из build_L_matrix
+        metadata - дополнительные сведения для файла метаданных
+
+    Возвращает:
+        meta - записанные метаданные
+    """
+    is_sparse = hasattr(matrix, 'tocsr')
+    if is_sparse:
+        import scipy.sparse as sp
+
+        if not filename.endswith('.npz'):
+            raise ValueError('Разреженная матрица сохраняется только в файл .npz')
+        atomic_write(filename, lambda f: sp.save_npz(f, matrix, compressed=False))
+        storage = 'sparse'
+        nnz = int(matrix.nnz)
+    else:
+        matrix = np.asarray(matrix)
+        if filename.endswith('.npz'):
+            atomic_write(filename, lambda f: np.savez(f, matrix=matrix))
+            storage = 'npz'
+        else:
+            atomic_write(filename, lambda f: np.save(f, matrix))
+            storage = 'npy'
+        nnz = int(np.count_nonzero(matrix))
+
+    meta = {
+        'storage': storage,
+        'shape': list(matrix.shape),
+        'dtype': str(matrix.dtype),
+        'nnz': nnz,
+        'params': _to_json(params),
+        'block_coords': _to_json(block_coords),
+    }
+    if metadata:
+        meta.update(_to_json(metadata))
+
+    text = json.dumps(meta, ensure_ascii=False, indent=2).encode('utf-8')
+    atomic_write(filename + METADATA_SUFFIX, lambda f: f.write(text))
+    return meta
+
+
+def load_metadata(filename):
+    """
+    Загружает метаданные матрицы
+
+    Возвращает:
+        meta - словарь метаданных или None, если файла метаданных нет
+    """
+    try:
+        with open(filename + METADATA_SUFFIX, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_matrix(filename, mmap_mode='r'):
+    """
+    Загружает матрицу, сохраненную save_matrix
+
+    Параметры:
+        filename - имя файла
+        mmap_mode - режим отображения в память для .npy ('r', 'r+', 'c' или None);
+                    при 'r' файл не читается целиком, срезы загружаются по мере обращения
+
+    Возвращает:
+        matrix - матрица (numpy.memmap, numpy.ndarray или scipy.sparse)
+    """
+    if not filename.endswith('.npz'):
+        return np.load(filename, mmap_mode=mmap_mode)
+
+    meta = load_metadata(filename)
+    if meta is not None and meta.get('storage') == 'sparse':
+        import scipy.sparse as sp
+        return sp.load_npz(filename)
+
+    with np.load(filename) as data:
+        if 'matrix' in data:
+            return data['matrix']
+    import scipy.sparse as sp
+    return sp.load_npz(filename)
@@ -0,0 +1,189 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage:
+    """
+    Этап конвейера анализа
+
+    Параметры:
+        name - имя этапа
+        func - функция; получает значения входных артефактов в порядке inputs
+        inputs - имена артефактов, необходимых этапу
+        outputs - имена артефактов, которые возвращает func (кортеж при нескольких)
+        lock - имя общей блокировки: этапы с одинаковым lock не выполняются
+               одновременно (например, 'pyplot' для функций с глобальным
+               состоянием matplotlib.pyplot)
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), lock=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.lock = lock
+
+    def __repr__(self):
+        return f'Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})'
+
+
+class Pipeline:
+    """
+    Конвейер этапов, связанных через именованные артефакты
+
+    Этапы объявляют входы и выходы; при запуске выполняются только этапы,
+    необходимые для запрошенных артефактов. Каждый артефакт вычисляется
+    один раз и передается всем зависящим от него этапам. Независимые
+    этапы (например, построение графиков и запись текстовых файлов)
+    выполняются параллельно в пуле потоков.
+
+    Параметры:
+        max_workers - число потоков (1 - последовательное выполнение)
+        report - RunReport для замера этапов (None - без замеров)
+
+    Пример:
+        pipeline = Pipeline()
+        pipeline.add('build', build_L_matrix, outputs=('L', 'block_coords'))
+        pipeline.add('llt', lambda L: L @ L.T, inputs=('L',), outputs=('L_LT',))
+        artifacts = pipeline.run(['L_LT'])
+    """
+
+    def __init__(self, max_workers=4, report=None):
+        self.max_workers = max_workers
+        self.report = report
+        self.stages = {}
+        self._producers = {}
+        self._locks = {}
+        self.errors = {}
+
+    def add(self, name, func, inputs=(), outputs=(), lock=None):
+        """Добавляет этап в конвейер"""
+        if name in self.stages:
+            raise ValueError(f'Этап {name} уже добавлен')
+        stage = Stage(name, func, inputs, outputs, lock)
+        for artifact in stage.outputs:
+            if artifact in self._producers:
+                raise ValueError(f'Артефакт {artifact} уже создается этапом {self._producers[artifact]}')
+            self._producers[artifact] = name
+        if lock is not None:
+            self._locks.setdefault(lock, threading.Lock())
+        self.stages[name] = stage
+        return stage
+
+    def stage(self, inputs=(), outputs=(), name=None, lock=None):
+        """Декоратор: добавляет функцию в конвейер как этап"""
+        def decorator(func):
+            self.add(name or func.__name__, func, inputs, outputs, lock)
+            return func
+        return decorator
+
+    @property
+    def artifacts(self):
+        """Имена всех артефактов, которые может создать конвейер"""
+        return list(self._producers)
+
+    def plan(self, targets):
+        """
+        Определяет этапы, необходимые для получения артефактов
+
+        Параметры:
+            targets - имена запрошенных артефактов
+
+        Возвращает:
+            stages - имена этапов в порядке, допустимом для последовательного выполнения
+        """
+        order = []
+        state = {}
+
+        def visit(stage_name):
+            if state.get(stage_name) == 'done':
+                return
+            if state.get(stage_name) == 'visiting':
+                raise ValueError(f'Циклическая зависимость на этапе {stage_name}')
+            state[stage_name] = 'visiting'
+            for artifact in self.stages[stage_name].inputs:
+                visit(self._producer(artifact))
+            state[stage_name] = 'done'
+            order.append(stage_name)
+
+        for artifact in targets:
+            visit(self._producer(artifact))
+        return order
+
+    def _producer(self, artifact):
+        try:
+            return self._producers[artifact]
+        except KeyError:
+            raise KeyError(f'Нет этапа, создающего артефакт {artifact}') from None
+
+    def _execute(self, stage, values):
+        """Выполняет этап (под его блокировкой и с замером) и возвращает словарь артефактов"""
+        lock = self._locks.get(stage.lock)
+        if lock is not None:
+            lock.acquire()
+        try:
+            if self.report is not None:
+                with self.report.stage(stage.name):
+                    result = stage.func(*values)
+            else:
+                result = stage.func(*values)
+        finally:
+            if lock is not None:
+                lock.release()
+
+        if len(stage.outputs) == 1:
+            result = (result,)
+        elif not stage.outputs:
+            result = ()
+        return dict(zip(stage.outputs, result))
+
+    def run(self, targets=None, artifacts=None):
+        """
+        Выполняет этапы, необходимые для получения артефактов
+
+        Ошибка этапа не останавливает независимые ветви конвейера: этапы,
+        зависящие от неудавшегося, пропускаются, а ошибки собираются в
+        атрибуте errors.
+
+        Параметры:
+            targets - имена запрошенных артефактов (None - все артефакты)
+            artifacts - уже известные артефакты (их этапы не выполняются)
+
+        Возвращает:
+            artifacts - словарь всех полученных артефактов
+        """
+        targets = self.artifacts if targets is None else list(targets)
+        artifacts = dict(artifacts or {})
+        self.errors = {}
+
+        pending = [name for name in self.plan(targets)
+                   if not all(a in artifacts for a in self.stages[name].outputs)]
+        failed = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            while pending or running:
+                # Запускаем все этапы, входы которых уже готовы
+                for name in list(pending):
+                    stage = self.stages[name]
+                    if any(self._producers.get(a) in failed for a in stage.inputs):
+                        failed.add(name)
+                        pending.remove(name)
+                    elif all(a in artifacts for a in stage.inputs):
+                        values = [artifacts[a] for a in stage.inputs]
+                        running[executor.submit(self._execute, stage, values)] = name
+                        pending.remove(name)
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        artifacts.update(future.result())
+                    except Exception as e:
+                        failed.add(name)
+                        self.errors[name] = e
+                        print(f'Ошибка на этапе {name}: {e}')
+
+        return artifacts
@@ -0,0 +1,349 @@
+"""
+Построение изображений без глобального состояния matplotlib.pyplot
+
+FigureRenderer рисует тепловые карты матриц и графики собственных
+чисел через объектный интерфейс matplotlib (Figure + FigureCanvasAgg).
+Фигура и объекты на ней создаются один раз, а для каждого нового
+изображения обновляются их данные (set_data, set_segments, set_clim),
+поэтому тысячи изображений не требуют тысяч новых фигур. Разные
+объекты FigureRenderer независимы и могут работать в разных потоках
+без общей блокировки 'pyplot'.
+
+render_many распределяет задания по пулу процессов; в каждом процессе
+используется один FigureRenderer на все его задания.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from mpl_toolkits.axes_grid1 import make_axes_locatable
+
+from .create_custom_colormap import create_custom_colormap
+from .display_matrix_blocks import display_matrix_blocks
+from .visualize_matrix import MAX_PIXELS, downsample_matrix
+from .visualize_eigenvalues import STEM_LIMIT, _sorted_descending, _group_sorted
+
+
+# Разрешение сохраняемых изображений по умолчанию (как у visualize_matrix)
+DEFAULT_DPI = 300
+
+# Виды изображений и соответствующие методы FigureRenderer
+RENDER_KINDS = ('matrix', 'blocks', 'eigenvalues')
+
+# FigureRenderer процесса (см. process_renderer)
+_process_renderer = None
+
+
+class FigureRenderer:
+    """
+    Многократно используемые фигуры Agg для тепловых карт и спектров
+
+    Параметры:
+        dpi - разрешение сохраняемых изображений
+        colormap_func - функция, возвращающая цветовую схему тепловых карт
+        compress_level - степень сжатия PNG от 0 до 9 (None - по умолчанию Pillow);
+                         при большом числе изображений 1 заметно быстрее
+
+    Пример:
+        renderer = FigureRenderer(dpi=100)
+        for params, L_LT in matrices:
+            renderer.render_matrix(L_LT, f'L_LT_{params}.png', 'Матрица L * L^T')
+    """
+
+    def __init__(self, dpi=DEFAULT_DPI, colormap_func=create_custom_colormap, compress_level=None):
+        self.dpi = dpi
+        self.colormap_func = colormap_func
+        self.compress_level = compress_level
+        self._matrix = None
+        self._blocks = None
+        self._eigenvalues = None
+        self.stats = {'figures': 0, 'images': 0}
+
+    def _new_figure(self, figsize):
+        """Фигура Agg, не зарегистрированная в pyplot"""
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        self.stats['figures'] += 1
+        return fig, fig.add_subplot()
+
+    def _matrix_artists(self):
+        """Фигура тепловой карты: оси и изображение (создаются при первом вызове)"""
+        if self._matrix is None:
+            fig, ax = self._new_figure((9, 7))
+            image = ax.imshow(np.zeros((1, 1)), cmap=self.colormap_func(), interpolation='nearest')
+            ax.set_aspect('equal', adjustable='box')
+            ax.set_xlabel('Столбцы (j)', fontsize=12)
+            ax.set_ylabel('Строки (i)', fontsize=12)
+            ax.grid(False)
+            ax.set_frame_on(True)
+            self._matrix = (fig, ax, image)
+        return self._matrix
+
+    def _block_artists(self):
+        """
+        Фигура матрицы с границами блоков (создается при первом вызове)
+
+        Возвращает:
+            fig, ax, image - фигура, оси и изображение с цветовой шкалой
+            lines - границы блоков предыдущего изображения (список из не более чем
+                    одного LineCollection, заменяется при каждом вызове render_blocks)
+        """
+        if self._blocks is None:
+            fig, ax = self._new_figure((10, 10))
+            image = ax.imshow(np.zeros((1, 1)), cmap=self.colormap_func(), interpolation='nearest',
+                              vmin=-1, vmax=1)
+            # Шкала присоединена к осям и совпадает по высоте с изображением при любых пропорциях матрицы
+            cax = make_axes_locatable(ax).append_axes('right', size='4%', pad=0.2)
+            fig.colorbar(image, cax=cax)
+            ax.set_aspect('equal', adjustable='box')
+            ax.set_xlabel('Столбцы (j)', fontsize=12)
+            ax.set_ylabel('Строки (i)', fontsize=12)
+            ax.grid(False)
+            ax.set_frame_on(True)
+            self._blocks = (fig, ax, image, [])
+        return self._blocks
+
+    def _show_matrix(self, ax, image, matrix, max_pixels, pooling):
+        """
+        Обновляет изображение матрицы на месте
+
+        Большие и разреженные матрицы уменьшаются (downsample_matrix); extent
+        сохраняет координаты элементов исходной матрицы.
+
+        Возвращает:
+            matrix - матрица (плотная numpy или исходная scipy.sparse)
+        """
+        is_sparse = hasattr(matrix, 'tocoo')
+        if not is_sparse:
+            matrix = np.asarray(matrix)
+        n_rows, n_cols = matrix.shape
+        if is_sparse or (max_pixels is not None and max(n_rows, n_cols) > max_pixels):
+            limit = max_pixels if max_pixels is not None else max(n_rows, n_cols)
+            data = downsample_matrix(matrix, (min(n_rows, limit), min(n_cols, limit)), pooling)
+        else:
+            data = matrix
+
+        image.set_data(data)
+        image.set_extent((-0.5, n_cols - 0.5, n_rows - 0.5, -0.5))
+        ax.set_xlim(-0.5, n_cols - 0.5)
+        ax.set_ylim(n_rows - 0.5, -0.5)
+        return matrix
+
+    def _eigenvalue_artists(self):
+        """
+        Фигура спектра (создается при первом вызове)
+
+        Возвращает:
+            fig, ax - фигура и оси
+            artists - словарь объектов: 'markers', 'stems', 'baseline' (как у ax.stem),
+                      'steps' (ступенчатая линия) и 'bars' (линии кратностей)
+        """
+        if self._eigenvalues is None:
+            fig, ax = self._new_figure((8, 4))
+            stems = LineCollection([], colors='b', linestyles='-')
+            bars = LineCollection([], colors='b', linestyles='-')
+            ax.add_collection(stems, autolim=False)
+            ax.add_collection(bars, autolim=False)
+            markers, = ax.plot([], [], 'bo')
+            steps, = ax.plot([], [], 'b-', drawstyle='steps-post')
+            baseline, = ax.plot([], [], 'r-')
+            ax.grid(True)
+            artists = {'markers': markers, 'stems': stems, 'baseline': baseline, 'steps': steps, 'bars': bars}
+            self._eigenvalues = (fig, ax, artists)
+        return self._eigenvalues
+
+    def _save(self, fig, filename):
+        if self.compress_level is None:
+            fig.savefig(filename, dpi=self.dpi)
+        else:
+            fig.savefig(filename, dpi=self.dpi, pil_kwargs={'compress_level': self.compress_level})
+        self.stats['images'] += 1
+        return filename
+
+    def render_matrix(self, matrix, filename, title_text='', show_max_value=False,
+                      max_pixels=MAX_PIXELS, pooling='sign'):
+        """
+        Сохраняет тепловую карту матрицы (аналог visualize_matrix)
+
+        Параметры:
+            matrix - матрица (numpy или scipy.sparse)
+            filename - имя файла изображения
+            title_text - заголовок
+            show_max_value - добавить в заголовок наибольшее и наименьшее значения
+            max_pixels - наибольший размер изображения по каждой оси (см. downsample_matrix)
+            pooling - способ объединения элементов при уменьшении ('sign' или 'maxabs')
+
+        Возвращает:
+            filename - имя сохраненного файла
+        """
+        fig, ax, image = self._matrix_artists()
+        matrix = self._show_matrix(ax, image, matrix, max_pixels, pooling)
+
+        max_val = matrix.max()
+        min_val = matrix.min()
+        max_abs_val = max(abs(max_val), abs(min_val))
+        image.set_clim(-max_abs_val, max_abs_val)
+
+        if show_max_value:
+            max_pos = tuple(int(i) for i in np.unravel_index(matrix.argmax(), matrix.shape))
+            min_pos = tuple(int(i) for i in np.unravel_index(matrix.argmin(), matrix.shape))
+            title_text = (f'{title_text}\nМакс. значение: {max_val:.4f} в позиции {max_pos}, '
+                          f'мин. значение: {min_val:.4f} в позиции {min_pos}')
+        ax.set_title(title_text, fontsize=14)
+        return self._save(fig, filename)
+
+    def render_blocks(self, matrix, block_coords, filename, title_text='',
+                      max_pixels=MAX_PIXELS, pooling='sign'):
+        """
+        Сохраняет матрицу L (элементы -1, 0, 1) с выделенными блоками
+
+        Параметры:
+            matrix - матрица (numpy или scipy.sparse)
+            block_coords - координаты блоков (как у build_L_matrix)
+            filename - имя файла изображения
+            title_text - заголовок
+            max_pixels - наибольший размер изображения по каждой оси (см. downsample_matrix)
+            pooling - способ объединения элементов при уменьшении ('sign' или 'maxabs')
+
+        Возвращает:
+            filename - имя сохраненного файла
+        """
+        fig, ax, image, lines = self._block_artists()
+        self._show_matrix(ax, image, matrix, max_pixels, pooling)
+
+        # Границы блоков предыдущего изображения заменяются новыми
+        while lines:
+            lines.pop().remove()
+        lines.append(display_matrix_blocks(matrix, block_coords, ax=ax))
+
+        ax.set_title(title_text, fontsize=14)
+        return self._save(fig, filename)
+
+    def render_eigenvalues(self, eigenvalues, filename, title_text='', mode='auto',
+                           assume_sorted=False, tolerance=1e-8):
+        """
+        Сохраняет график собственных чисел по убыванию (аналог visualize_eigenvalues)
+
+        Параметры:
+            eigenvalues - вектор собственных чисел
+            filename - имя файла изображения
+            title_text - заголовок
+            mode - 'stem', 'steps', 'histogram' или 'auto' (см. visualize_eigenvalues)
+            assume_sorted - True, если eigenvalues уже упорядочены по убыванию
+            tolerance - наибольшая разность соседних чисел одной группы
+
+        Возвращает:
+            filename - имя сохраненного файла
+        """
+        if mode == 'auto':
+            mode = 'stem' if np.size(eigenvalues) <= STEM_LIMIT else 'steps'
+        if mode not in ('stem', 'steps', 'histogram'):
+            raise ValueError(f'Неизвестный вид графика собственных чисел: {mode}')
+
+        fig, ax, artists = self._eigenvalue_artists()
+        values = _sorted_descending(eigenvalues, assume_sorted)
+        # Данные предыдущего графика сбрасываются, чтобы не влиять на пределы осей
+        for name, artist in artists.items():
+            artist.set_visible(False)
+            if isinstance(artist, LineCollection):
+                artist.set_segments([])
+            else:
+                artist.set_data([], [])
+
+        if mode == 'stem':
+            x = np.arange(values.size, dtype=np.float64)
+            artists['markers'].set_data(x, values)
+            artists['stems'].set_segments(np.stack([np.column_stack([x, np.zeros(values.size)]),
+                                                    np.column_stack([x, values])], axis=1))
+            shown = ('markers', 'stems', 'baseline')
+            x_range = (0.0, max(values.size - 1, 0))
+        else:
+            distinct, counts = _group_sorted(values, tolerance)
+            if mode == 'steps':
+                # Ступень k занимает индексы [edges[k], edges[k+1]) - как точки режима 'stem'
+                edges = np.concatenate([[0], np.cumsum(counts)]) - 0.5
+                artists['steps'].set_data(edges, np.append(distinct, distinct[-1:]))
+                shown = ('steps', 'baseline')
+                x_range = (edges[0], edges[-1])
+            else:
+                artists['bars'].set_segments(np.stack([np.column_stack([distinct, np.zeros(distinct.size)]),
+                                                       np.column_stack([distinct, counts])], axis=1))
+                # Невидимые маркеры на вершинах задают пределы осей
+                artists['markers'].set_data(distinct, counts)
+                shown = ('bars',)
+                x_range = None
+
+        if x_range is not None:
+            artists['baseline'].set_data(x_range, [0.0, 0.0])
+        for name in shown:
+            artists[name].set_visible(True)
+
+        is_histogram = mode == 'histogram'
+        ax.set_xlabel('Значение' if is_histogram else 'Индекс', fontsize=12)
+        ax.set_ylabel('Кратность' if is_histogram else 'Значение', fontsize=12)
+        # Пределы осей пересчитываются по данным линий (включая невидимые маркеры гистограммы)
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title(title_text, fontsize=14)
+        return self._save(fig, filename)
+
+    def render(self, kind, **kwargs):
+        """Выполняет задание вида kind ('matrix', 'blocks' или 'eigenvalues')"""
+        if kind not in RENDER_KINDS:
+            raise ValueError(f'Неизвестный вид изображения: {kind}')
+        return getattr(self, f'render_{kind}')(**kwargs)
+
+
+def process_renderer(dpi=DEFAULT_DPI, compress_level=None):
+    """
+    FigureRenderer текущего процесса (создается при первом вызове)
+
+    Задания одного процесса (например, рабочего процесса перебора
+    параметров) используют одни и те же фигуры.
+    """
+    global _process_renderer
+    renderer = _process_renderer
+    if renderer is None or (renderer.dpi, renderer.compress_level) != (dpi, compress_level):
+        renderer = _process_renderer = FigureRenderer(dpi, compress_level=compress_level)
+    return renderer
+
+
+def _render_chunk(jobs, dpi, compress_level):
+    """Выполняет группу заданий в рабочем процессе"""
+    renderer = process_renderer(dpi, compress_level)
+    return [renderer.render(kind, **kwargs) for kind, kwargs in jobs]
+
+
+def render_many(jobs, max_workers=None, dpi=DEFAULT_DPI, chunksize=16, compress_level=None):
+    """
+    Строит много изображений в пуле процессов
+
+    Параметры:
+        jobs - список заданий (вид, аргументы), например
+               ('eigenvalues', {'eigenvalues': values, 'filename': 'spectrum.png'});
+               вид - 'matrix' (FigureRenderer.render_matrix), 'blocks'
+               (FigureRenderer.render_blocks) или 'eigenvalues'
+               (FigureRenderer.render_eigenvalues)
+        max_workers - число процессов (1 - в текущем процессе, None - по числу процессоров)
+        dpi - разрешение изображений
+        chunksize - число заданий, передаваемых процессу за один раз
+        compress_level - степень сжатия PNG (см. FigureRenderer)
+
+    Возвращает:
+        filenames - имена сохраненных файлов в порядке jobs
+    """
+    jobs = [(kind, dict(kwargs)) for kind, kwargs in jobs]
+    for kind, _ in jobs:
+        if kind not in RENDER_KINDS:
+            raise ValueError(f'Неизвестный вид изображения: {kind}')
+
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), max(1, chunksize))]
+    if max_workers == 1:
+        return [filename for chunk in chunks for filename in _render_chunk(chunk, dpi, compress_level)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_render_chunk, chunks, [dpi] * len(chunks), [compress_level] * len(chunks))
+        return [filename for chunk_result in results for filename in chunk_result]
@@ -1,38 +1,24 @@
-import numpy as np
-import os
-import tempfile
-import shutil
+from .matrix_export import write_matrix_text
+from .matrix_store import save_matrix
 
 
-def save_matrix_to_file(matrix, filename):
+def save_matrix_to_file(matrix, filename, params=None, block_coords=None):
     """
     Сохраняет матрицу в отдельный файл
     
+    Файл записывается сразу в целевой каталог через временный файл и
+    атомарное переименование. Для имени с расширением .npy матрицу
+    можно затем открыть через mmap (см. matrix_store.load_matrix).
+    
     Параметры:
         matrix - матрица для сохранения
-        filename - имя файла
+        filename - имя файла (.npz или .npy)
+        params - параметры построения матрицы для файла метаданных (опционально)
+        block_coords - координаты блоков для файла метаданных (опционально)
     """
-    
-    # Используем временный файл, чтобы избежать проблем с правами доступа
     try:
-        # Создаем временный файл
-        with tempfile.NamedTemporaryFile(suffix='.npz', delete=False) as temp_file:
-            temp_filename = temp_file.name
-            np.savez(temp_filename, matrix=matrix)
-        
-        # Проверяем, что временный файл создан успешно
-        if os.path.exists(temp_filename):
-            try:
-                # Копируем временный файл в целевой
-                shutil.copyfile(temp_filename, filename)
-                # Удаляем временный файл
-                os.remove(temp_filename)
-                print(f'Матрица успешно сохранена в файл: {filename}')
-            except Exception as e:
-                print(f'Не удалось сохранить матрицу в файл {filename}: {str(e)}')
-                print('Попробуйте сохранить в другую директорию.')
-        else:
-            print('Не удалось создать временный файл.')
+        save_matrix(matrix, filename, params=params, block_coords=block_coords)
+        print(f'Матрица успешно сохранена в файл: {filename}')
     except Exception as e:
         print(f'Ошибка при сохранении матрицы: {str(e)}')
         print('Пробуем альтернативный метод сохранения...')
@@ -40,12 +26,8 @@ def save_matrix_to_file(matrix, filename):
         # Альтернативный метод: сохраняем в текстовый файл
         txt_filename = filename.replace('.npz', '.txt') if filename.endswith('.npz') else filename + '.txt'
         try:
-            with open(txt_filename, 'w') as f:
-                f.write(f'# Матрица размера {matrix.shape[0]}x{matrix.shape[1]}\n')
-                for i in range(matrix.shape[0]):
-                    for j in range(matrix.shape[1]):
-                        f.write(f'{matrix[i,j]:15.8f} ')
-                    f.write('\n')
-                print(f'Матрица сохранена в текстовый файл: {txt_filename}')
+            write_matrix_text(matrix, txt_filename, '%15.8f',
+                              header=f'# Матрица размера {matrix.shape[0]}x{matrix.shape[1]}')
+            print(f'Матрица сохранена в текстовый файл: {txt_filename}')
         except Exception as e:
             print(f'Ошибка при сохранении в текстовый файл: {str(e)}')
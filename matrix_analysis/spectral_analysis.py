@@ -0,0 +1,121 @@
+import numpy as np
+
+from .compute_matrix_rank import default_rank_tolerance
+
+
+class SpectralAnalysis:
+    """
+    Спектральный анализ симметричной положительно полуопределенной матрицы (например, L·L^T)
+
+    Разложение выполняется один раз при создании объекта, а ранг,
+    отсортированный спектр, собственные векторы и коэффициенты
+    характеристического многочлена берутся из этого же разложения.
+
+    Параметры:
+        matrix - симметричная матрица (numpy, scipy.sparse или LinearOperator)
+        k - число вычисляемых собственных чисел; None - полный спектр через eigh,
+            иначе частичный спектр методом Ланцоша (scipy.sparse.linalg.eigsh)
+        which - 'largest' или 'smallest': какие собственные числа искать при заданном k
+        compute_eigenvectors - вычислять ли собственные векторы
+        tolerance - порог для определения ненулевых собственных чисел;
+                    None - адаптивный порог относительно λ_max
+    """
+
+    def __init__(self, matrix, k=None, which='largest', compute_eigenvectors=True, tolerance=None):
+        if which not in ('largest', 'smallest'):
+            raise ValueError("Параметр which должен быть 'largest' или 'smallest'")
+
+        self.shape = matrix.shape
+        self.k = k
+        self.which = which
+        self.tolerance = tolerance
+
+        if k is None or k >= self.shape[0]:
+            eigenvalues, eigenvectors = self._full_decomposition(matrix, compute_eigenvectors)
+        else:
+            eigenvalues, eigenvectors = self._partial_decomposition(matrix, k, which, compute_eigenvectors)
+
+        self._set_decomposition(eigenvalues, eigenvectors)
+
+    @classmethod
+    def from_eigenpairs(cls, eigenvalues, eigenvectors, shape, tolerance=None):
+        """
+        Создает объект из уже вычисленного разложения (например, загруженного из кэша)
+
+        Параметры:
+            eigenvalues - собственные числа (в любом порядке)
+            eigenvectors - соответствующие собственные векторы по столбцам или None
+            shape - размер исходной матрицы
+            tolerance - порог для определения ненулевых собственных чисел
+        """
+        spectral = cls.__new__(cls)
+        spectral.shape = tuple(shape)
+        spectral.k = None if len(eigenvalues) == shape[0] else len(eigenvalues)
+        spectral.which = 'largest'
+        spectral.tolerance = tolerance
+        spectral._set_decomposition(np.asarray(eigenvalues), eigenvectors)
+        return spectral
+
+    def _set_decomposition(self, eigenvalues, eigenvectors):
+        # Сортировка собственных чисел по убыванию
+        order = np.argsort(eigenvalues)[::-1]
+        self.eigenvalues = eigenvalues[order]
+        self.eigenvectors = eigenvectors[:, order] if eigenvectors is not None else None
+
+    @staticmethod
+    def _full_decomposition(matrix, compute_eigenvectors):
+        """Полное разложение eigh (для разреженной матрицы используется ее плотная копия)"""
+        if hasattr(matrix, 'toarray'):
+            matrix = matrix.toarray()
+        elif not isinstance(matrix, np.ndarray):
+            raise TypeError('Для полного спектра требуется явная матрица; '
+                            'для LinearOperator укажите число собственных чисел k')
+
+        if compute_eigenvectors:
+            return np.linalg.eigh(matrix)
+        return np.linalg.eigvalsh(matrix), None
+
+    @staticmethod
+    def _partial_decomposition(matrix, k, which, compute_eigenvectors):
+        """Частичное разложение методом Ланцоша"""
+        from scipy.sparse.linalg import eigsh
+
+        mode = 'LA' if which == 'largest' else 'SA'
+        result = eigsh(matrix, k=k, which=mode, return_eigenvectors=compute_eigenvectors)
+        if compute_eigenvectors:
+            return result
+        return result, None
+
+    @property
+    def is_full(self):
+        """True, если вычислен полный спектр"""
+        return len(self.eigenvalues) == self.shape[0]
+
+    def _require_full(self, quantity):
+        if not self.is_full:
+            raise ValueError(f'Для вычисления величины "{quantity}" требуется полный спектр (k=None)')
+
+    @property
+    def rank(self):
+        """Ранг матрицы - количество собственных чисел больше порога"""
+        self._require_full('ранг')
+        tolerance = self.tolerance
+        if tolerance is None:
+            # Для симметричной матрицы |λ| совпадают с сингулярными числами
+            tolerance = default_rank_tolerance(np.max(np.abs(self.eigenvalues), initial=0), self.shape)
+        return int(np.sum(self.eigenvalues > tolerance))
+
+    @property
+    def nullity(self):
+        """Размерность ядра матрицы"""
+        return self.shape[0] - self.rank
+
+    def characteristic_polynomial(self):
+        """
+        Вычисляет коэффициенты характеристического многочлена det(λI - A)
+
+        Возвращает:
+            poly_coeffs - коэффициенты в порядке убывания степеней
+        """
+        self._require_full('характеристический многочлен')
+        return np.poly(self.eigenvalues)
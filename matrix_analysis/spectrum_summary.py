@@ -0,0 +1,122 @@
+import numpy as np
+
+
+# Относительный допуск объединения собственных чисел по умолчанию
+DEFAULT_RTOL = 1e-8
+
+# Различное значение спектра: среднее по группе, кратность и разброс (max - min) внутри группы
+SUMMARY_DTYPE = np.dtype([('value', np.float64), ('multiplicity', np.int64), ('spread', np.float64)])
+
+
+def cluster_eigenvalues(eigenvalues, rtol=DEFAULT_RTOL, atol=0.0, assume_sorted=False, snap_integers=True):
+    """
+    Объединяет близкие собственные числа в различные значения с кратностями
+
+    Упорядоченный по убыванию массив просматривается один раз: новая
+    группа начинается там, где разность соседних чисел больше
+    atol + rtol·max|λ|. Допуск задается относительно масштаба спектра,
+    потому что погрешность eigh пропорциональна max|λ|, в том числе для
+    нулевых собственных чисел. Группа может быть шире допуска, если ее
+    соседние числа идут с шагом меньше допуска; ширина видна в поле 'spread'.
+
+    Параметры:
+        eigenvalues - собственные числа
+        rtol - относительный допуск (доля max|λ|)
+        atol - абсолютный допуск
+        assume_sorted - True, если eigenvalues уже упорядочены по убыванию
+                        (например, SpectralAnalysis.eigenvalues); массив не копируется
+        snap_integers - заменять значение группы ближайшим целым, если оно
+                        отличается от него не больше допуска (спектр L·L^T целый)
+
+    Возвращает:
+        summary - структурированный массив SUMMARY_DTYPE по убыванию значений
+    """
+    values = np.asarray(eigenvalues, dtype=np.float64)
+    if not assume_sorted:
+        values = np.sort(values)[::-1]
+    if values.size == 0:
+        return np.empty(0, dtype=SUMMARY_DTYPE)
+
+    tolerance = atol + rtol * max(abs(values[0]), abs(values[-1]))
+    starts = np.concatenate([[0], np.flatnonzero(values[:-1] - values[1:] > tolerance) + 1])
+    ends = np.append(starts[1:], values.size)
+
+    summary = np.empty(starts.size, dtype=SUMMARY_DTYPE)
+    summary['multiplicity'] = ends - starts
+    summary['value'] = np.add.reduceat(values, starts) / summary['multiplicity']
+    summary['spread'] = values[starts] - values[ends - 1]
+    if snap_integers:
+        nearest = np.rint(summary['value'])
+        snap = np.abs(summary['value'] - nearest) <= tolerance
+        # + 0.0 превращает -0.0 в 0.0
+        summary['value'][snap] = nearest[snap] + 0.0
+    return summary
+
+
+def compare_spectra(summary, reference, tolerance=1e-6):
+    """
+    Сравнивает различные значения спектра с эталоном (например, analytic_spectrum)
+
+    Параметры:
+        summary - результат cluster_eigenvalues
+        reference - структурированный массив с полями 'value' и 'multiplicity' по убыванию
+        tolerance - допустимое отклонение значения
+
+    Возвращает:
+        report - словарь:
+            'match' - совпадают ли все значения и кратности
+            'max_value_error' - наибольшее отклонение значения (None при разном числе значений)
+            'mismatches' - список (номер, значение, кратность, эталонное значение, эталонная кратность)
+    """
+    values = np.asarray(summary['value'], dtype=np.float64)
+    ref_values = np.asarray(reference['value'], dtype=np.float64)
+    counts = np.asarray(summary['multiplicity'])
+    ref_counts = np.asarray(reference['multiplicity'])
+
+    if values.size != ref_values.size:
+        return {
+            'match': False,
+            'max_value_error': None,
+            'mismatches': [('число значений', values.size, int(counts.sum()), ref_values.size, int(ref_counts.sum()))],
+        }
+
+    errors = np.abs(values - ref_values)
+    bad = np.flatnonzero((errors > tolerance) | (counts != ref_counts))
+    return {
+        'match': bad.size == 0,
+        'max_value_error': float(errors.max(initial=0.0)),
+        'mismatches': [(int(i), float(values[i]), int(counts[i]), float(ref_values[i]), int(ref_counts[i]))
+                       for i in bad],
+    }
+
+
+def format_spectrum_summary(summary, reference=None, rtol=None):
+    """
+    Компактный текстовый отчет о спектре: одна строка на различное значение
+
+    Параметры:
+        summary - результат cluster_eigenvalues
+        reference - эталонный спектр для сравнения (например, analytic_spectrum) или None
+        rtol - допуск, с которым построен summary (только для заголовка)
+
+    Возвращает:
+        text - текст отчета (размер пропорционален числу различных значений)
+    """
+    total = int(summary['multiplicity'].sum())
+    header = f'РАЗЛИЧНЫЕ СОБСТВЕННЫЕ ЧИСЛА: {len(summary)} (всего {total}'
+    header += f', относительный допуск {rtol:g})' if rtol is not None else ')'
+
+    lines = [header, f'{"значение":>20} {"кратность":>10} {"разброс":>10}']
+    lines.extend(f'{value:>20.15g} {multiplicity:>10d} {spread:>10.2g}'
+                 for value, multiplicity, spread in summary[['value', 'multiplicity', 'spread']].tolist())
+
+    if reference is not None:
+        report = compare_spectra(summary, reference)
+        lines.append('')
+        if report['match']:
+            lines.append(f'Совпадает с эталонным спектром (наибольшее отклонение {report["max_value_error"]:.3g})')
+        else:
+            lines.append('НЕ СОВПАДАЕТ с эталонным спектром:')
+            lines.extend(f'  {position}: {value} ×{count}, эталон {ref_value} ×{ref_count}'
+                         for position, value, count, ref_value, ref_count in report['mismatches'])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,404 @@
+"""
+Пакетный перебор параметров (n_1, n1, n2, n3, n4)
+
+Для каждого набора параметров выполняется цепочка
+построение L -> ранг -> спектр L·L^T, а результаты всех наборов
+записываются в один CSV-файл. Наборы распределяются по процессам
+ProcessPoolExecutor, уже посчитанные наборы при повторном запуске
+пропускаются.
+
+Пример запуска из командной строки:
+    python -m matrix_analysis.sweep --n1 1:4 --n2 2:5 --n3 3 --n4 2,4,6 --workers 4
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .build_L_matrix import build_L_sparse
+from .build_LLT_matrix import L_LT_product
+from .compute_matrix_rank import compute_matrix_rank, compute_L_rank
+from .spectral_analysis import SpectralAnalysis
+from .analytic_spectrum import analytic_spectrum
+
+
+PARAM_NAMES = ['n_1', 'n1', 'n2', 'n3', 'n4']
+RESULT_FIELDS = PARAM_NAMES + ['rows', 'cols', 'nnz', 'rank', 'nullity',
+                               'lambda_max', 'n_distinct', 'spectrum', 'seconds']
+
+# Переменные окружения, ограничивающие число потоков BLAS/OpenMP
+_BLAS_THREAD_VARIABLES = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                          'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+
+def parse_range(text):
+    """
+    Разбирает диапазон значений параметра из командной строки
+
+    Параметры:
+        text - строка вида '3', '2:6' (включительно), '2:10:2' или '2,4,7'
+
+    Возвращает:
+        values - список целых значений
+    """
+    values = []
+    for part in str(text).split(','):
+        part = part.strip()
+        if ':' in part:
+            bounds = [int(v) for v in part.split(':')]
+            start, stop = bounds[0], bounds[1]
+            step = bounds[2] if len(bounds) > 2 else 1
+            values.extend(range(start, stop + 1, step))
+        elif part:
+            values.append(int(part))
+    return values
+
+
+def parameter_grid(n_1=(1,), n1=(2,), n2=(3,), n3=(4,), n4=(5,)):
+    """
+    Строит список всех наборов параметров (декартово произведение диапазонов)
+
+    Возвращает:
+        grid - список кортежей (n_1, n1, n2, n3, n4)
+    """
+    return list(itertools.product(n_1, n1, n2, n3, n4))
+
+
+def analyze_parameters(params, rank_method='analytic', spectrum_method='analytic', builder=None):
+    """
+    Выполняет анализ одного набора параметров
+
+    Параметры:
+        params - кортеж (n_1, n1, n2, n3, n4)
+        rank_method - 'analytic' (явная формула) или метод compute_matrix_rank ('sparse', 'svd', ...)
+        spectrum_method - 'analytic' (явные формулы), 'eigh' (численно), 'blocks'
+                          (численно по независимым блокам, см. LLT_block_eigh),
+                          'batch' (численно, пакетно для наборов одного размера,
+                          см. batch_analyze и analyze_batch) или 'none'
+        builder - LBuilder, общий для соседних наборов: подблоки L и L·L^T,
+                  не зависящие от изменившихся параметров, берутся из его кэша
+
+    Возвращает:
+        row - словарь с результатами (поля RESULT_FIELDS)
+    """
+    if spectrum_method == 'batch':
+        return analyze_batch([params], rank_method)[0]
+
+    start = time.perf_counter()
+    n_1, n1, n2, n3, n4 = params
+
+    if builder is not None:
+        L, _ = builder.update(n_1=n_1, n1=n1, n2=n2, n3=n3, n4=n4).build()
+    else:
+        L, _ = build_L_sparse(n_1, n1, n2, n3, n4, dtype=np.int8)
+
+    if rank_method == 'analytic':
+        rank = compute_L_rank(n_1, n1, n2, n3, n4)
+    else:
+        rank = compute_matrix_rank(L, method=rank_method)
+
+    if spectrum_method == 'analytic':
+        spectrum = analytic_spectrum(n1, n2, n3, n4)
+        values, counts = spectrum['value'], spectrum['multiplicity']
+    elif spectrum_method in ('eigh', 'blocks'):
+        if spectrum_method == 'blocks':
+            from .block_decomposition import LLT_block_eigh
+
+            eigenvalues, _ = LLT_block_eigh(n_1, n1, n2, n3, n4, max_workers=1)
+        else:
+            L_LT = builder.LLT() if builder is not None else L_LT_product(L)
+            eigenvalues = SpectralAnalysis(L_LT.toarray(), compute_eigenvectors=False).eigenvalues
+        values, counts = _distinct_eigenvalues(eigenvalues)
+    elif spectrum_method == 'none':
+        values, counts = np.array([]), np.array([], dtype=np.int64)
+    else:
+        raise ValueError(f'Неизвестный метод вычисления спектра: {spectrum_method}')
+
+    return _result_row(params, L.shape, L.nnz, rank, values, counts, time.perf_counter() - start)
+
+
+def analyze_batch(grid, rank_method='analytic'):
+    """
+    Анализирует группу наборов параметров пакетно (см. batch_analyze)
+
+    Наборы с одинаковым размером L решаются одним вызовом eigvalsh на
+    стопку матриц L·L^T; время строки - доля общего времени пакета.
+
+    Параметры:
+        grid - список наборов (n_1, n1, n2, n3, n4)
+        rank_method - 'analytic', 'svd' (пакетное SVD стопки L) или 'eigh'
+                      (по собственным числам L·L^T)
+
+    Возвращает:
+        rows - список словарей с результатами (поля RESULT_FIELDS) в порядке grid
+    """
+    if rank_method not in ('analytic', 'svd', 'eigh'):
+        raise ValueError(f"В пакетном режиме ранг вычисляется методами 'analytic', 'svd' или 'eigh', "
+                         f"а не '{rank_method}'")
+
+    from .batch_analysis import batch_analyze
+
+    start = time.perf_counter()
+    results = batch_analyze(grid, rank_method)
+    seconds = (time.perf_counter() - start) / max(1, len(results))
+
+    rows = []
+    for result in results:
+        values, counts = _distinct_eigenvalues(result['eigenvalues'])
+        rows.append(_result_row(result['params'], result['shape'], result['nnz'], result['rank'],
+                                values, counts, seconds))
+    return rows
+
+
+def _distinct_eigenvalues(eigenvalues):
+    """Различные собственные числа (упорядоченные по убыванию) и их кратности (см. cluster_eigenvalues)"""
+    from .spectrum_summary import cluster_eigenvalues
+
+    summary = cluster_eigenvalues(eigenvalues, assume_sorted=True)
+    return summary['value'], summary['multiplicity']
+
+
+def _result_row(params, shape, nnz, rank, values, counts, seconds):
+    """Строка результатов (поля RESULT_FIELDS)"""
+    row = dict(zip(PARAM_NAMES, params))
+    row.update({
+        'rows': shape[0],
+        'cols': shape[1],
+        'nnz': nnz,
+        'rank': rank,
+        'nullity': shape[0] - rank,
+        'lambda_max': f'{values[0]:.10g}' if len(values) else '',
+        'n_distinct': len(values),
+        'spectrum': ';'.join(f'{v:.10g}:{c}' for v, c in zip(values, counts)),
+        'seconds': f'{seconds:.6f}',
+    })
+    return row
+
+
+def _limit_blas_threads():
+    """Инициализатор процесса: один поток BLAS на процесс, чтобы не перегружать процессоры"""
+    for name in _BLAS_THREAD_VARIABLES:
+        os.environ[name] = '1'
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def _analyze_chunk(chunk, rank_method, spectrum_method, cache_dir=None, plot_dir=None, plot_dpi=100):
+    """
+    Анализирует группу наборов параметров в одном процессе
+
+    LBuilder и MatrixCache (scipy.sparse) импортируются здесь, а не при
+    загрузке модуля, чтобы импорт run_sweep оставался быстрым.
+    """
+    if cache_dir is None and spectrum_method == 'batch':
+        rows = analyze_batch(chunk, rank_method)
+    elif cache_dir is None:
+        from .L_builder import LBuilder
+
+        # Соседние наборы сетки обычно отличаются одним параметром
+        builder = LBuilder(dtype=np.int8)
+        rows = [analyze_parameters(params, rank_method, spectrum_method, builder) for params in chunk]
+    elif spectrum_method == 'batch':
+        from .cache import MatrixCache
+
+        # Отсутствующие в кэше наборы считаются одним пакетом
+        start = time.perf_counter()
+        rows = [dict(row) for row in MatrixCache(cache_dir).get_or_compute_many(
+            'sweep.analyze_batch', analyze_batch, chunk, rank_method)]
+        seconds = (time.perf_counter() - start) / max(1, len(rows))
+        for row in rows:
+            row['seconds'] = f'{seconds:.6f}'
+    else:
+        from .cache import MatrixCache
+
+        cache = MatrixCache(cache_dir)
+        rows = []
+        for params in chunk:
+            # Время вычисления в кэш не записывается: в строке - время этого запуска
+            start = time.perf_counter()
+            row = dict(cache.get_or_compute('sweep.analyze_parameters', analyze_parameters,
+                                            params, rank_method, spectrum_method))
+            row['seconds'] = f'{time.perf_counter() - start:.6f}'
+            rows.append(row)
+
+    if plot_dir is not None:
+        _plot_spectra(rows, plot_dir, plot_dpi)
+    return rows
+
+
+def _plot_spectra(rows, plot_dir, dpi):
+    """
+    Сохраняет графики спектров строк результатов
+
+    Все графики процесса рисуются на одной фигуре FigureRenderer
+    (обновляются только данные), поэтому построение изображений
+    выполняется в тех же рабочих процессах, что и анализ.
+    """
+    from .rendering import process_renderer
+
+    renderer = process_renderer(dpi, compress_level=1)
+    for row in rows:
+        if not row['spectrum']:
+            continue
+        pairs = [item.split(':') for item in row['spectrum'].split(';')]
+        eigenvalues = np.repeat([float(v) for v, _ in pairs], [int(c) for _, c in pairs])
+        params = tuple(row[name] for name in PARAM_NAMES)
+        filename = os.path.join(plot_dir, 'eigenvalues_' + '_'.join(str(n) for n in params) + '.png')
+        # Строка spectrum уже упорядочена по убыванию
+        renderer.render_eigenvalues(eigenvalues, filename, f'Собственные числа L·L^T, параметры {params}',
+                                    assume_sorted=True)
+
+
+def _drop_partial_record(output_file):
+    """
+    Удаляет недописанную последнюю строку файла результатов
+
+    Прерванный запуск может оставить запись без завершающего перевода
+    строки; без этой обрезки следующая запись продолжила бы ее, а
+    обрезанная строка с целыми параметрами считалась бы посчитанной.
+    """
+    if not os.path.exists(output_file):
+        return
+    with open(output_file, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        # Ищем последний перевод строки блоками с конца файла
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            last = f.read(step).rfind(b'\n')
+            if last >= 0:
+                f.truncate(position + last + 1)
+                return
+        f.truncate(0)
+
+
+def _load_completed(output_file):
+    """Читает уже посчитанные наборы параметров из файла результатов"""
+    completed = set()
+    if not os.path.exists(output_file):
+        return completed
+    with open(output_file, newline='') as f:
+        for row in csv.DictReader(f):
+            try:
+                completed.add(tuple(int(row[name]) for name in PARAM_NAMES))
+            except (KeyError, ValueError):
+                # Недописанная строка прерванного запуска
+                continue
+    return completed
+
+
+def run_sweep(grid, output_file='sweep_results.csv', workers=None, chunksize=1,
+              resume=True, rank_method='analytic', spectrum_method='analytic', cache_dir=None,
+              plot_dir=None, plot_dpi=100):
+    """
+    Запускает перебор параметров в пуле процессов
+
+    Параметры:
+        grid - список наборов параметров (n_1, n1, n2, n3, n4)
+        output_file - CSV-файл с результатами (одна строка на набор)
+        workers - число процессов (None - по числу процессоров)
+        chunksize - число наборов, передаваемых процессу за один раз
+        resume - пропускать наборы, уже записанные в output_file
+        rank_method, spectrum_method - см. analyze_parameters
+        cache_dir - каталог MatrixCache, общий для всех запусков (None - без кэша)
+        plot_dir - каталог для графиков спектров, по одному на набор (None - без графиков)
+        plot_dpi - разрешение графиков спектров
+
+    Возвращает:
+        count - число посчитанных в этом запуске наборов
+    """
+    if plot_dir is not None:
+        os.makedirs(plot_dir, exist_ok=True)
+    if resume:
+        _drop_partial_record(output_file)
+    completed = _load_completed(output_file) if resume else set()
+    todo = [tuple(params) for params in grid if tuple(params) not in completed]
+    if not todo:
+        print(f'Все наборы параметров уже посчитаны: {output_file}')
+        return 0
+
+    chunks = [todo[i:i + chunksize] for i in range(0, len(todo), chunksize)]
+    write_header = not (resume and os.path.exists(output_file) and os.path.getsize(output_file) > 0)
+
+    # Дочерние процессы наследуют окружение, поэтому ограничиваем BLAS заранее
+    saved_env = {name: os.environ.get(name) for name in _BLAS_THREAD_VARIABLES}
+    for name in _BLAS_THREAD_VARIABLES:
+        os.environ[name] = '1'
+
+    count = 0
+    try:
+        with open(output_file, 'w' if write_header else 'a', newline='') as f, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_limit_blas_threads) as executor:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            if write_header:
+                writer.writeheader()
+
+            futures = [executor.submit(_analyze_chunk, chunk, rank_method, spectrum_method, cache_dir,
+                                       plot_dir, plot_dpi)
+                       for chunk in chunks]
+            for future in as_completed(futures):
+                rows = future.result()
+                writer.writerows(rows)
+                # Результаты сохраняются сразу, чтобы прерванный запуск можно было продолжить
+                f.flush()
+                count += len(rows)
+                print(f'Посчитано наборов: {count} из {len(todo)}')
+    finally:
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    print(f'Результаты перебора сохранены в файл: {output_file}')
+    return count
+
+
+def main(argv=None):
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(description='Перебор параметров матрицы L: построение, ранг, спектр')
+    parser.add_argument('--n_1', default='1', help="значения n_1 (например '1')")
+    parser.add_argument('--n1', default='2', help="значения n1 (например '2:6' или '2,4,7')")
+    parser.add_argument('--n2', default='3', help='значения n2')
+    parser.add_argument('--n3', default='4', help='значения n3')
+    parser.add_argument('--n4', default='5', help='значения n4')
+    parser.add_argument('--output', default='sweep_results.csv', help='CSV-файл с результатами')
+    parser.add_argument('--workers', type=int, default=None, help='число процессов')
+    parser.add_argument('--chunksize', type=int, default=1,
+                        help="наборов на одну задачу (для --spectrum-method batch - размер пакета)")
+    parser.add_argument('--no-resume', action='store_true', help='пересчитать все наборы заново')
+    parser.add_argument('--rank-method', default='analytic',
+                        help="'analytic' или метод compute_matrix_rank ('sparse', 'svd', 'qr', 'gram'); "
+                             "для --spectrum-method batch - 'analytic', 'svd' или 'eigh'")
+    parser.add_argument('--spectrum-method', default='analytic',
+                        choices=['analytic', 'eigh', 'blocks', 'batch', 'none'])
+    parser.add_argument('--cache-dir', default=None, help='каталог кэша результатов (MatrixCache)')
+    parser.add_argument('--plot-dir', default=None, help='каталог для графиков спектров (по одному на набор)')
+    parser.add_argument('--plot-dpi', type=int, default=100, help='разрешение графиков спектров')
+    args = parser.parse_args(argv)
+
+    grid = parameter_grid(parse_range(args.n_1), parse_range(args.n1), parse_range(args.n2),
+                          parse_range(args.n3), parse_range(args.n4))
+    run_sweep(grid, args.output, workers=args.workers, chunksize=args.chunksize,
+              resume=not args.no_resume, rank_method=args.rank_method,
+              spectrum_method=args.spectrum_method, cache_dir=args.cache_dir,
+              plot_dir=args.plot_dir, plot_dpi=args.plot_dpi)
+
+
+if __name__ == '__main__':
+    main()
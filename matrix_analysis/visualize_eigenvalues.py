@@ -1,8 +1,36 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from .spectrum_summary import cluster_eigenvalues
 
-def visualize_eigenvalues(eigenvalues, title_text, filename=None, ax=None):
+
+# Наибольшее число собственных чисел, для которых режим 'auto' рисует stem
+STEM_LIMIT = 2000
+
+
+def _sorted_descending(eigenvalues, assume_sorted):
+    """Собственные числа по убыванию; уже упорядоченный массив не копируется"""
+    values = np.asarray(eigenvalues)
+    if assume_sorted:
+        return values
+    return np.sort(values)[::-1]
+
+
+def _group_sorted(values, tolerance):
+    """
+    Объединяет соседние собственные числа упорядоченного по убыванию массива,
+    отличающиеся не больше чем на tolerance (см. cluster_eigenvalues)
+
+    Возвращает:
+        distinct - среднее значение каждой группы
+        counts - кратности групп
+    """
+    summary = cluster_eigenvalues(values, rtol=0.0, atol=tolerance, assume_sorted=True, snap_integers=False)
+    return summary['value'], summary['multiplicity']
+
+
+def visualize_eigenvalues(eigenvalues, title_text, filename=None, ax=None, mode='auto',
+                          assume_sorted=False, tolerance=1e-8):
     """
     Визуализирует собственные числа
     
@@ -11,7 +39,25 @@ def visualize_eigenvalues(eigenvalues, title_text, filename=None, ax=None):
         title_text - заголовок графика
         filename - имя файла для сохранения
         ax - объект осей matplotlib (опционально)
+        mode - вид графика:
+            'stem' - каждое собственное число отдельным стеблем
+            'steps' - ступенчатая функция λ(индекс): одна ступень на группу
+                      равных в пределах tolerance чисел, ширина ступени - кратность
+            'histogram' - кратность каждого различного значения (вертикальные линии)
+            'auto' - 'stem' для не более STEM_LIMIT чисел, иначе 'steps'
+        assume_sorted - True, если eigenvalues уже упорядочены по убыванию
+                        (например, SpectralAnalysis.eigenvalues); массив не копируется
+        tolerance - наибольшая разность соседних чисел одной группы для 'steps' и 'histogram'
+
+    В режимах 'steps' и 'histogram' на оси добавляется по одному объекту
+    matplotlib, а число точек равно числу различных значений, поэтому
+    время отрисовки не зависит от длины спектра.
     """
+    if mode == 'auto':
+        mode = 'stem' if np.size(eigenvalues) <= STEM_LIMIT else 'steps'
+    if mode not in ('stem', 'steps', 'histogram'):
+        raise ValueError(f'Неизвестный вид графика собственных чисел: {mode}')
+
     # Create a new figure if ax not provided
     if ax is None:
         fig = plt.figure(figsize=(8, 4))
@@ -20,14 +66,28 @@ def visualize_eigenvalues(eigenvalues, title_text, filename=None, ax=None):
         fig = ax.figure
     
     # Сортировка собственных чисел по убыванию
-    sorted_eigenvalues = np.sort(eigenvalues)[::-1]
+    sorted_eigenvalues = _sorted_descending(eigenvalues, assume_sorted)
     
     # Визуализация собственных чисел
-    markerline, stemlines, baseline = ax.stem(sorted_eigenvalues, linefmt='b-', markerfmt='bo', basefmt='r-')
+    if mode == 'stem':
+        markerline, stemlines, baseline = ax.stem(sorted_eigenvalues, linefmt='b-', markerfmt='bo', basefmt='r-')
+        ax.set_xlabel('Индекс', fontsize=12)
+        ax.set_ylabel('Значение', fontsize=12)
+    else:
+        distinct, counts = _group_sorted(sorted_eigenvalues, tolerance)
+        if mode == 'steps':
+            # Ступень k занимает индексы [edges[k], edges[k+1]) - как точки stem
+            edges = np.concatenate([[0], np.cumsum(counts)]) - 0.5
+            markerline = ax.stairs(distinct, edges, color='b', baseline=None)
+            ax.axhline(0, color='r')
+            ax.set_xlabel('Индекс', fontsize=12)
+            ax.set_ylabel('Значение', fontsize=12)
+        else:
+            markerline = ax.vlines(distinct, 0, counts, colors='b')
+            ax.set_xlabel('Значение', fontsize=12)
+            ax.set_ylabel('Кратность', fontsize=12)
     ax.grid(True)
     ax.set_title(title_text, fontsize=14)
-    ax.set_xlabel('Индекс', fontsize=12)
-    ax.set_ylabel('Значение', fontsize=12)
     
     # Сохранение
     if filename:
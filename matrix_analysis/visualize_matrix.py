@@ -1,44 +1,127 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
 from .create_custom_colormap import create_custom_colormap
 
 
-def visualize_matrix(matrix, title_text, colormap_func=create_custom_colormap, filename=None, show_max_value=False, ax=None):
+# Максимальный размер изображения по каждой оси (в пикселях) без прореживания
+MAX_PIXELS = 2000
+
+
+def _bin_starts(n, n_bins):
+    """Начала n_bins почти равных отрезков, на которые делится диапазон 0..n-1"""
+    return np.arange(n_bins, dtype=np.int64) * n // n_bins
+
+
+def _bin_index(index, n, n_bins):
+    """Номер отрезка из _bin_starts, в который попадает индекс"""
+    return ((index.astype(np.int64) + 1) * n_bins - 1) // n
+
+
+def downsample_matrix(matrix, shape, mode='sign'):
+    """
+    Уменьшает матрицу до заданного размера, объединяя элементы в прямоугольные ячейки
+
+    Каждый пиксель результата соответствует блоку элементов матрицы.
+    Разреженная матрица обрабатывается по своим ненулевым элементам,
+    плотная копия не создается, поэтому затраты определяются числом
+    ненулевых элементов и размером изображения, а не размером матрицы.
+
+    Параметры:
+        matrix - матрица (numpy или scipy.sparse)
+        shape - размер результата (строки, столбцы); не больше размера матрицы
+        mode - способ объединения:
+            'sign' - элемент с наибольшим модулем вместе с его знаком
+            'maxabs' - наибольший модуль элементов блока
+
+    Возвращает:
+        image - уменьшенная матрица размера shape
+    """
+    if mode not in ('sign', 'maxabs'):
+        raise ValueError(f'Неизвестный способ объединения: {mode}')
+
+    n_rows, n_cols = matrix.shape
+    out_rows, out_cols = min(shape[0], n_rows), min(shape[1], n_cols)
+
+    if hasattr(matrix, 'tocoo'):
+        coo = matrix.tocoo()
+        # Номер ячейки изображения для каждого ненулевого элемента
+        cells = _bin_index(coo.row, n_rows, out_rows) * out_cols + _bin_index(coo.col, n_cols, out_cols)
+        values = coo.data
+        # Неявные нули учитываются начальным значением 0
+        max_val = np.zeros(out_rows * out_cols)
+        min_val = np.zeros(out_rows * out_cols)
+        np.maximum.at(max_val, cells, values)
+        np.minimum.at(min_val, cells, values)
+        max_val = max_val.reshape(out_rows, out_cols)
+        min_val = min_val.reshape(out_rows, out_cols)
+    else:
+        # Свертка выполняется в типе матрицы (для int8 в 8 раз меньше данных),
+        # в float64 переводится только уменьшенное изображение
+        matrix = np.asarray(matrix)
+        row_starts = _bin_starts(n_rows, out_rows)
+        col_starts = _bin_starts(n_cols, out_cols)
+        max_val = np.maximum.reduceat(np.maximum.reduceat(matrix, row_starts, axis=0), col_starts, axis=1)
+        min_val = np.minimum.reduceat(np.minimum.reduceat(matrix, row_starts, axis=0), col_starts, axis=1)
+        max_val = max_val.astype(np.float64)
+        min_val = min_val.astype(np.float64)
+
+    if mode == 'maxabs':
+        return np.maximum(max_val, -min_val)
+    return np.where(max_val >= -min_val, max_val, min_val)
+
+
+def visualize_matrix(matrix, title_text, colormap_func=create_custom_colormap, filename=None, show_max_value=False, ax=None,
+                     max_pixels=MAX_PIXELS, pooling='sign'):
     """
     Создает тепловую карту матрицы
     
     Параметры:
-        matrix - матрица для визуализации
+        matrix - матрица для визуализации (numpy или scipy.sparse)
         title_text - заголовок графика
         colormap_func - функция для цветовой схемы
         filename - имя файла для сохранения
         show_max_value - флаг отображения максимального значения
         ax - объект осей matplotlib (опционально)
+        max_pixels - наибольший размер изображения по каждой оси; большие матрицы
+                     предварительно уменьшаются функцией downsample_matrix (None - без уменьшения)
+        pooling - способ объединения элементов при уменьшении ('sign' или 'maxabs')
     """
     # Create a new figure if ax not provided
-    if ax is None:
+    created_figure = ax is None
+    if created_figure:
         fig = plt.figure(figsize=(9, 7))
-        ax = plt.gca()  # Get current axes
+        ax = fig.gca()
     else:
         fig = ax.figure
-      # Отрисовка матрицы
-    im = ax.imshow(matrix, cmap=colormap_func())
+
+    is_sparse = hasattr(matrix, 'tocoo')
+    if not is_sparse:
+        matrix = np.asarray(matrix)
+    n_rows, n_cols = matrix.shape
+    if is_sparse or (max_pixels is not None and max(n_rows, n_cols) > max_pixels):
+        limit = max_pixels if max_pixels is not None else max(n_rows, n_cols)
+        image = downsample_matrix(matrix, (min(n_rows, limit), min(n_cols, limit)), pooling)
+    else:
+        image = matrix
+
+    # Отрисовка матрицы; extent сохраняет координаты элементов исходной матрицы
+    im = ax.imshow(image, cmap=colormap_func(), interpolation='nearest',
+                   extent=(-0.5, n_cols - 0.5, n_rows - 0.5, -0.5))
     ax.axis('equal')
     ax.axis('tight')
     
     # Настройка цветовой шкалы
     # Note: we don't automatically add colorbar since it might be managed externally
     # The caller can add it with plt.colorbar(im) or fig.colorbar(im)
-    max_abs_val = np.max(np.abs(matrix))
+    max_val = matrix.max()
+    min_val = matrix.min()
+    max_abs_val = max(abs(max_val), abs(min_val))
     im.set_clim(-max_abs_val, max_abs_val)
     
     # Заголовок и метки осей
     if show_max_value:        
-        max_val = np.max(matrix)
-        min_val = np.min(matrix)
-        max_pos = np.unravel_index(np.argmax(matrix), matrix.shape)
-        min_pos = np.unravel_index(np.argmin(matrix), matrix.shape)
+        max_pos = tuple(int(i) for i in np.unravel_index(matrix.argmax(), matrix.shape))
+        min_pos = tuple(int(i) for i in np.unravel_index(matrix.argmin(), matrix.shape))
         
         title_with_max = f'{title_text}\nМакс. значение: {max_val:.4f} в позиции {max_pos}, мин. значение: {min_val:.4f} в позиции {min_pos}'
         ax.set_title(title_with_max, fontsize=14)
@@ -58,13 +141,11 @@ def visualize_matrix(matrix, title_text, colormap_func=create_custom_colormap, f
     
     # Сохранение
     if filename:
-        fig = ax.figure
         fig.savefig(filename, dpi=300)
         print(f'Изображение сохранено в файл: {filename}')
     
     # Apply tight_layout to the figure if we created it
-    if ax is plt.gca():
-        fig = ax.figure
+    if created_figure:
         fig.tight_layout()
         plt.show()
     
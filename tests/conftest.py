@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+# Графики строятся без дисплея
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# Небольшие наборы (n_1, n1, n2, n3, n4), в том числе с совпадающими
+# параметрами (совпадающие собственные числа) и с единичными множителями
+PARAMS = [
+    (1, 2, 3, 4, 5),
+    (1, 1, 3, 4, 5),
+    (1, 2, 2, 3, 3),
+    (1, 3, 2, 4, 2),
+]
+
+
+@pytest.fixture(params=PARAMS, ids=lambda params: '-'.join(map(str, params)))
+def params(request):
+    """Набор параметров матрицы L"""
+    return request.param
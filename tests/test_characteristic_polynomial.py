@@ -0,0 +1,61 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from matrix_analysis.analytic_spectrum import analytic_spectrum
+from matrix_analysis.build_LLT_matrix import build_LLT_sparse
+from matrix_analysis.characteristic_polynomial import (charpoly_from_factors, charpoly_modular,
+                                                       factored_characteristic_polynomial)
+
+
+def faddeev_leverrier(matrix):
+    """
+    Эталонный многочлен det(λI - A) методом Фаддеева-Леверье в точной арифметике
+
+    M_0 = 0, c_n = 1; M_k = A·M_{k-1} + c_{n-k+1}·I, c_{n-k} = -tr(A·M_k)/k
+    """
+    A = [[Fraction(int(v)) for v in row] for row in np.asarray(matrix)]
+    n = len(A)
+    M = [[Fraction(0)] * n for _ in range(n)]
+    coeffs = [Fraction(1)]
+    for k in range(1, n + 1):
+        AM = [[sum(A[i][t] * M[t][j] for t in range(n)) for j in range(n)] for i in range(n)]
+        M = [[AM[i][j] + (coeffs[-1] if i == j else 0) for j in range(n)] for i in range(n)]
+        trace = sum(sum(A[i][t] * M[t][i] for t in range(n)) for i in range(n))
+        coeffs.append(-trace / k)
+    assert all(c.denominator == 1 for c in coeffs)
+    return [int(c) for c in coeffs]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_charpoly_modular_matches_faddeev(seed):
+    rng = np.random.default_rng(seed)
+    A = rng.integers(-5, 6, size=(7, 7))
+
+    assert charpoly_modular(A).tolist() == faddeev_leverrier(A)
+
+
+def test_charpoly_modular_matches_faddeev_for_LLT():
+    L_LT = build_LLT_sparse(1, 1, 2, 2, 3, dtype=np.int32)
+
+    assert charpoly_modular(L_LT).tolist() == faddeev_leverrier(L_LT.toarray())
+
+
+def test_charpoly_from_analytic_factors(params):
+    """Многочлен по явному спектру совпадает с точным многочленом матрицы L·L^T"""
+    L_LT = build_LLT_sparse(*params, dtype=np.int32)
+    spectrum = analytic_spectrum(*params[1:])
+
+    expected = charpoly_modular(L_LT)
+    assert charpoly_from_factors(spectrum['value'], spectrum['multiplicity']).tolist() == expected.tolist()
+    assert len(expected) == L_LT.shape[0] + 1
+
+
+def test_factored_polynomial_from_eigenvalues(params):
+    L_LT = build_LLT_sparse(*params, dtype=np.int32).toarray().astype(np.float64)
+    factors = factored_characteristic_polynomial(eigenvalues=np.linalg.eigvalsh(L_LT))
+    spectrum = analytic_spectrum(*params[1:])
+
+    np.testing.assert_array_equal(factors['value'], spectrum['value'])
+    np.testing.assert_array_equal(factors['multiplicity'], spectrum['multiplicity'])
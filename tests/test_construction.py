@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from matrix_analysis.build_L_matrix import build_L_matrix, build_L_sparse
+from matrix_analysis.build_LLT_matrix import build_LLT_sparse, L_LT_product
+from matrix_analysis.L_builder import LBuilder
+from matrix_analysis.L_operator import LOperator
+
+
+def test_sparse_L_matches_dense(params):
+    """Разреженная L совпадает с плотной, координаты блоков тоже"""
+    L, block_coords = build_L_matrix(*params)
+    L_sparse, sparse_coords = build_L_sparse(*params, dtype=np.int8)
+
+    assert L_sparse.shape == L.shape
+    np.testing.assert_array_equal(L_sparse.toarray(), L)
+    np.testing.assert_equal(sparse_coords, block_coords)
+    assert set(np.unique(L)) <= {-1, 0, 1}
+
+
+def test_LLT_matches_product(params):
+    """L·L^T по явным формулам блоков совпадает с произведением матриц"""
+    L, _ = build_L_matrix(*params)
+    expected = L @ L.T
+
+    np.testing.assert_array_equal(build_LLT_sparse(*params, dtype=np.int32).toarray(), expected)
+    np.testing.assert_array_equal(L_LT_product(L), expected)
+
+
+def test_L_builder_follows_updates(params):
+    """LBuilder после update() совпадает с построением с нуля"""
+    builder = LBuilder(1, 2, 3, 4, 5, dtype=np.int8)
+    builder.build()
+    builder.LLT()
+
+    n_1, n1, n2, n3, n4 = params
+    L, block_coords = builder.update(n_1=n_1, n1=n1, n2=n2, n3=n3, n4=n4).build()
+    L_dense, dense_coords = build_L_matrix(*params)
+
+    np.testing.assert_array_equal(L.toarray(), L_dense)
+    np.testing.assert_equal(block_coords, dense_coords)
+    np.testing.assert_array_equal(builder.LLT().toarray(), L_dense @ L_dense.T)
+
+
+def test_L_builder_reuses_assembled_matrices():
+    """Повторные build()/LLT() без изменения параметров не собирают матрицы заново"""
+    builder = LBuilder(1, 2, 3, 4, 5, dtype=np.int8)
+    L, _ = builder.build()
+    L_LT = builder.LLT()
+
+    assert builder.build()[0] is L
+    assert builder.update(n4=5).LLT() is L_LT
+    assert builder.stats['assembled_hits'] == 2
+    assert builder.update(n4=6).build()[0] is not L
+
+
+def test_L_builder_rejects_unknown_parameter():
+    with pytest.raises(ValueError):
+        LBuilder().update(n5=3)
+
+
+def test_L_operator_matches_matrix(params):
+    """Матрично-свободные произведения LOperator совпадают с явной матрицей"""
+    L, _ = build_L_matrix(*params)
+    operator = LOperator(*params)
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(L.shape[1])
+    y = rng.standard_normal(L.shape[0])
+    X = rng.standard_normal((L.shape[1], 3))
+
+    assert operator.shape == L.shape
+    np.testing.assert_allclose(operator @ x, L @ x)
+    np.testing.assert_allclose(operator.T @ y, L.T @ y)
+    np.testing.assert_allclose(operator @ X, L @ X)
+    np.testing.assert_allclose(operator.llt_matvec(y), L @ (L.T @ y))
+    np.testing.assert_allclose(operator.LLT() @ y, L @ (L.T @ y))
+
+
+def test_L_operator_integer_product():
+    """Для целого типа произведение вычисляется точно в целых числах"""
+    L, _ = build_L_matrix(1, 2, 3, 4, 5)
+    operator = LOperator(1, 2, 3, 4, 5, dtype=np.int8)
+    x = np.arange(L.shape[1], dtype=np.int64)
+
+    result = operator @ x
+    assert np.issubdtype(result.dtype, np.integer)
+    np.testing.assert_array_equal(result, L.astype(np.int64) @ x)
@@ -0,0 +1,105 @@
+import csv
+
+import numpy as np
+import pytest
+
+from matrix_analysis.analytic_spectrum import analytic_eigenvalues
+from matrix_analysis.compute_matrix_rank import compute_L_rank
+from matrix_analysis.main_script import build_analysis_pipeline
+from matrix_analysis.pipeline import Pipeline
+from matrix_analysis.sweep import parameter_grid, run_sweep
+
+
+def test_pipeline_runs_required_stages_once():
+    calls = []
+
+    def stage(name, value):
+        def func(*inputs):
+            calls.append(name)
+            return value + sum(inputs)
+        return func
+
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add('a', stage('a', 1), outputs=('a',))
+    pipeline.add('b', stage('b', 10), inputs=('a',), outputs=('b',))
+    pipeline.add('c', stage('c', 100), inputs=('a',), outputs=('c',))
+    pipeline.add('d', stage('d', 0), inputs=('b', 'c'), outputs=('d',))
+
+    artifacts = pipeline.run(['d'])
+    assert artifacts['d'] == 11 + 101
+    assert sorted(calls) == ['a', 'b', 'c', 'd']
+
+    # Уже известные артефакты не вычисляются заново
+    calls.clear()
+    assert pipeline.run(['b'], artifacts={'a': 5}) == {'a': 5, 'b': 15}
+    assert calls == ['b']
+
+
+def test_pipeline_collects_errors():
+    def fail():
+        raise RuntimeError('ошибка')
+
+    pipeline = Pipeline(max_workers=1)
+    pipeline.add('fail', fail, outputs=('x',))
+    pipeline.add('after', lambda x: x, inputs=('x',), outputs=('y',))
+    pipeline.add('other', lambda: 1, outputs=('z',))
+
+    artifacts = pipeline.run()
+    assert artifacts == {'z': 1}
+    assert list(pipeline.errors) == ['fail']
+
+
+def test_analysis_pipeline_round_trip(tmp_path, monkeypatch):
+    """Конвейер main_script записывает файлы, согласованные с явными формулами"""
+    monkeypatch.chdir(tmp_path)
+    params = (1, 2, 3, 4, 5)
+
+    pipeline = build_analysis_pipeline(*params, max_workers=2)
+    artifacts = pipeline.run(['matrix_L.txt', 'eigenvalues_L_LT.txt', 'characteristic_polynomial.txt',
+                              'matrix_rank.txt', 'heatmap.png'])
+
+    assert not pipeline.errors
+    for name in ('matrix_L.txt', 'eigenvalues_L_LT.txt', 'characteristic_polynomial.txt',
+                 'matrix_rank.txt', 'heatmap.png'):
+        assert (tmp_path / artifacts[name]).stat().st_size > 0
+
+    np.testing.assert_array_equal(np.loadtxt(tmp_path / artifacts['matrix_L.txt']), artifacts['L'])
+
+    rank_text = (tmp_path / artifacts['matrix_rank.txt']).read_text()
+    assert str(compute_L_rank(*params)) in rank_text
+    np.testing.assert_allclose(artifacts['spectral'].eigenvalues, analytic_eigenvalues(*params[1:]), atol=1e-9)
+
+
+def _read_rows(filename):
+    with open(filename, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize('spectrum_method', ['analytic', 'batch'])
+def test_sweep_resume_after_partial_record(tmp_path, spectrum_method):
+    """Прерванный запуск: недописанная строка удаляется и пересчитывается"""
+    grid = parameter_grid(n1=(1, 2, 3), n2=(3,), n3=(4,), n4=(2, 5))
+    output = tmp_path / 'sweep.csv'
+    cache_dir = str(tmp_path / 'cache')
+
+    assert run_sweep(grid, str(output), workers=1, chunksize=3, spectrum_method=spectrum_method,
+                     cache_dir=cache_dir) == len(grid)
+    complete = {tuple(row[name] for name in ('n1', 'n4')): row for row in _read_rows(output)}
+
+    # Обрываем файл посреди записи последней строки
+    data = output.read_bytes()
+    last_start = data.rstrip(b'\r\n').rfind(b'\n') + 1
+    output.write_bytes(data[:last_start + 12])
+
+    assert run_sweep(grid, str(output), workers=1, chunksize=3, spectrum_method=spectrum_method,
+                     cache_dir=cache_dir) == 1
+    rows = _read_rows(output)
+    assert len(rows) == len(grid)
+    for row in rows:
+        expected = complete[row['n1'], row['n4']]
+        assert {k: v for k, v in row.items() if k != 'seconds'} == \
+               {k: v for k, v in expected.items() if k != 'seconds'}
+        assert float(row['seconds']) >= 0
+        assert int(row['rank']) == compute_L_rank(*(int(row[name]) for name in ('n_1', 'n1', 'n2', 'n3', 'n4')))
+
+    assert run_sweep(grid, str(output), workers=1) == 0
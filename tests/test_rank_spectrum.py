@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from conftest import PARAMS
+from matrix_analysis.analytic_spectrum import analytic_eigenvalues, analytic_spectrum, verify_analytic_spectrum
+from matrix_analysis.basis import find_basis_rows
+from matrix_analysis.batch_analysis import batch_analyze
+from matrix_analysis.block_decomposition import LLT_block_eigh, block_eigh
+from matrix_analysis.build_L_matrix import build_L_matrix, build_L_sparse
+from matrix_analysis.compute_matrix_rank import compute_L_rank, compute_matrix_rank
+from matrix_analysis.spectrum_summary import cluster_eigenvalues, compare_spectra
+
+
+def closed_form_rank(n_1, n1, n2, n3, n4):
+    """rank L = Σ n_i·n_j - Σ n_i + 1 (n_1 = 1)"""
+    n = (n1, n2, n3, n4)
+    pairs = sum(n[i] * n[j] for i in range(4) for j in range(i + 1, 4))
+    return pairs - sum(n) + 1
+
+
+def test_closed_form_rank(params):
+    L, _ = build_L_matrix(*params)
+
+    assert compute_L_rank(*params) == closed_form_rank(*params)
+    assert np.linalg.matrix_rank(L.astype(np.float64)) == closed_form_rank(*params)
+
+
+@pytest.mark.parametrize('method', ['auto', 'sparse', 'qr', 'gram', 'svd'])
+def test_compute_matrix_rank_methods(params, method):
+    L, _ = build_L_matrix(*params)
+    expected = compute_L_rank(*params)
+
+    assert compute_matrix_rank(L, method=method) == expected
+    if method in ('auto', 'sparse'):
+        assert compute_matrix_rank(build_L_sparse(*params, dtype=np.int8)[0], method=method) == expected
+
+
+def test_compute_matrix_rank_analytic_checks_shape():
+    L, _ = build_L_matrix(1, 2, 3, 4, 5)
+
+    assert compute_matrix_rank(L, params=(1, 2, 3, 4, 5)) == compute_L_rank(1, 2, 3, 4, 5)
+    with pytest.raises(ValueError):
+        compute_matrix_rank(L, params=(1, 2, 3, 4, 6))
+    with pytest.raises(ValueError):
+        compute_matrix_rank(L, method='analytic')
+
+
+def test_basis_rows_are_independent(params):
+    """Базисные строки - индексы строк исходной L, линейно независимые, по числу равные рангу"""
+    L, _ = build_L_matrix(*params)
+    rows = find_basis_rows(L)
+
+    assert len(rows) == compute_L_rank(*params)
+    assert np.all(np.diff(rows) > 0)
+    assert np.linalg.matrix_rank(L[rows].astype(np.float64)) == len(rows)
+
+
+def test_analytic_spectrum_matches_eigh(params):
+    L, _ = build_L_matrix(*params)
+    numeric = np.sort(np.linalg.eigvalsh((L @ L.T).astype(np.float64)))[::-1]
+
+    np.testing.assert_allclose(numeric, analytic_eigenvalues(*params[1:]), atol=1e-9)
+    report = compare_spectra(cluster_eigenvalues(numeric), analytic_spectrum(*params[1:]))
+    assert report['match'], report['mismatches']
+
+
+def test_analytic_eigenvectors(params):
+    report = verify_analytic_spectrum(*params[1:])
+
+    assert report['passed'], report
+
+
+def test_block_eigh_matches_eigh(params):
+    """Спектр по независимым блокам совпадает со спектром всей матрицы"""
+    L, _ = build_L_matrix(*params)
+    L_LT = (L @ L.T).astype(np.float64)
+    expected = np.sort(np.linalg.eigvalsh(L_LT))[::-1]
+
+    eigenvalues, eigenvectors = block_eigh(L_LT, compute_eigenvectors=True, max_workers=1)
+    np.testing.assert_allclose(eigenvalues, expected, atol=1e-9)
+    np.testing.assert_allclose(L_LT @ eigenvectors, eigenvectors * eigenvalues, atol=1e-9)
+    np.testing.assert_allclose(eigenvectors.T @ eigenvectors, np.eye(len(eigenvalues)), atol=1e-9)
+
+    eigenvalues, eigenvectors = LLT_block_eigh(*params, compute_eigenvectors=True, max_workers=1)
+    np.testing.assert_allclose(eigenvalues, expected, atol=1e-9)
+    np.testing.assert_allclose(L_LT @ eigenvectors, eigenvectors * eigenvalues, atol=1e-9)
+
+
+@pytest.mark.parametrize('rank_method', ['eigh', 'svd', 'analytic'])
+def test_batch_analyze_matches_single(rank_method):
+    """Пакетный анализ совпадает с анализом каждого набора отдельно (в том числе для наборов одного размера)"""
+    grid = PARAMS + [(1, 2, 3, 5, 4), (1, 3, 2, 4, 5)]
+    results = batch_analyze(grid, rank_method)
+
+    assert [result['params'] for result in results] == grid
+    for params, result in zip(grid, results):
+        L, _ = build_L_matrix(*params)
+        assert result['shape'] == L.shape
+        assert result['nnz'] == np.count_nonzero(L)
+        assert result['rank'] == compute_L_rank(*params)
+        np.testing.assert_allclose(result['eigenvalues'], analytic_eigenvalues(*params[1:]), atol=1e-4)
+
+
+def test_batch_analyze_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        batch_analyze([(1, 2, 3, 4, 5)], 'qr')
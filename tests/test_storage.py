@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from matrix_analysis.build_L_matrix import build_L_matrix, build_L_sparse
+from matrix_analysis.cache import MatrixCache
+from matrix_analysis.matrix_export import write_matrix_text, write_matrix_triplets
+from matrix_analysis.matrix_store import load_matrix, load_metadata, save_matrix
+
+
+def test_cache_round_trip(tmp_path):
+    cache = MatrixCache(str(tmp_path))
+    calls = []
+
+    def compute(matrix, scale=1):
+        calls.append(scale)
+        return {'values': matrix * scale, 'sparse': sp.csr_matrix(matrix), 'pair': (scale, 'x'), 'seconds': 0.5}
+
+    matrix = np.arange(6.0).reshape(2, 3)
+    first = cache.get_or_compute('compute', compute, matrix, scale=2)
+    second = cache.get_or_compute('compute', compute, matrix.copy(), scale=2)
+
+    assert calls == [2]
+    for result in (first, second):
+        np.testing.assert_array_equal(result['values'], matrix * 2)
+        np.testing.assert_array_equal(result['sparse'].toarray(), matrix)
+        assert result['pair'] == (2, 'x')
+        # Время вычисления в кэш не записывается
+        assert 'seconds' not in result
+
+    cache.get_or_compute('compute', compute, matrix, scale=3)
+    assert calls == [2, 3]
+
+
+def test_cache_key_depends_on_function_source(tmp_path):
+    """Одинаковое имя, но другой исходный код функции - другая запись"""
+    cache = MatrixCache(str(tmp_path))
+
+    def first(x):
+        return x + 1
+
+    def second(x):
+        return x + 2
+
+    assert cache.get_or_compute('f', first, 1) == 2
+    assert cache.get_or_compute('f', second, 1) == 3
+    assert cache.get_or_compute('f', first, 1) == 2
+
+
+def test_cache_get_or_compute_many(tmp_path):
+    """Отсутствующие в кэше элементы вычисляются одним вызовом"""
+    cache = MatrixCache(str(tmp_path))
+    calls = []
+
+    def compute(items, offset):
+        calls.append(list(items))
+        return [{'value': item + offset} for item in items]
+
+    assert cache.get_or_compute_many('many', compute, [1, 2], 10) == [{'value': 11}, {'value': 12}]
+    assert cache.get_or_compute_many('many', compute, [1, 2, 3, 4], 10) == [{'value': v} for v in (11, 12, 13, 14)]
+    assert calls == [[1, 2], [3, 4]]
+
+
+def test_cache_eviction(tmp_path):
+    cache = MatrixCache(str(tmp_path), max_bytes=3000)
+    for idx in range(5):
+        cache.get_or_compute('array', np.full, 100, float(idx))
+
+    assert cache.size() <= 3000
+    assert 0 < len(cache.entries()) < 5
+
+
+@pytest.mark.parametrize('suffix', ['.npy', '.npz'])
+def test_store_dense_round_trip(tmp_path, suffix):
+    L, block_coords = build_L_matrix(1, 2, 3, 4, 5, dtype=np.int8)
+    filename = str(tmp_path / f'L{suffix}')
+
+    meta = save_matrix(L, filename, params={'n1': 2}, block_coords=block_coords)
+    loaded = load_matrix(filename)
+
+    np.testing.assert_array_equal(loaded, L)
+    assert loaded.dtype == np.int8
+    assert load_metadata(filename) == meta
+    assert meta['nnz'] == np.count_nonzero(L)
+    assert meta['shape'] == list(L.shape)
+
+
+def test_store_sparse_round_trip(tmp_path):
+    L, _ = build_L_sparse(1, 2, 3, 4, 5, dtype=np.int8)
+    filename = str(tmp_path / 'L.npz')
+
+    save_matrix(L, filename)
+    loaded = load_matrix(filename)
+
+    assert sp.issparse(loaded)
+    np.testing.assert_array_equal(loaded.toarray(), L.toarray())
+    with pytest.raises(ValueError):
+        save_matrix(L, str(tmp_path / 'L.npy'))
+
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_export_text_round_trip(tmp_path, sparse):
+    L, _ = build_L_matrix(1, 2, 3, 4, 5, dtype=np.int8)
+    matrix = sp.csr_matrix(L) if sparse else L
+    filename = tmp_path / 'L.txt'
+
+    write_matrix_text(matrix, str(filename), header='L', chunk_rows=7)
+    lines = filename.read_text().splitlines()
+
+    assert lines[0] == 'L'
+    np.testing.assert_array_equal(np.loadtxt(lines[1:], dtype=np.int64), L)
+
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_export_triplets_round_trip(tmp_path, sparse):
+    L, _ = build_L_matrix(1, 2, 3, 4, 5, dtype=np.int8)
+    matrix = sp.csr_matrix(L) if sparse else L
+    filename = tmp_path / 'L_triplets.txt'
+
+    write_matrix_triplets(matrix, str(filename), header='L', one_based=True, chunk_rows=5)
+    lines = filename.read_text().splitlines()
+
+    assert lines[:2] == ['# L', f'# {L.shape[0]} {L.shape[1]}']
+    rows, cols, values = np.loadtxt(lines[2:], dtype=np.int64, ndmin=2).T
+    restored = np.zeros(L.shape, dtype=np.int64)
+    restored[rows - 1, cols - 1] = values
+    np.testing.assert_array_equal(restored, L)
+    assert len(values) == np.count_nonzero(L)